@@ -10,6 +10,8 @@ import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
 
+import rolling
+
 print('numpy version:', np.__version__)
 print('pandas version:', pd.__version__)
 
@@ -84,7 +86,7 @@ emissivity_ground = 0.95
 LWdn = data.loc[:,'LWdn'].values
 
 if 'Te' in data.columns:
-    T_mean = data.loc[:,'Te'].rolling(window=730, min_periods=1).mean()
+    T_mean = rolling.trailing_mean(data.loc[:,'Te'].values, 730)
 else:
     T_mean = 5.0 # Crude estimate
 
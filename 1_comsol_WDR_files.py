@@ -8,6 +8,10 @@ wind driven rain load to vertical surfaces.
 
 The calculation is done according to SFS-EN ISO 15927-3.
 
+All wall directions are calculated at the same time. The airfield
+index I_S is calculated once and the wind-driven rain is the same
+index times the coefficient of the terrain and the building height.
+
 
 """
 
@@ -16,6 +20,8 @@ import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
 
+import helper
+
 print('numpy version:', np.__version__)
 print('pandas version:', pd.__version__)
 
@@ -56,117 +62,42 @@ terrain_category = 'I'
 # Building total height, m
 z_building = 6.0
 
-C_T = 1.0
-
-O = 1.0
-
-W = 0.5
+# Wall directions, degree
+# This is the same than surface_azimuth in solar radiation calculations
+Theta_walls = np.arange(start=0.0, stop=360.0, step=90.0)
 
-a_r = 0.7
+# C_T = 1.0, O = 1.0, W = 0.5 and a_r = 0.7 are set in helper.calc_WDR_coef()
+# and the terrain category parameters in helper.terrain_parameters
 
 
 
 #####################
 
+# All wall directions at the same time
+# I_S.shape = I_WS_all.shape = (n_walls, n_times)
 
-z_0_II_1991 = 0.05
+I_S = helper.calc_I_S(ws, wd, precip, Theta_walls)
 
+coef = helper.calc_WDR_coef([terrain_category], [z_building])[0, 0]
 
-if terrain_category == '0':
-    # Avomeri tai merelle avoin rannikko
-    z_0_1991 = 0.003
-    z_min_1991 = 1.0
-    
-    K_R_15927 = 0.17
-    z_0_15927 = 0.01
-    z_min_15927 = 2.0
-    
-    
-elif terrain_category == 'I':
-    # Järvet tai tasanko, jolla on enintään vähäistä
-    # kasvillisuutta eikä tuuliesteitä
-    z_0_1991 = 0.01
-    z_min_1991 = 1.0
-    
-    K_R_15927 = 0.17
-    z_0_15927 = 0.01
-    z_min_15927 = 2.0
-    
-elif terrain_category == 'II':
-    # Alue, jolla on matalaa heinää tai siihen verrattavaa
-    # kasvillisuutta ja erillisiä esteitä (puita, rakennuksia),
-    # joiden etäisyys toisistaan on vähintään 20 kertaa
-    # esteen korkeus
-    z_0_1991 = 0.05
-    z_min_1991 = 2.0
-    
-    K_R_15927 = 0.19
-    z_0_15927 = 0.05
-    z_min_15927 = 4.0
-    
-elif terrain_category == 'III':
-    # Alueet, joilla on säännöllinen kasvipeite tai rakennuksia
-    # tai erillisiä tuuliesteitä, joiden keskinäinen etäisyys on
-    # enintään 20 kertaa esteen korkeus (kuten kylät, esikaupunkialueet,
-    # pysyvä metsä)
-    z_0_1991 = 0.3
-    z_min_1991 = 5.0
-    
-    K_R_15927 = 0.22
-    z_0_15927 = 0.3
-    z_min_15927 = 8.0
-    
-elif terrain_category == 'IV':
-    # Alueet, joiden pinta-alasta vähintään 15 % on rakennusten peitossa
-    # ja niiden keskimääräinen korkeus ylittää 15 m
-    z_0_1991 = 1.0
-    z_min_1991 = 10.0
-    
-    K_R_15927 = 0.24
-    z_0_15927 = 1.0
-    z_min_15927 = 16.0
-    
-else:
-    print('Unknown terrain category!')
+# Reference values for all hours, without the Te > 0 degC limit
+I_WS_all_Te = coef * I_S
+
+# Only the hours with Te >= 0 degC, as in helper.calc_WDR_grid()
+Te = data.loc[:,'Te'].values
 
+I_WS_all = np.where(Te[np.newaxis, :] < 0.0, 0.0, I_WS_all_Te)
 
 
 ##
 
-for Theta_wall in np.arange(start=0.0, stop=360.0, step=90.0):
-    # Wall direction, degree
-    # This is the same than surface_azimuth in solar radiation calculations
-    #Theta_wall = 180.0
+for idx_wall, Theta_wall in enumerate(Theta_walls):
     
     print('Theta_wall:', Theta_wall)
     
-    I_S = (2.0/9.0) * ws * ( precip**(8.0/9.0) ) \
-            * np.maximum( np.cos( (np.pi/180.0)*(wd-Theta_wall) ) , 0.0)
-    
-    
-    k_r_1991 = 0.19 * (z_0_1991/z_0_II_1991)**0.07
-    
-    C_R_1991 = k_r_1991 * np.log(np.max((z_building, z_min_1991))/z_0_1991)
-    
-    C_R_15927 = K_R_15927 * np.log(np.max((z_building, z_min_15927))/z_0_15927)
-    
-    
-    # C_R_1991 or C_R_15927
-    # z_min is bigger in SFS-EN ISO 15927-3, which leads to
-    # higher wind velocity and wind-driven rain amounts
-    # when calculated for buildings for which z_building < z_min
-    C_R = C_R_15927 
-    
-    
-    I_WS = I_S * C_R * C_T * O * W * a_r
-    
-    
-    print('  I_WS all Te:', I_WS.sum().round(1))
-    
-    # Include only wind-driven rain when outdoor air temperature is above 0 degC
+    I_WS = I_WS_all[idx_wall, :]
     
-    idxs_subzero = data.loc[:,'Te'] < 0.0
-    I_WS[idxs_subzero] = 0.0
+    print('  I_WS all Te:', I_WS_all_Te[idx_wall, :].sum().round(1))
     
     print('  I_WS positive Te:', I_WS.sum().round(1))
     
@@ -175,8 +106,8 @@ for Theta_wall in np.arange(start=0.0, stop=360.0, step=90.0):
     
     # I_S
     
-    tup = (np.arange(start=0, stop=len(I_S)),
-           I_S)
+    tup = (np.arange(start=0, stop=I_S.shape[1]),
+           I_S[idx_wall, :])
     X = np.column_stack(tup)
     
     fname = os.path.join(output_folder,
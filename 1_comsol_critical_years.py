@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+
+Rank the years of a long climate record by moisture load, so that only
+the most critical years are simulated with COMSOL.
+
+For each year and wall orientation: driving-rain sum, hours above the
+critical relative humidity at the outdoor surface and hours in
+low-radiation wet spells. See critical_years.py.
+
+Output:
+    output_folder/<wac file name> critical years.csv = all years, ranked
+    for each orientation
+
+"""
+
+import os
+
+import critical_years
+import helper
+
+
+
+# Input file, e.g. 30 years of hourly data
+wac_file_name = 'Jokioinen 2011 nykyilmasto 1989-2018.wac'
+
+fname = os.path.join(r'C:\Users\laukkara\github\comsol_tools',
+                     'input',
+                     f'{wac_file_name}')
+
+# Local standard time (no DST) of the first data row
+start_time = '1989-01-01 00:00:00'
+
+
+# Output folder
+
+output_folder = os.path.join(r'C:\Temp',
+                             'critical_years')
+
+if not os.path.exists(output_folder):
+    os.makedirs(output_folder)
+
+
+# Walls
+
+azimuths = [0.0, 90.0, 180.0, 270.0]
+terrain_category = 'I'
+z_building = 6.0
+
+
+# Low-radiation wet spells: radiation to the wall below radiation_limit
+# (W/m2) and surface above RHcrit for at least spell_min hours
+radiation_limit = 100.0
+spell_min = 24.0
+
+
+# Years with data for less than this part of the calendar year (partial
+# first or last year) are not ranked, 0 = rank all years
+min_year_fraction = 0.99
+
+
+# Weights of the indices in the score, see critical_years.index_weights
+weights = {'wdr_sum': 1.0,
+           'h_RHcrit': 1.0,
+           'h_wet_spells': 1.0}
+
+# Number of years printed for each orientation
+n_worst = 3
+
+
+
+
+############
+
+df, header = helper.read_wac(fname)
+
+df_years = critical_years.calc_year_indices(df, header, start_time,
+                                            azimuths=azimuths,
+                                            terrain_category=terrain_category,
+                                            z_building=z_building,
+                                            radiation_limit=radiation_limit,
+                                            spell_min=spell_min,
+                                            min_year_fraction=min_year_fraction)
+
+df_ranked = critical_years.rank_years(df_years, weights)
+
+df_ranked.to_csv(os.path.join(output_folder,
+                              f'{wac_file_name[:-4]} critical years.csv'),
+                 index=False)
+
+print(df_ranked.loc[df_ranked.loc[:, 'rank'] <= n_worst, :] \
+      .to_string(index=False), flush=True)
+
+print('END')
@@ -35,6 +35,8 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import pvlib
 
+import resampling
+
 print('pandas version:', pd.__version__)
 print('pvlib version:', pvlib.__version__)
 
@@ -54,6 +56,10 @@ if not os.path.exists(output_folder):
 
 ########
 
+# Time step of the output files, h, e.g. 1/6 for 10 min
+time_step_out = 1.0
+
+
 
 
 # file = 'Jokioinen 2011 nykyilmasto 1989-2018.csv'
@@ -130,7 +136,7 @@ solar_azimuth = solar_position.loc[:,'azimuth'].values
 
 
 # for surface_azimuth in np.arange(start=0.0, stop=360.0, step=180.0):
-for surface_azimuth in np.arange(start=0.0, stop=360.0, stop=90.0):
+for surface_azimuth in np.arange(start=0.0, stop=360.0, step=90.0):
     #surface_azimuth = 180.0 # degrees from north
     
     
@@ -158,16 +164,17 @@ for surface_azimuth in np.arange(start=0.0, stop=360.0, stop=90.0):
                                                 model_perez='allsitescomposite1990')
     
     
-    # Interpolation to next half hour
-    
-    poa_global_even_hours = np.zeros(shape=total_irrad['poa_global'].shape)
-    
-    starts = total_irrad['poa_global'][0:-1]
-    ends = total_irrad['poa_global'][1:]
-    
-    betweens = starts + 0.5*(ends - starts)
+    # Interpolation to the time stamps of the data rows.
+    # The values are means of the previous hour, so the even hours are
+    # half an hour after the mean values. time_step_out < 1 h gives
+    # short time steps for COMSOL, see resampling.py
     
-    poa_global_even_hours[:-1] = betweens
+    poa_global_even_hours = resampling.resample(total_irrad['poa_global'],
+                                                step_in=1.0,
+                                                step_out=time_step_out,
+                                                kind_in='mean',
+                                                kind_out='instant',
+                                                label_in='end')
     
     
     
@@ -175,13 +182,14 @@ for surface_azimuth in np.arange(start=0.0, stop=360.0, stop=90.0):
     fname = os.path.join(output_folder,
                          f'{file[:-4]} sunrad surfaz{surface_azimuth} slope{surface_tilt:.2f}.csv')
     
-    tup = (np.arange(start=0, stop=len(poa_global_even_hours)),
+    tup = (time_step_out*np.arange(start=0, stop=len(poa_global_even_hours)),
            poa_global_even_hours)
     X = np.column_stack(tup)
     
     np.savetxt(fname,
                X,
-               fmt = ['%d', '%.3f'])
+               fmt = ['%d' if float(time_step_out).is_integer() else '%.4f',
+                      '%.3f'])
 
 
 # plot
@@ -42,6 +42,9 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import pvlib
 
+import fmi
+import resampling
+
 print('pandas version:', pd.__version__)
 print('pvlib version:', pvlib.__version__)
 
@@ -61,6 +64,10 @@ if not os.path.exists(output_folder):
 
 ########
 
+# Time step of the output files, h, e.g. 1/6 for 10 min
+time_step_out = 1.0
+
+
 # Read in data
 
 file = 'Jokioinen2022_FMI_radiation.txt'
@@ -68,15 +75,15 @@ file = 'Jokioinen2022_FMI_radiation.txt'
 fname = os.path.join(input_folder,
                      file)
 
-data = pd.read_csv(fname,
-                   sep=r'\s+')
+# One typed pass, the missing values ('-') become NaN.
+# The time stamps are assembled from the YEAR, MON, DAY, HOUR and MIN
+# columns, see fmi.py
+data, time_utc = fmi.read_fmi(fname,
+                              sep=r'\s+')
 
 
 # There can be missing values, 
 # but fixed in such a way that only individual missing values per time
-# Convert to pandas dataFrame to numeric
-data = data.apply(pd.to_numeric, errors='coerce')
-
 # Interpolate NaN values
 data.interpolate(method='linear',
                  limit=3,
@@ -93,27 +100,17 @@ for col in ['DHI', 'DNI', 'GHI']:
     data.loc[:,col] = np.maximum(data.loc[:,col], 0.0)
 
 
-# Convert time columns into a single datetime column
-# It is assumed that the datetime columns describe the local wall clock time
-time_dict = {'year': data.loc[:,'YEAR'].values,
-             'month': data.loc[:, 'MON'].values,
-             'day': data.loc[:,'DAY'].values,
-             'hour': data.loc[:,'HOUR'].values,
-             'minute': data.loc[:,'MIN'].values}
-datetime_wall_clock_time_tz_naive = pd.to_datetime(arg=time_dict)
-
+# The time columns describe the local wall clock time.
 # In https://www.ilmatieteenlaitos.fi/havaintojen-lataus,
 # the wall clock time shows a jump from 02:00 to 04:00 when moving from
 # non-DST to DST in the spring.
 # However in autumn, when moving back from DST to non-DST, there is no
 # duplicate time stamps in local wall clock time format. In this situation
 # the solar radiation data was copied from UTC time representation and 
-# added as duplicate 03:00 row to input file. The duplicate time stamp
-# is handled by the 'ambiguous' parameter in pandas.Series.dt.tz_localize().
+# added as duplicate 03:00 row to input file. The first 03:00 row is
+# taken as DST and the duplicate as standard time, see fmi.local_to_utc().
 
-datetime_wall_clock_time_tz_aware \
-    = datetime_wall_clock_time_tz_naive.dt.tz_localize(tz='Europe/Helsinki',
-                                                       ambiguous='infer')
+datetime_wall_clock_time_tz_aware = time_utc.tz_convert('Europe/Helsinki')
 
 
 # The radiation values represent the mean of the previous hour
@@ -209,16 +206,17 @@ for surface_azimuth in np.arange(start=0.0, stop=360.0, step=90.0):
                                                 model_perez='allsitescomposite1990')
     
     
-    # Interpolation to next half hour
-    
-    poa_global_even_hours = np.zeros(shape=total_irrad['poa_global'].shape)
-    
-    starts = total_irrad['poa_global'][0:-1]
-    ends = total_irrad['poa_global'][1:]
-    
-    betweens = starts + 0.5*(ends - starts)
+    # Interpolation to the time stamps of the data rows.
+    # The values are means of the previous hour, so the even hours are
+    # half an hour after the mean values. time_step_out < 1 h gives
+    # short time steps for COMSOL, see resampling.py
     
-    poa_global_even_hours[:-1] = betweens
+    poa_global_even_hours = resampling.resample(total_irrad['poa_global'],
+                                                step_in=1.0,
+                                                step_out=time_step_out,
+                                                kind_in='mean',
+                                                kind_out='instant',
+                                                label_in='end')
     
     
     
@@ -226,13 +224,14 @@ for surface_azimuth in np.arange(start=0.0, stop=360.0, step=90.0):
     fname = os.path.join(output_folder,
                          f'{file[:-4]} sunrad surfaz{surface_azimuth} slope{surface_tilt:.2f}.csv')
     
-    tup = (np.arange(start=0, stop=len(poa_global_even_hours)),
+    tup = (time_step_out*np.arange(start=0, stop=len(poa_global_even_hours)),
            poa_global_even_hours)
     X = np.column_stack(tup)
     
     np.savetxt(fname,
                X,
-               fmt = ['%d', '%.3f'])
+               fmt = ['%d' if float(time_step_out).is_integer() else '%.4f',
+                      '%.3f'])
 
 
 # plot
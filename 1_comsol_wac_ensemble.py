@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+
+Make COMSOL input files for many WUFI .wac files at the same time,
+e.g. current climate and RCP2.6/4.5/8.5 files for several stations
+and target periods.
+
+The wac files are given as a folder or a glob pattern. Each file is
+handled in its own process with comsol_inputs.generate_from_wac(),
+so all cores are used. The location is read from the header of each
+wac file.
+
+The output file names start with the name of the wac file. A manifest
+file (manifest.csv) lists which files were made from which wac file.
+
+"""
+
+import os
+import glob
+import time
+import concurrent.futures
+
+import pandas as pd
+
+import comsol_inputs
+
+
+
+
+# Input files, folder or glob pattern
+wac_files = os.path.join(r'C:\Users\laukkara\github\comsol_tools',
+                         'input',
+                         '*.wac')
+
+# Local standard time (no DST) of the first data row
+start_time = '2011-01-01 00:00:00'
+
+
+# Output folder
+
+output_folder = os.path.join(r'C:\Temp',
+                             'wac_for_comsol')
+
+
+# Surface
+
+surface_azimuth = 180.0
+terrain_category='I'
+z_building=6.0
+
+slope_as_quotient = 100000.0 # dy/dx
+
+# Solar radiation to the surface: 'isotropic', 'haydavies' or 'perez'
+transposition_model = 'isotropic'
+
+
+# Content-addressed storage: each different file is written once to
+# store_folder and the output files are hard links to it, see
+# helper.save_to_file_for_comsol(). None = plain files
+store_folder = None
+
+
+# Number of parallel processes, None = number of cores
+n_workers = None
+
+
+
+
+def run_one(fname):
+    # Returns list of manifest rows for one wac file
+
+    try:
+        output_files = comsol_inputs.generate_from_wac(fname,
+                                                       output_folder,
+                                                       start_time=start_time,
+                                                       surface_azimuth=surface_azimuth,
+                                                       terrain_category=terrain_category,
+                                                       z_building=z_building,
+                                                       slope_as_quotient=slope_as_quotient,
+                                                       transposition_model=transposition_model,
+                                                       store_folder=store_folder)
+
+        rows = [[fname, quantity, fname_out, 'ok'] \
+                for quantity, fname_out in output_files.items()]
+
+    except Exception as e:
+        rows = [[fname, None, None, f'error: {e!r}']]
+
+    return(rows)
+
+
+
+
+if __name__ == '__main__':
+    # The main guard is needed for the process pool on Windows
+
+    if os.path.isdir(wac_files):
+        fnames = sorted(glob.glob(os.path.join(wac_files, '*.wac')))
+    else:
+        fnames = sorted(glob.glob(wac_files))
+
+    print(f'{len(fnames)} wac files', flush=True)
+
+    if not os.path.exists(output_folder):
+        os.makedirs(output_folder)
+
+    t_start = time.perf_counter()
+
+    manifest = []
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=n_workers) as executor:
+
+        futures = {executor.submit(run_one, fname): fname for fname in fnames}
+
+        for future in concurrent.futures.as_completed(futures):
+
+            rows = future.result()
+            manifest.extend(rows)
+
+            print(f'{os.path.basename(futures[future])}: {rows[-1][-1]}',
+                  flush=True)
+
+
+    # Manifest
+
+    df_manifest = pd.DataFrame(data=manifest,
+                               columns=['wac_file', 'quantity',
+                                        'output_file', 'status'])
+    df_manifest.sort_values(by=['wac_file', 'quantity'],
+                            inplace=True,
+                            ignore_index=True)
+    df_manifest.index.name = 'index'
+
+    fname = os.path.join(output_folder,
+                         'manifest.csv')
+    df_manifest.to_csv(fname)
+
+    print(f'Time {time.perf_counter()-t_start:.1f} s', flush=True)
+    print('END')
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+
+Monte Carlo realisations of one WUFI .wac climate file for COMSOL.
+
+The uncertain parameters (temperature shift, precipitation scale,
+terrain category, building height) are drawn from the distributions
+below with a fixed seed, and a full set of COMSOL input files is made
+for each sample. The samples and their folders are listed in
+samples.csv. See montecarlo.py.
+
+"""
+
+import os
+
+import montecarlo
+
+
+
+# Input file
+wac_file_name = 'Jokioinen 2011 RCP85-2080.wac'
+
+fname = os.path.join(r'C:\Users\laukkara\github\comsol_tools',
+                     'input',
+                     f'{wac_file_name}')
+
+# Local standard time (no DST) of the first data row
+start_time = '2011-01-01 00:00:00'
+
+
+# Output folder
+
+output_folder = os.path.join(r'C:\Temp',
+                             'wac_montecarlo')
+
+
+# Surface
+
+surface_azimuth = 180.0
+slope_as_quotient = 100000.0 # dy/dx
+
+
+# Uncertain parameters, see montecarlo.py for the distributions
+
+parameters = [{'name': 'dT', 'distribution': 'normal',
+               'mean': 0.0, 'std': 1.0},
+              {'name': 'precip_scale', 'distribution': 'uniform',
+               'low': 0.8, 'high': 1.2},
+              {'name': 'terrain_category', 'distribution': 'choice',
+               'values': ['I', 'II', 'III']},
+              {'name': 'z_building', 'distribution': 'uniform',
+               'low': 3.0, 'high': 12.0}]
+
+n_samples = 100
+
+seed = 2026
+
+# Number of samples calculated together in one process
+batch_size = 10
+
+# Number of parallel processes, None = number of cores
+n_workers = None
+
+# Content-addressed storage, the files that are the same for all
+# samples (e.g. sunrad.csv) are stored once, see
+# helper.save_to_file_for_comsol(). None = plain files
+store_folder = os.path.join(output_folder, 'store')
+
+
+
+
+if __name__ == '__main__':
+    # The main guard is needed for the process pool on Windows
+
+    samples = montecarlo.draw_samples(parameters, n_samples, seed)
+
+    samples = montecarlo.run(fname,
+                             output_folder,
+                             samples,
+                             start_time=start_time,
+                             surface_azimuth=surface_azimuth,
+                             slope_as_quotient=slope_as_quotient,
+                             batch_size=batch_size,
+                             n_workers=n_workers,
+                             store_folder=store_folder)
+
+    print(samples.describe(include='all').to_string())
+    print('END')
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+
+Same as 1_comsol_wac_to_comsol.py, but the wac file is processed in
+chunks with the generator pipeline in streaming.py. The memory use
+depends on chunk_size and not on the length of the climate file,
+so this can be used for e.g. 100-year synthetic climates.
+
+The output files are the same as from 1_comsol_wac_to_comsol.py.
+
+"""
+
+import os
+import numpy as np
+
+import helper
+import profiling
+import streaming
+
+
+
+
+# Input files
+wac_file_name = 'Jokioinen 2011 RCP85-2080.wac'
+
+# Local standard time (no DST) of the first data row
+start_time = '2011-01-01 00:00:00'
+
+fname = os.path.join(r'C:\Users\laukkara\github\comsol_tools',
+                     'input',
+                     f'{wac_file_name}')
+
+
+# Output folder
+
+output_folder = os.path.join(r'C:\Temp',
+                             'wac_for_comsol')
+
+if not os.path.exists(output_folder):
+    os.makedirs(output_folder)
+
+
+# Number of rows in one chunk
+chunk_size = 8760
+
+
+# Stage-level timing and memory instrumentation, see profiling.py
+profile_run = False
+
+if profile_run:
+    profiling.enable()
+
+
+
+## Surface
+
+surface_azimuth = 180.0
+terrain_category='I'
+z_building=6.0
+
+slope_as_quotient = 100000.0 # dy/dx
+surface_tilt = np.arctan(slope_as_quotient)*(180/np.pi)
+
+# Solar radiation to the surface: 'isotropic', 'haydavies' or 'perez'
+transposition_model = 'isotropic'
+
+
+
+## Pipeline
+
+header = helper.read_wac_header(fname)
+
+time_step = header['time_step']
+
+location = {'latitude': header['latitude'],
+            'longitude': header['longitude'],
+            'altitude': header['altitude']}
+
+
+files = {'Ti': f'{wac_file_name[:-4]} Ti.csv',
+         'phii': f'{wac_file_name[:-4]} phii.csv',
+         'TA': f'{wac_file_name[:-4]} Te.csv',
+         'RHe': f'{wac_file_name[:-4]} RHe.csv',
+         'I_WS': f'{wac_file_name[:-4]} wdr surfaz{surface_azimuth}' \
+                 f' tercat{terrain_category} z{z_building:.1f}.csv',
+         'LW_incoming': f'{wac_file_name[:-4]} LWincoming_total {surface_tilt:.2f}.csv',
+         'SW_incoming': f'{wac_file_name[:-4]} sunrad surfaz{surface_azimuth} slope{surface_tilt:.2f}.csv'}
+
+files = {key: os.path.join(output_folder, value) for key, value in files.items()}
+
+
+chunks = streaming.wac_chunks(fname, chunk_size)
+
+chunks = streaming.indoor_stage(chunks, time_step=time_step)
+
+chunks = streaming.wdr_stage(chunks,
+                             terrain_category,
+                             z_building,
+                             surface_azimuth)
+
+chunks = streaming.lw_stage(chunks, slope_as_quotient, time_step)
+
+chunks = streaming.solar_stage(chunks,
+                               location,
+                               surface_tilt,
+                               surface_azimuth,
+                               start_time,
+                               time_step,
+                               header['timezone'],
+                               transposition_model=transposition_model)
+
+chunks = (chunk.assign(RHe=100 * chunk.loc[:,'HREL']) for chunk in chunks)
+
+chunks = streaming.write_stage(chunks, files, time_step)
+
+
+with profiling.stage('streaming pipeline'):
+    n_rows = streaming.consume(chunks)
+
+print(f'{n_rows} rows written', flush=True)
+
+
+
+# Summary table and json trace, only if profile_run is True
+
+profiling.report(output_folder)
+
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+
+Read in COMSOL cut-line or field export (Data export, spreadsheet
+format) with T and RH at all nodes and output times, and calculate
+mould index for every node.
+
+The export is first converted to memory-mapped files (see fields.py),
+so the whole field does not have to fit in memory. The mould index is
+calculated in batches of nodes.
+
+Output in root_folder/case_folder/field:
+    - T.dat, RH.dat, coords.npy, times.npy, field.json (memmap files)
+    - Mmax.csv, Mmax and time of Mmax for every node
+    - Mmax.png, mould risk map (2D exports)
+
+[T] = degC
+[RH] = 0...100 %
+
+"""
+
+import os
+import numpy as np
+
+import fields
+import profiling
+
+
+
+## The folders can be changed as needed
+
+root_folder = r'S:\91202_Rakfys_yhteiset\Tiiliverhous\2_Laskenta\narvi stuff'
+
+case_folder = 'esimerkki'
+
+file_name_to_read = 'kentta.txt'
+
+
+# Expression names in the export, e.g. 'T' or 'ht.T'
+T_name = 'T'
+RH_name = 'RH'
+
+
+# Sensitivity classes of the material in the exported domain
+MG_speedclass = 'vs'
+MG_maxclass = 'vs'
+C_mat = 0.5
+
+
+# Length of the analysed period at the end of the results, in the time
+# unit of the export. None = use all output times
+period_to_analyse = 8760.0
+
+
+# Time unit of the export in hours, e.g. 1/3600 for seconds.
+# The output times do not need to be hourly or evenly spaced.
+hours_per_time_unit = 1.0
+
+
+# Store T, RH (and M) memmaps as float32, half of the disk space.
+# The mould index is calculated in float64.
+use_float32 = False
+
+
+# Number of nodes per batch, affects only the memory use
+batch_size = 256
+
+# Also write M for all nodes and times to M.dat
+write_M = False
+
+# Set False to use the memmap files of an earlier run
+read_export = True
+
+
+# Stage-level timing and memory instrumentation, see profiling.py
+profile_run = False
+
+
+
+
+############
+
+if profile_run:
+    profiling.enable()
+
+fname = os.path.join(root_folder,
+                     case_folder,
+                     file_name_to_read)
+
+output_folder = os.path.join(root_folder,
+                             case_folder,
+                             'field')
+
+
+with profiling.stage('read field'):
+
+    if read_export:
+        print('Reading file...', flush=True)
+        field = fields.ingest_field_export(fname,
+                                           output_folder,
+                                           T_name=T_name,
+                                           RH_name=RH_name,
+                                           dtype=np.float32 if use_float32 \
+                                               else np.float64)
+    else:
+        field = fields.open_field(output_folder)
+
+    print(f'{field["T"].shape[0]} nodes, {field["T"].shape[1]} times',
+          flush=True)
+
+
+with profiling.stage('mould index'):
+
+    print('Calculate mould index...', flush=True)
+
+    df_Mmax = fields.mould_index_field(field,
+                                       MG_speedclass,
+                                       MG_maxclass,
+                                       C_mat,
+                                       batch_size=batch_size,
+                                       period_to_analyse=period_to_analyse,
+                                       hours_per_time_unit=hours_per_time_unit,
+                                       write_M=write_M)
+
+
+with profiling.stage('write results'):
+
+    df_Mmax.to_csv(os.path.join(output_folder,
+                                'Mmax.csv'))
+
+    worst = fields.worst_node(df_Mmax)
+
+    print('Worst node:', flush=True)
+    print(worst.to_string(), flush=True)
+
+
+    # Mould risk map, for exports with two or more coordinates
+
+    coord_names = field['coord_names']
+
+    if len(coord_names) >= 2:
+
+        import matplotlib.pyplot as plt
+
+        fig, ax = plt.subplots(figsize=(5.5, 3.5))
+        sc = ax.scatter(df_Mmax.loc[:, coord_names[0]],
+                        df_Mmax.loc[:, coord_names[1]],
+                        c=df_Mmax.loc[:, 'Mmax'],
+                        s=4,
+                        vmin=0.0,
+                        cmap='viridis')
+        ax.plot(worst.loc[coord_names[0]], worst.loc[coord_names[1]],
+                'rx')
+        fig.colorbar(sc, ax=ax, label='Mmax')
+        ax.set_xlabel(coord_names[0])
+        ax.set_ylabel(coord_names[1])
+        ax.set_title(case_folder)
+        fig.savefig(os.path.join(output_folder, 'Mmax.png'),
+                    dpi=200, bbox_inches='tight')
+        plt.close(fig)
+
+
+profiling.report(output_folder)
+
+print('END')
@@ -31,17 +31,22 @@ The comsol output is changed in such a way, that only single case is run
 at a time. Because of this, there is no parametric sweep/batch sweep
 being used. The grouping is removed from the code below.
 
+Parametric/batch sweep exports can again be read: the parameter columns
+before 'time' are detected from the header and each parameter value
+becomes its own case '<case_folder>_<parameter><value>', see
+results.split_sweep().
+
 """
 
 
 
 import os
-import pickle
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 
-import helper
+import analysis
+import profiling
+import results
 
 
 
@@ -53,39 +58,50 @@ case_folder = 'esimerkki'
 
 file_name_to_read = 'vuoden tulokset.txt'
 
+# Length of the analysed period at the end of the results, in the units
+# of the 'time' column (h). The last year of the simulation is used.
+# None = use all rows
+period_to_analyse = 8760.0
+
+# Yearly summary of the whole run (Mmax, means and changes from the
+# previous year for every probe) and the first year after which all
+# probes stay within analysis.convergence_tolerances. Written to
+# yearly_summary.csv, see analysis.calc_yearly_summary(). The years are
+# 8760 h blocks of simulated time. The mould index is then calculated
+# also over the whole run, which takes about as long as the rest.
+check_convergence = False
+
+# Store T, RH and M as float32, half of the memory and pickle size.
+# The mould index is calculated in float64, see results.py and README.md
+use_float32 = False
+
+
+# Stage-level timing and memory instrumentation, see profiling.py
+profile_run = False
+
 
 
 
 ############
 
+if profile_run:
+    profiling.enable()
+
 data = {}
 
 fname = os.path.join(root_folder,
                      case_folder,
                      file_name_to_read)
 
-# version 1
-# column_names = ['n_vent',
-#                 'time',
+# The column names (and units) are read from the last '%' header row,
+# e.g. '% time (h)  T_wood_e_up (degC)  RH_wood_e_up (1) ...'
+# For files without the header, the names can be given, e.g.
+# column_names = ['time',
 #                 'T_wood_e_up',
 #                 'RH_wood_e_up',
 #                 'T_wb_i_up',
-#                 'RH_wb_i_up',
-#                 'T_ins_i_up',
-#                 'RH_ins_i_up']
-
-# version 2
-column_names = ['time',
-                'T_wood_e_up',
-                'RH_wood_e_up',
-                'T_wb_i_up',
-                'RH_wb_i_up',
-                'T_ins_i_up',
-                'RH_ins_i_up',
-                'T_wood_m_up',
-                'RH_wood_m_up',
-                'T_wood_i_up',
-                'RH_wood_i_up']
+#                 'RH_wb_i_up']
+column_names = None
 
 
 
@@ -96,45 +112,101 @@ points_for_mould_index = [['wood_e_up', 'vs', 'vs', 0.5],
                           ['wood_i_up', 'vs', 'vs', 0.5]]
 
 
-print('Reading file...')
+# Only the columns that are needed are read, as name patterns.
+# None = all columns, e.g. ['T_*', 'RH_*'] = all probes
+usecols = [f'{quantity}_{point[0]}' for point in points_for_mould_index \
+           for quantity in ('T', 'RH')]
+
+
+with profiling.stage('read results'):
+
+    print('Reading file...')
+
+    # All rows, the analysed period is selected below
+    df_all = results.read_results(fname,
+                                  column_names,
+                                  period_to_analyse=None,
+                                  dtype=np.float32 if use_float32 else np.float64,
+                                  usecols=usecols)
+
+    # Parametric sweep exports (parameter columns before 'time', e.g.
+    # 'n_vent') are split into cases, otherwise there is one case
+    cases_all = results.split_sweep(df_all)
+
+    del df_all
+
+    if len(cases_all) > 1:
+        print(f'Sweep with {len(cases_all)} cases: {list(cases_all.keys())}')
+
+
+if check_convergence:
+
+    with profiling.stage('yearly summary'):
+
+        print('Check convergence of the spin-up...')
 
-df_all = pd.read_csv(fname,
-                 sep=r'\s+',
-                 skiprows=5,
-                 header=None,
-                 names=column_names,
-                 dtype=np.float64)
+        # The mould index over the whole run
+        cases_all = results.add_mould_indices_cases(cases_all,
+                                                    points_for_mould_index)
 
+        points = [point[0] for point in points_for_mould_index]
 
-df = df_all.iloc[-8760:, :].copy()
-df.reset_index(drop=True,
-               inplace=True)
+        yearly = []
 
+        for label, df_case in cases_all.items():
 
-print('Calculate mould index...')
+            df_yearly = analysis.calc_yearly_summary(df_case, points)
 
-# Go through all the probe points and calculate mould index for
-# cols 
-for point in points_for_mould_index:
-    
-    M_name = 'M_' + point[0]
-    T_data = df.loc[:, 'T_' + point[0]]
-    RH_data = df.loc[:, 'RH_' + point[0]]
-    MG_speedclass = point[1]
-    MG_maxclass = point[2]
-    C_mat = point[3]
-    
-    df.loc[:,M_name] = helper.MI(T_data,
-                                     RH_data,
-                                     MG_speedclass,
-                                     MG_maxclass,
-                                     C_mat)
+            year_converged = analysis.first_converged_year(df_yearly)
+
+            n_years = df_yearly.loc[:, 'year'].max() + 1
+
+            prefix = f'{label}: ' if label != '' else ''
+
+            if not df_yearly.loc[:, 'complete'].all():
+                print(f'{prefix}The last year is incomplete and is not '
+                      f'used in the convergence check', flush=True)
+
+            if year_converged is None:
+                print(f'{prefix}Not converged within {n_years} years',
+                      flush=True)
+            else:
+                print(f'{prefix}Converged after {year_converged + 1} '
+                      f'of {n_years} years', flush=True)
+
+            df_yearly.insert(0, 'case', label)
+            yearly.append(df_yearly)
+
+        df_yearly = pd.concat(yearly, ignore_index=True)
+
+        if len(cases_all) == 1:
+            df_yearly = df_yearly.drop(columns='case')
+
+        df_yearly.to_csv(os.path.join(root_folder,
+                                      case_folder,
+                                      'yearly_summary.csv'),
+                         index=False)
+
+
+# The analysed period of each case
+cases = {label: results.select_period(df_case, period_to_analyse) \
+         for label, df_case in cases_all.items()}
+
+del cases_all
+
+
+with profiling.stage('mould index'):
+
+    print('Calculate mould index...')
+
+    # All probe points, the cases with the same output times together
+    cases = results.add_mould_indices_cases(cases, points_for_mould_index)
 
 
 
 case_name = case_folder.replace(' ','_')
 
-data[case_name] = df
+data.update(results.store_cases(case_name, cases))
 
 
 
@@ -145,18 +217,22 @@ data[case_name] = df
 
 # Here the results data is saved to output folder
 
-print('Export to pickle file...')
+with profiling.stage('write pickle'):
 
-file_name_to_write = f'{file_name_to_read.replace(".txt","")}_results.pickle'
+    print('Export to pickle file...')
 
+    file_name_to_write = f'{file_name_to_read.replace(".txt","")}_results.pickle'
 
-fname = os.path.join(root_folder,
-                     case_folder,
-                     file_name_to_write)
 
-with open(fname, 'wb') as f:
-    pickle.dump(data, f)
+    fname = os.path.join(root_folder,
+                         case_folder,
+                         file_name_to_write)
+
+    results.write_store(data, fname)
+
 
+profiling.report(os.path.join(root_folder,
+                              case_folder))
 
 print('END')
 
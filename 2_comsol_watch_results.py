@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+
+Follow the results files of running COMSOL simulations
+
+The rows appended to the results files are read as they come, and the
+mould index of the probe points is updated from the previous rows. The
+running values (M, Mmax, hours RH > 95 %) of all cases are written to
+status_file, so that the cases that are already over Mmax_limit can be
+stopped early. See watch.py.
+
+The mould index is calculated from the beginning of the run, use
+2_comsol_read_results.py for the final results of the last year.
+
+"""
+
+import os
+
+import watch
+
+
+
+root_folder = r'S:\91202_Rakfys_yhteiset\Tiiliverhous\2_Laskenta\narvi stuff'
+
+case_folders = ['esimerkki']
+
+file_name_to_read = 'vuoden tulokset.txt'
+
+
+points_for_mould_index = [['wood_e_up', 'vs', 'vs', 0.5],
+                          ['wb_i_up', 'mr', 'mr', 0.1],
+                          ['ins_i_up', 'mr', 'mr', 0.1],
+                          ['wood_m_up', 'vs', 'vs', 0.5],
+                          ['wood_i_up', 'vs', 'vs', 0.5]]
+
+
+# Status of all cases, json
+status_file = os.path.join(root_folder,
+                           'watch_status.json')
+
+# [poll_interval] = s, how often the files are checked for new rows
+poll_interval = 60.0
+
+# A case is marked 'over_limit' when Mmax of any point reaches this
+# None = not used
+Mmax_limit = 3.0
+
+# [idle_timeout] = s, the follow-up of a file ends when it has not grown
+# in this time, None = follow until stopped (Ctrl+C)
+idle_timeout = 3600.0
+
+
+
+
+############
+
+fnames = [os.path.join(root_folder,
+                       case_folder,
+                       file_name_to_read) for case_folder in case_folders]
+
+final = watch.run(fnames,
+                  status_file,
+                  points_for_mould_index,
+                  poll_interval=poll_interval,
+                  Mmax_limit=Mmax_limit,
+                  idle_timeout=idle_timeout)
+
+for fname, status in final.items():
+    print(f'{fname}: {status["status"]}, {status["n_rows"]} rows, '
+          f'Mmax = {status["Mmax"]}', flush=True)
+
+print('END')
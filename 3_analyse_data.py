@@ -6,12 +6,10 @@ Created on Fri Jun 28 15:56:23 2024
 """
 
 import os
-import pickle
-import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
 
-import helper
+import analysis
+import profiling
+import results
 
 
 
@@ -32,10 +30,17 @@ figseiz = (5.5, 3.5)
 dpi_val = 200
 
 
+# Stage-level timing and memory instrumentation, see profiling.py
+profile_run = False
+
+
 
 
 ####################
 
+if profile_run:
+    profiling.enable()
+
 # 
 
 output_folder = os.path.join(root_folder,
@@ -53,8 +58,8 @@ fname = os.path.join(root_folder,
                      case_folder,
                      file_name_to_read)
 
-with open(fname, 'rb') as f:
-    data = pickle.load(f)
+with profiling.stage('read pickle'):
+    data = results.read_store(fname)
 
 
 
@@ -64,62 +69,17 @@ with open(fname, 'rb') as f:
 
 ## Time series
 
-indicators_list = []
-
-for key in data.keys():
-    
-    cols_to_plot = [x for x in data[key].columns if 'T_' in x or 'RH_' in x or 'M_' in x]
-    
-    
-    
-    for col in cols_to_plot:
-    
-        # plot
-        
-        fig, ax = plt.subplots(figsize=figseiz)
-        
-        data[key].loc[:,col].plot(ax=ax,
-                                  grid=True,
-                                  lw=0.5)
-        ax.set_xlabel('Tuntia vuoden alusta')
-        ax.set_ylabel(col)
-        ax.set_title(key)
-        
-        fname = os.path.join(output_folder,
-                             f'{key}_{col}.png')
-        fig.savefig(fname, dpi=dpi_val, bbox_inches='tight')
-        plt.close(fig)
-        
-        
-        # Indicators
-        
-        if 'M_' in col:
-            Mmax = data[key].loc[:,col].max()
-            
-            indicators_list.append([key, col, 'Mmax', Mmax])
-        
-        if 'RH_' in col:
-            
-            RH_over_95 = (data[key].loc[:,col] > 95.0).sum()
-            
-            indicators_list.append([key, col, 'RH_over_95', RH_over_95])
+analysis.plot_time_series(data, output_folder, figseiz, dpi_val)
 
 
 # Save indicators to file
 
-df_indicators = pd.DataFrame(data=indicators_list, 
-                                  columns=['key','col','indicator','value'])
-df_indicators.index.name = 'index'
-
-fname = os.path.join(output_folder,
-                     'indicators.csv')
-df_indicators.to_csv(fname)
-
-
-
-
-
-
+with profiling.stage('write indicators'):
+    df_indicators = analysis.calc_indicators(data)
 
+    fname = os.path.join(output_folder,
+                         'indicators.csv')
+    df_indicators.to_csv(fname)
 
 
+profiling.report(output_folder)
\ No newline at end of file
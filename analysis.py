@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Figures and indicators from the results store, used by 3_analyse_data.py
+and the pipeline runner.
+
+Indicators:
+    Mmax = maximum mould index
+    RH_over_95 = number of rows with RH > 95 %
+
+Yearly summary of multi-year (spin-up) runs, see calc_yearly_summary():
+    Mmax, T_mean, RH_mean, h_RH_over_95 for each simulated year and
+    probe, and the change from the previous year (dMmax, ...).
+    first_converged_year() gives the first year after which all probes
+    stay within the tolerances, i.e. the number of years that the
+    spin-up actually needs.
+
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+import profiling
+import results
+
+
+
+
+def cols_to_plot(df):
+
+    return([x for x in df.columns if 'T_' in x or 'RH_' in x or 'M_' in x])
+
+
+
+def calc_indicators(data):
+    # data = dict, case name -> DataFrame
+    # Returns DataFrame with columns key, col, indicator, value
+
+    indicators_list = []
+
+    for key in data.keys():
+
+        for col in cols_to_plot(data[key]):
+
+            if 'M_' in col:
+                Mmax = data[key].loc[:,col].max()
+
+                indicators_list.append([key, col, 'Mmax', Mmax])
+
+            if 'RH_' in col:
+
+                RH_over_95 = (data[key].loc[:,col] > 95.0).sum()
+
+                indicators_list.append([key, col, 'RH_over_95', RH_over_95])
+
+    df_indicators = pd.DataFrame(data=indicators_list,
+                                 columns=['key','col','indicator','value'])
+    df_indicators.index.name = 'index'
+
+    return(df_indicators)
+
+
+
+# Largest accepted change from the previous year
+convergence_tolerances = {'Mmax': 0.1,
+                          'T_mean': 0.05,
+                          'RH_mean': 0.5}
+
+
+
+def calc_yearly_summary(df, points, time_col='time', hours_per_year=8760.0):
+    # Per-year summary of all probes, for the full results of a
+    # multi-year run
+    # points = probe names, columns T_<point>, RH_<point> and M_<point>
+    #          (M is optional)
+    # [time_col] = h from the start of the simulation
+    # Returns DataFrame with columns point, year, hours, complete, Mmax,
+    # T_mean, RH_mean, h_RH_over_95, dMmax, dT_mean, dRH_mean,
+    # dh_RH_over_95
+    # year = 0, 1, ... = blocks of hours_per_year (8760 h) of simulated
+    # time from t = 0, not calendar years. A 10-year run has 10 blocks
+    # both with t = 0...87599 h and t = 0...87600 h, the value at the
+    # end of the last block belongs to the last block.
+    # hours = h, time covered by the rows of the block
+    # complete = False if the block covers less than 99 % of
+    #            hours_per_year, e.g. a run that stops in the middle of
+    #            a year. Such blocks are not used in first_converged_year().
+    # The means and hours are weighted with the time steps.
+
+    time = df.loc[:, time_col].values.astype(np.float64)
+
+    n_years = max(1, int(np.ceil(time[-1]/hours_per_year - 1e-9)))
+
+    year = np.floor(time/hours_per_year + 1e-9).astype(np.int64)
+    np.clip(year, 0, n_years-1, out=year)
+
+    # Time step of each row, the first row has the step of the second
+    dt = np.diff(time, prepend=time[0])
+    if len(dt) > 1:
+        dt[0] = dt[1]
+
+    # Rows of each year, the years are contiguous
+    starts = np.flatnonzero(np.diff(year, prepend=-1))
+    years = year[starts]
+
+    hours = np.add.reduceat(dt, starts)
+
+    w = hours[:, np.newaxis]
+
+    T = df.loc[:, ['T_' + p for p in points]].values.astype(np.float64)
+    RH = df.loc[:, ['RH_' + p for p in points]].values.astype(np.float64)
+
+    summary = {'T_mean': np.add.reduceat(T*dt[:, np.newaxis], starts) / w,
+               'RH_mean': np.add.reduceat(RH*dt[:, np.newaxis], starts) / w,
+               'h_RH_over_95': np.add.reduceat((RH > 95.0)*dt[:, np.newaxis],
+                                               starts)}
+
+    M_cols = ['M_' + p for p in points]
+    if all(col in df.columns for col in M_cols):
+        M = df.loc[:, M_cols].values.astype(np.float64)
+        summary['Mmax'] = np.maximum.reduceat(M, starts)
+
+    quantities = [q for q in ['Mmax', 'T_mean', 'RH_mean', 'h_RH_over_95'] \
+                  if q in summary]
+
+    # (n_years, n_points) -> one row per point and year
+    df_summary = pd.DataFrame({'point': np.repeat(points, len(years)),
+                               'year': np.tile(years, len(points)),
+                               'hours': np.tile(hours, len(points)),
+                               'complete': np.tile(hours >= 0.99*hours_per_year,
+                                                   len(points))})
+
+    for q in quantities:
+        x = summary[q]
+        dx = np.full(x.shape, np.nan)
+        dx[1:, :] = np.diff(x, axis=0)
+        df_summary[q] = x.T.ravel()
+        df_summary['d' + q] = dx.T.ravel()
+
+    return(df_summary)
+
+
+
+def first_converged_year(df_summary, tolerances=None):
+    # First year from which on the change from the previous year stays
+    # within the tolerances for all probes
+    # df_summary = calc_yearly_summary()
+    # tolerances = dict quantity -> largest accepted |change|,
+    #              None = convergence_tolerances
+    # Returns the year (0, 1, ...) or None if not converged.
+    # The run needs year + 1 years to reach the converged state.
+    # Incomplete years (column 'complete') are left out.
+
+    if tolerances is None:
+        tolerances = convergence_tolerances
+
+    if 'complete' in df_summary.columns:
+        df_summary = df_summary.loc[df_summary.loc[:, 'complete'], :]
+
+    if len(df_summary) == 0:
+        return(None)
+
+    tolerances = {q: tol for q, tol in tolerances.items() \
+                  if q in df_summary.columns}
+
+    years = np.sort(df_summary.loc[:, 'year'].unique())
+
+    ok = np.ones(len(df_summary), dtype=bool)
+    for q, tol in tolerances.items():
+        ok &= np.abs(df_summary.loc[:, 'd' + q].values) <= tol
+
+    # The first year has no previous year
+    ok_year = pd.Series(ok, index=df_summary.loc[:, 'year'].values) \
+        .groupby(level=0).all().reindex(years).values
+    ok_year[0] = False
+
+    # Converged from this year to the end
+    ok_from = np.logical_and.accumulate(ok_year[::-1])[::-1]
+
+    if not ok_from.any():
+        return(None)
+
+    return(int(years[np.argmax(ok_from)]))
+
+
+
+def plot_time_series(data, output_folder, figsize=(5.5, 3.5), dpi_val=200):
+    # One png file for each case and column
+    # Returns list of file names
+    # matplotlib is imported only here, see benchmark_import_time.py
+
+    import matplotlib.pyplot as plt
+
+    fnames = []
+
+    for key in data.keys():
+
+        for col in cols_to_plot(data[key]):
+
+            with profiling.stage('plot'):
+
+                fig, ax = plt.subplots(figsize=figsize)
+
+                data[key].loc[:,col].plot(ax=ax,
+                                          grid=True,
+                                          lw=0.5)
+                ax.set_xlabel('Tuntia vuoden alusta')
+                ax.set_ylabel(col)
+                ax.set_title(key)
+
+                fname = os.path.join(output_folder,
+                                     f'{key}_{col}.png')
+                fig.savefig(fname, dpi=dpi_val, bbox_inches='tight')
+                plt.close(fig)
+
+            fnames.append(fname)
+
+    return(fnames)
+
+
+
+
+def write_indicators(fname_store, fname_out):
+    # Results store -> indicators.csv
+
+    with profiling.stage('read pickle'):
+        data = results.read_store(fname_store)
+
+    with profiling.stage('write indicators'):
+        calc_indicators(data).to_csv(fname_out)
+
+    return(fname_out)
+
+
+
+def write_figures(fname_store, output_folder, figsize=(5.5, 3.5), dpi_val=200):
+    # Results store -> png files
+
+    if not os.path.exists(output_folder):
+        os.makedirs(output_folder)
+
+    with profiling.stage('read pickle'):
+        data = results.read_store(fname_store)
+
+    return(plot_time_series(data, output_folder, figsize, dpi_val))
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+
+Import-time benchmark for the core modules.
+
+The core modules (helper, psychrometrics, rolling, profiling) are
+enough for e.g. helper.MI() and helper.calc_vsat(). They must not
+import pandas, pvlib or matplotlib at import time; those are imported
+when a function that needs them is first called.
+
+Each import is timed in a fresh python process, because a module is
+imported only once per process. The minimum of n_repeats runs is used.
+For comparison, the import times of the heavy packages are also shown.
+
+The script exits with code 1 if the core import is over the budget or
+if it has imported any of the heavy packages, so it can be run e.g.
+after changes to the imports:
+
+    python benchmark_import_time.py
+
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+
+
+
+# Imported together in one process
+core_modules = ['helper', 'psychrometrics', 'rolling', 'profiling']
+
+# Must not be imported by the core modules
+heavy_modules = ['pandas', 'pvlib', 'matplotlib', 'scipy']
+
+# Budget for the core import, s
+# numpy alone takes about 0.1 s on a workstation
+budget_s = 0.5
+
+n_repeats = 5
+
+
+
+
+def time_import(modules):
+    # Returns (import time in s, heavy modules that were imported)
+
+    code = ('import sys, time, json\n'
+            't0 = time.perf_counter()\n'
+            f'for name in {modules!r}:\n'
+            '    __import__(name)\n'
+            'dt = time.perf_counter() - t0\n'
+            f'loaded = [m for m in {heavy_modules!r} if m in sys.modules]\n'
+            'print(json.dumps([dt, loaded]))\n')
+
+    out = subprocess.run([sys.executable, '-c', code],
+                         capture_output=True,
+                         text=True,
+                         check=True,
+                         cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    dt, loaded = json.loads(out.stdout.splitlines()[-1])
+
+    return(dt, loaded)
+
+
+
+
+if __name__ == '__main__':
+
+    cases = [core_modules] + [[name] for name in heavy_modules]
+
+    results = {}
+
+    for modules in cases:
+
+        times = []
+
+        for idx in range(n_repeats):
+            dt, loaded = time_import(modules)
+            times.append(dt)
+
+        results[', '.join(modules)] = (min(times), loaded)
+
+
+    print(f'{"modules":50s} {"import, s":>10s}')
+
+    for key, (dt, loaded) in results.items():
+        print(f'{key:50s} {dt:10.3f}')
+
+
+    dt_core, loaded_core = results[', '.join(core_modules)]
+
+    is_ok = True
+
+    if len(loaded_core) > 0:
+        print(f'FAIL: core import loads {", ".join(loaded_core)}')
+        is_ok = False
+
+    if dt_core > budget_s:
+        print(f'FAIL: core import {dt_core:.3f} s > budget {budget_s:.3f} s')
+        is_ok = False
+
+    if is_ok:
+        print(f'OK: core import {dt_core:.3f} s <= budget {budget_s:.3f} s')
+
+    sys.exit(0 if is_ok else 1)
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Command line entry point for batch runs. All jobs of the config files
+are run in one Python process, so pvlib, pandas and matplotlib are
+imported only once, and the same climate file or results store is read
+only once for several jobs. Jobs with the same climate file and
+different surfaces also share the solar position and the other
+surface-independent transposition terms (helper.calc_sky_terms()).
+
+    python cli.py generate jobs.toml
+    python cli.py read-results cases.toml
+    python cli.py analyse cases.yaml --profile
+
+The config files are TOML (.toml) or YAML (.yaml/.yml, needs PyYAML).
+The values in the 'defaults' table are used for all jobs, and each item
+of the 'jobs' list gives one job. The keys are the same as the
+constants of the corresponding scripts.
+
+
+# Example, jobs.toml for generate (1_comsol_wac_to_comsol.py)
+
+[defaults]
+output_folder = 'C:/Temp/wac_for_comsol'
+start_time = '2011-01-01 00:00:00'
+terrain_category = 'I'
+z_building = 6.0
+slope_as_quotient = 100000.0
+transposition_model = 'perez'
+store_folder = 'C:/Temp/comsol_store'
+
+[[jobs]]
+wac_file = 'input/Jokioinen 2011 RCP85-2080.wac'
+surface_azimuth = 180.0
+
+[[jobs]]
+wac_file = 'input/Jokioinen 2011 RCP85-2080.wac'
+surface_azimuth = 270.0
+
+
+# Example, cases.toml for read-results (2_comsol_read_results.py)
+# and analyse (3_analyse_data.py)
+
+[defaults]
+root_folder = 'S:/91202_Rakfys_yhteiset/Tiiliverhous/2_Laskenta/narvi stuff'
+file_name_to_read = 'vuoden tulokset.txt'
+period_to_analyse = 8760.0
+usecols = ['T_wood_*', 'RH_wood_*']
+points_for_mould_index = [['wood_e_up', 'vs', 'vs', 0.5]]
+dpi_val = 200
+
+[[jobs]]
+case_folder = 'esimerkki'
+
+[[jobs]]
+case_folder = 'esimerkki 2'
+
+
+With float32 = true the derived series (generate) or the results
+store (read-results) are kept as float32, see results.py.
+
+TOML has no None value, so period_to_analyse = 'all' is used to
+analyse all rows.
+
+The column names are read from the '%' header of the results file.
+column_names and skiprows can be given for files without a header,
+and usecols (name patterns) limits the columns that are read.
+
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+import analysis
+import comsol_inputs
+import helper
+import profiling
+import results
+
+
+
+
+## Config files
+
+def read_config(fname):
+    # Returns list of job dicts, defaults merged into each job
+
+    if fname.endswith('.toml'):
+        # tomllib is in the standard library from Python 3.11 on
+        try:
+            import tomllib
+        except ModuleNotFoundError:
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise ImportError('Reading TOML config files needs Python '
+                                  '3.11 or tomli, e.g. "pip install tomli"')
+        with open(fname, 'rb') as f:
+            config = tomllib.load(f)
+
+    elif fname.endswith(('.yaml', '.yml')):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError('Reading YAML config files needs PyYAML, '
+                              'e.g. "pip install pyyaml"')
+        with open(fname, 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f)
+
+    else:
+        raise ValueError(f'Unknown config file type: {fname}')
+
+    defaults = config.get('defaults', {})
+
+    return([{**defaults, **job} for job in config.get('jobs', [])])
+
+
+
+
+## Caches over jobs
+
+# (file name, modification time) -> data, at most cache_size files each,
+# the least recently used file is dropped first
+_wac_cache = {}
+_store_cache = {}
+cache_size = 4
+
+
+def _cached(cache, fname, reader):
+    # The file is read again, if it has been modified
+
+    key = (os.path.abspath(fname), os.stat(fname).st_mtime_ns)
+
+    if key in cache:
+        # Most recently used last
+        cache[key] = cache.pop(key)
+        return(cache[key])
+
+    # Earlier versions of the file are not needed any more
+    for key_old in [k for k in cache if k[0] == key[0]]:
+        del cache[key_old]
+
+    while len(cache) >= cache_size:
+        cache.pop(next(iter(cache)))
+
+    cache[key] = reader(fname)
+
+    return(cache[key])
+
+
+
+
+## Jobs
+
+def _dtype(job):
+
+    if job.get('float32', False):
+        return(np.float32)
+    else:
+        return(np.float64)
+
+
+
+def generate(job):
+    # As 1_comsol_wac_to_comsol.py
+    # Returns dict: quantity -> output file name
+
+    with profiling.stage('read wac'):
+        df, header = _cached(_wac_cache, job['wac_file'], helper.read_wac)
+
+    series = comsol_inputs.calc_series(df, header,
+                                       start_time=job.get('start_time',
+                                                          '2011-01-01 00:00:00'),
+                                       surface_azimuth=job.get('surface_azimuth', 180.0),
+                                       terrain_category=job.get('terrain_category', 'I'),
+                                       z_building=job.get('z_building', 6.0),
+                                       slope_as_quotient=job.get('slope_as_quotient',
+                                                                 100000.0),
+                                       dtype=_dtype(job),
+                                       transposition_model=job.get('transposition_model',
+                                                                   'isotropic'))
+
+    output_folder = job['output_folder']
+
+    if not os.path.exists(output_folder):
+        os.makedirs(output_folder)
+
+    with profiling.stage('write files'):
+        output_files = comsol_inputs.save_series(series,
+                                                 output_folder,
+                                                 os.path.basename(job['wac_file'])[:-4],
+                                                 header['time_step'],
+                                                 store_folder=job.get('store_folder'))
+
+    return(output_files)
+
+
+
+def read_results(job):
+    # As 2_comsol_read_results.py
+    # Returns the file name of the results store
+
+    file_name_to_read = job['file_name_to_read']
+
+    folder = os.path.join(job['root_folder'], job['case_folder'])
+
+    file_name_to_write = f'{file_name_to_read.replace(".txt","")}_results.pickle'
+
+    period_to_analyse = job.get('period_to_analyse', 8760.0)
+
+    if period_to_analyse == 'all':
+        period_to_analyse = None
+
+    fname_store = os.path.join(folder, file_name_to_write)
+
+    results.make_store(os.path.join(folder, file_name_to_read),
+                       fname_store,
+                       job['case_folder'].replace(' ','_'),
+                       job.get('column_names'),
+                       job['points_for_mould_index'],
+                       skiprows=job.get('skiprows'),
+                       period_to_analyse=period_to_analyse,
+                       dtype=_dtype(job),
+                       usecols=job.get('usecols'))
+
+    return(fname_store)
+
+
+
+def analyse(job):
+    # As 3_analyse_data.py
+    # Returns the file name of the indicators file
+
+    file_name_to_read = job.get('file_name_to_read', 'vuoden tulokset.txt')
+
+    if file_name_to_read.endswith('.txt'):
+        file_name_to_read = f'{file_name_to_read.replace(".txt","")}_results.pickle'
+
+    folder = os.path.join(job['root_folder'], job['case_folder'])
+
+    output_folder = os.path.join(folder, 'figures')
+
+    if not os.path.exists(output_folder):
+        os.makedirs(output_folder)
+
+    with profiling.stage('read pickle'):
+        data = _cached(_store_cache,
+                       os.path.join(folder, file_name_to_read),
+                       results.read_store)
+
+    analysis.plot_time_series(data,
+                              output_folder,
+                              tuple(job.get('figsize', (5.5, 3.5))),
+                              job.get('dpi_val', 200))
+
+    with profiling.stage('write indicators'):
+        fname = os.path.join(output_folder,
+                             'indicators.csv')
+        analysis.calc_indicators(data).to_csv(fname)
+
+    return(fname)
+
+
+
+commands = {'generate': generate,
+            'read-results': read_results,
+            'analyse': analyse}
+
+
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description='Batch runs of the '
+                                     '1_/2_/3_ steps from config files')
+    parser.add_argument('command', choices=list(commands.keys()))
+    parser.add_argument('config_files', nargs='+',
+                        help='TOML or YAML files with the jobs')
+    parser.add_argument('--profile', action='store_true',
+                        help='print stage timings at the end, see profiling.py')
+
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        profiling.enable()
+
+    jobs = []
+    for fname in args.config_files:
+        jobs.extend(read_config(fname))
+
+    func = commands[args.command]
+
+    n_failed = 0
+
+    for idx, job in enumerate(jobs):
+
+        t_start = time.perf_counter()
+
+        try:
+            output = func(job)
+            print(f'Job {idx+1}/{len(jobs)} ok, ' \
+                  f'{time.perf_counter()-t_start:.1f} s: {output}', flush=True)
+
+        except Exception as e:
+            n_failed += 1
+            print(f'Job {idx+1}/{len(jobs)} failed: {e!r}', flush=True)
+
+    profiling.report()
+
+    return(1 if n_failed > 0 else 0)
+
+
+
+
+if __name__ == '__main__':
+    sys.exit(main())
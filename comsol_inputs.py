@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+COMSOL input files from a WUFI .wac file, as a function that can be
+called for many files, e.g. from a process pool.
+
+Indoor:
+    Temperature
+    Relative humidity
+
+Outdoor:
+    Temperature
+    Relative humidity
+    Wind-driven rain
+    Long-wave radiation
+    Short-wave radiation
+
+The output file names start with the name of the wac file, so the
+outputs of different climate files can be in the same folder.
+
+The steps are also available separately with intermediate pickle files
+(write_climate, write_series, write_comsol_files), so that the pipeline
+runner (pipeline.py) can rebuild only the steps whose inputs changed.
+
+"""
+
+import os
+import pickle
+import numpy as np
+import pandas as pd
+
+import helper
+import profiling
+import resampling
+
+
+
+
+def calc_series(df, header,
+                start_time='2011-01-01 00:00:00',
+                surface_azimuth=180.0,
+                terrain_category='I',
+                z_building=6.0,
+                slope_as_quotient=100000.0,
+                dtype=None,
+                transposition_model='isotropic'):
+    # df, header = helper.read_wac()
+    # start_time = local standard time (no DST) of the first data row
+    # [surface_azimuth] = deg, degrees clockwise from north
+    # terrain_category = {'0','I','II','III', 'IV'}
+    # [z_building] = m
+    # slope_as_quotient = dy/dx, wall = large value
+    # dtype = e.g. np.float32 to store the series in half of the memory,
+    #         the calculations are done in float64. None = float64
+    # transposition_model = 'isotropic', 'haydavies' or 'perez',
+    #                       see helper.calc_sky_terms()
+    # Returns dict: quantity -> (values, end of the output file name)
+
+    series = {}
+
+    time_step = header['time_step']
+
+    # The wac file does not give the start date
+    time_fin_normal, time_utc = helper.calc_time_axis(start_time,
+                                                      header['n_data_lines'],
+                                                      time_step,
+                                                      header['timezone'])
+
+
+    ## Indoor conditions
+
+    with profiling.stage('indoor conditions'):
+
+        Ti, vi, phii = helper.calc_indoor_conditions(Te=df.loc[:,'TA'],
+                                                     RHe=df.loc[:,'HREL'],
+                                                     time_step=time_step)
+
+        series['Ti'] = (Ti, 'Ti')
+
+        series['phii'] = (phii, 'phii')
+
+
+    ## Outdoor conditions
+
+    with profiling.stage('outdoor conditions'):
+
+        series['Te'] = (df.loc[:,'TA'], 'Te')
+
+        series['RHe'] = (100 * df.loc[:,'HREL'], 'RHe')
+
+
+    # Wind-driven rain (WDR) to wall surface
+
+    with profiling.stage('wind-driven rain'):
+
+        I_WS = helper.calc_WDR(ws=df.loc[:,'WS'],
+                               wd=df.loc[:,'WD'],
+                               precip_horizontal=df.loc[:,'RN'],
+                               Te=df.loc[:,'TA'],
+                               terrain_category=terrain_category,
+                               z_building=z_building,
+                               Theta_azimuth=surface_azimuth)
+
+        series['wdr'] = (I_WS, f'wdr surfaz{surface_azimuth}' \
+                               f' tercat{terrain_category} z{z_building:.1f}')
+
+
+    # Long-wave radiation towards surface
+
+    with profiling.stage('long-wave radiation'):
+
+        surface_tilt = np.arctan(slope_as_quotient)*(180/np.pi)
+        LWdn = df.loc[:,'ILAH']
+        Te = df.loc[:,'TA']
+        LW_incoming = helper.calc_LWincoming(slope_as_quotient, LWdn, Te,
+                                             time_step)
+
+        series['LWincoming'] = (LW_incoming,
+                                f'LWincoming_total {surface_tilt:.2f}')
+
+
+    # Solar radiation
+
+    with profiling.stage('solar radiation'):
+
+        SW_incoming = calc_sunrad(df, header, time_utc,
+                                  surface_tilt, surface_azimuth,
+                                  transposition_model)
+
+        series['sunrad'] = (SW_incoming, f'sunrad surfaz{surface_azimuth}' \
+                                         f' slope{surface_tilt:.2f}')
+
+    if dtype is not None:
+        series = {quantity: (np.asarray(x).astype(dtype), file_name_end) \
+                  for quantity, (x, file_name_end) in series.items()}
+
+    return(series)
+
+
+
+def calc_sunrad(df, header, time_utc, surface_tilt, surface_azimuth,
+                transposition_model='isotropic'):
+    # Solar radiation to the surface at the time steps of the wac file
+    # time_utc = see helper.calc_time_axis()
+    # [surface_tilt], [surface_azimuth] = deg
+
+    time_step = header['time_step']
+
+    # Radiation values are for the next time step
+    time_utc_plusHalfStep = time_utc + pd.Timedelta(hours=0.5*time_step)
+
+    location = {'latitude': header['latitude'],
+                'longitude': header['longitude'],
+                'altitude': header['altitude']}
+
+    Idif_hor = df.loc[:,'ISD']
+    Idir_hor = df.loc[:,'ISDH']
+
+    # Air temperature in the middle of the time steps
+    Te_betweens = resampling.resample(df.loc[:,'TA'],
+                                      kind_in='instant',
+                                      kind_out='instant',
+                                      start_out=0.5)
+
+    SW_incoming = helper.calc_solar_radiation_to_surface(time_utc_plusHalfStep,
+                                                        location,
+                                                        surface_tilt,
+                                                        surface_azimuth,
+                                                        Idif_hor,
+                                                        Idir_hor,
+                                                        Te_betweens,
+                                                        transposition_model)
+
+    return(SW_incoming)
+
+
+
+def save_series(series, output_folder, file_name_start, time_step=1.0,
+                store_folder=None):
+    # Writes the COMSOL input files of calc_series()
+    # store_folder = content-addressed storage of the files, see
+    #                helper.save_to_file_for_comsol(). None = no storage
+    # Returns dict: quantity -> output file name
+
+    output_files = {}
+
+    for quantity, (x, file_name_end) in series.items():
+
+        fname_out = os.path.join(output_folder,
+                                 f'{file_name_start} {file_name_end}.csv')
+
+        helper.save_to_file_for_comsol(x, fname_out, time_step,
+                                       store_folder=store_folder)
+
+        output_files[quantity] = fname_out
+
+    return(output_files)
+
+
+
+
+def generate_from_wac(fname,
+                      output_folder,
+                      start_time='2011-01-01 00:00:00',
+                      surface_azimuth=180.0,
+                      terrain_category='I',
+                      z_building=6.0,
+                      slope_as_quotient=100000.0,
+                      transposition_model='isotropic',
+                      store_folder=None):
+    # fname = path to the wac file
+    # store_folder = see save_series()
+    # Other arguments as in calc_series()
+    # Returns dict: quantity -> output file name
+
+    with profiling.stage('read wac'):
+
+        # Location, time zone, time step and number of rows are read from
+        # the header. Any number of rows is accepted, e.g. 30 years
+        # with leap days.
+
+        df, header = helper.read_wac(fname)
+
+    series = calc_series(df, header,
+                         start_time=start_time,
+                         surface_azimuth=surface_azimuth,
+                         terrain_category=terrain_category,
+                         z_building=z_building,
+                         slope_as_quotient=slope_as_quotient,
+                         transposition_model=transposition_model)
+
+    with profiling.stage('write files'):
+
+        output_files = save_series(series,
+                                   output_folder,
+                                   os.path.basename(fname)[:-4],
+                                   header['time_step'],
+                                   store_folder=store_folder)
+
+    return(output_files)
+
+
+
+
+## Steps with intermediate files, see pipeline.py
+
+def write_climate(fname_wac, fname_out):
+    # Parsed climate: wac file -> pickle of (df, header)
+
+    df, header = helper.read_wac(fname_wac)
+
+    with open(fname_out, 'wb') as f:
+        pickle.dump((df, header), f)
+
+    return(fname_out)
+
+
+
+def write_series(fname_climate, fname_out, **kwargs):
+    # Derived series: parsed climate -> pickle of dict with keys
+    # 'series' (see calc_series) and 'time_step'
+    # kwargs are given to calc_series()
+
+    with open(fname_climate, 'rb') as f:
+        df, header = pickle.load(f)
+
+    series = calc_series(df, header, **kwargs)
+
+    with open(fname_out, 'wb') as f:
+        pickle.dump({'series': series,
+                     'time_step': header['time_step']}, f)
+
+    return(fname_out)
+
+
+
+def write_comsol_files(fname_series, output_folder, file_name_start,
+                       store_folder=None):
+    # COMSOL input files from the derived series
+    # store_folder = see save_series()
+
+    if not os.path.exists(output_folder):
+        os.makedirs(output_folder)
+
+    with open(fname_series, 'rb') as f:
+        d = pickle.load(f)
+
+    return(save_series(d['series'],
+                       output_folder,
+                       file_name_start,
+                       d['time_step'],
+                       store_folder=store_folder))
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Ranking of the years of a long climate record (e.g. 30 years) by
+moisture load, so that only the most critical years are simulated
+with COMSOL.
+
+Indices for each year and surface orientation:
+    wdr_sum = wind-driven rain to the wall, kg/m2 (helper.calc_WDR_grid)
+    h_RHcrit = hours when the outdoor surface is at or above the
+               critical relative humidity of mould growth
+               (helper.MI_RHcrit). The surface is taken as wet
+               (RH = 100 %) in the hours with driving rain, otherwise
+               the relative humidity of the outdoor air is used.
+    h_wet_spells = hours in wet spells of at least spell_min hours,
+                   where the surface is above RHcrit and the solar
+                   radiation to the surface is below radiation_limit
+    longest_wet_spell = h, longest such spell of the year
+
+All years and orientations are calculated at the same time with
+arrays of shape (n_azimuths, n_times), and the yearly values are
+summed over the contiguous years (np.add.reduceat). The solar
+radiation to all orientations uses the same surface-independent terms
+(helper.calc_poa_global_surfaces).
+
+Years that are only partly in the data (e.g. a record that starts in
+the middle of a year or ends with a day of the next year) are dropped,
+because their sums are not comparable, see min_year_fraction.
+
+The years are ranked separately for each orientation. The score is the
+weighted mean of the normalised ranks of the indices in index_weights
+(1 = the worst year in every index), and rank 1 is the most critical
+year.
+
+
+# Example, see also 1_comsol_critical_years.py
+
+import critical_years
+
+df, header = helper.read_wac(fname)
+
+df_years = critical_years.calc_year_indices(df, header, '1989-01-01',
+                                            azimuths=[0, 90, 180, 270])
+df_ranked = critical_years.rank_years(df_years)
+
+"""
+
+import numpy as np
+import pandas as pd
+
+import helper
+
+
+
+
+index_weights = {'wdr_sum': 1.0,
+                 'h_RHcrit': 1.0,
+                 'h_wet_spells': 1.0}
+
+
+
+
+def _spell_lengths(mask, new_year, time_step):
+    # Length (h) of the spell that each True value belongs to, 0 outside
+    # the spells
+    # mask = bool array (n_rows, n_times)
+    # new_year = bool array (n_times,), True at the first row of a year,
+    #            the spells are cut at the year boundaries
+
+    previous = np.zeros(mask.shape, dtype=bool)
+    previous[:, 1:] = mask[:, :-1]
+    previous[:, new_year] = False
+
+    # Running number of the spells, over all rows
+    starts = mask & ~previous
+    spell_id = np.cumsum(starts.ravel()).reshape(mask.shape)
+    spell_id[~mask] = 0
+
+    lengths = time_step * np.bincount(spell_id.ravel()).astype(np.float64)
+    lengths[0] = 0.0
+
+    return(lengths[spell_id])
+
+
+
+
+def calc_year_indices(df, header, start_time,
+                      azimuths=(0.0, 90.0, 180.0, 270.0),
+                      terrain_category='I',
+                      z_building=6.0,
+                      radiation_limit=100.0,
+                      spell_min=24.0,
+                      min_year_fraction=0.99):
+    # Moisture load indices for each year and orientation
+    # df, header = helper.read_wac()
+    # start_time = local standard time of the first row, e.g. '1989-01-01'
+    # [azimuths] = deg, surface azimuths of vertical walls
+    # [radiation_limit] = W/m2, solar radiation of a 'low-radiation' hour
+    # [spell_min] = h, shortest wet spell that is counted
+    # min_year_fraction = years whose data covers less than this part of
+    #                     the calendar year (e.g. the partial first and
+    #                     last years) are dropped, 0 = keep all years
+    # Returns DataFrame with columns year, hours, azimuth, wdr_sum,
+    # h_RHcrit, h_wet_spells, longest_wet_spell
+
+    time_step = header['time_step']
+
+    azimuths = np.atleast_1d(azimuths).astype(np.float64)
+
+    time_local, time_utc = helper.calc_time_axis(start_time,
+                                                 len(df),
+                                                 time_step,
+                                                 header['timezone'])
+
+    year = time_local.year.values
+
+    # First row of each year, the years are contiguous
+    year_starts = np.flatnonzero(np.diff(year, prepend=year[0]-1))
+    new_year = np.zeros(len(year), dtype=bool)
+    new_year[year_starts] = True
+
+    Te = df.loc[:, 'TA'].values.astype(np.float64)
+    RHe = 100.0 * df.loc[:, 'HREL'].values.astype(np.float64)
+
+
+    # Wind-driven rain, kg/(m2 h), shape (n_azimuths, n_times)
+    I_WS = helper.calc_WDR_grid(df.loc[:, 'WS'],
+                                df.loc[:, 'WD'],
+                                df.loc[:, 'RN'],
+                                Te,
+                                [terrain_category],
+                                [z_building],
+                                azimuths)[0, 0]
+
+
+    # Surface relative humidity above the critical value
+    RHcrit = helper.MI_RHcrit(Te)
+
+    RH_surface = np.where(I_WS > 0.0, 100.0, RHe[np.newaxis, :])
+
+    above_RHcrit = (RH_surface >= RHcrit[np.newaxis, :]) \
+        & (Te > 0.0)[np.newaxis, :]
+
+
+    # Solar radiation to the walls, the values are for the next time step
+    location = {'latitude': header['latitude'],
+                'longitude': header['longitude'],
+                'altitude': header['altitude']}
+
+    poa_global = helper.calc_poa_global_surfaces(time_utc \
+                                                 + pd.Timedelta(hours=0.5*time_step),
+                                                 location,
+                                                 [90.0]*len(azimuths),
+                                                 azimuths,
+                                                 df.loc[:, 'ISD'].values,
+                                                 df.loc[:, 'ISDH'].values,
+                                                 Te)
+
+    wet_low_radiation = above_RHcrit & (poa_global < radiation_limit)
+
+    spell_length = _spell_lengths(wet_low_radiation, new_year, time_step)
+
+
+    # Yearly values, shape (n_azimuths, n_years)
+    indices = {'wdr_sum': np.add.reduceat(I_WS * time_step,
+                                          year_starts, axis=1),
+               'h_RHcrit': time_step * np.add.reduceat(above_RHcrit,
+                                                       year_starts, axis=1),
+               'h_wet_spells': time_step \
+                   * np.add.reduceat(spell_length >= spell_min,
+                                     year_starts, axis=1),
+               'longest_wet_spell': np.maximum.reduceat(spell_length,
+                                                        year_starts, axis=1)}
+
+    years = year[year_starts]
+
+    # Hours of data in each year, compared with the calendar year
+    hours = time_step * np.diff(np.append(year_starts, len(year)))
+    hours_calendar = 24.0 * np.where(time_local.is_leap_year[year_starts],
+                                     366.0, 365.0)
+
+    df_years = pd.DataFrame({'year': np.tile(years, len(azimuths)),
+                             'hours': np.tile(hours, len(azimuths)),
+                             'azimuth': np.repeat(azimuths, len(years))})
+
+    for key, x in indices.items():
+        df_years[key] = x.ravel().astype(np.float64)
+
+    is_complete = np.tile(hours >= min_year_fraction*hours_calendar,
+                          len(azimuths))
+
+    df_years = df_years.loc[is_complete, :].reset_index(drop=True)
+
+    return(df_years)
+
+
+
+
+def rank_years(df_years, weights=None):
+    # Ranks the years of each orientation, 1 = most critical
+    # df_years = calc_year_indices()
+    # weights = dict index -> weight, None = index_weights
+    # Returns the table sorted by azimuth and rank, with columns
+    # score (0...1) and rank added
+
+    if weights is None:
+        weights = index_weights
+
+    df = df_years.copy()
+
+    groups = df.groupby('azimuth')
+
+    score = np.zeros(len(df))
+
+    for key, weight in weights.items():
+
+        # 0 = smallest value of the orientation, 1 = largest
+        rank = groups[key].rank(method='average').values
+        n = groups[key].transform('size').values
+        score += weight * (rank - 1.0) / np.maximum(n - 1.0, 1.0)
+
+    df['score'] = score / sum(weights.values())
+
+    df['rank'] = df.groupby('azimuth')['score'] \
+        .rank(method='first', ascending=False).astype(np.int64)
+
+    df = df.sort_values(['azimuth', 'rank']).reset_index(drop=True)
+
+    return(df)
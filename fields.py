@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+COMSOL cut-line and field exports (Data export, spreadsheet format)
+to memory-mapped arrays, and mould index for every node.
+
+In the export there is one row per node. The first columns are the
+coordinates and the rest are the expressions at each output time:
+
+% Model:              seina.mph
+% ...
+% x    y    T (degC) @ t=0    T (degC) @ t=1    ...    RH (%) @ t=0    ...
+0.1    0.2  20.1              20.2              ...    51.2            ...
+
+The data rows are read in chunks of nodes and written to
+np.memmap files of shape (n_nodes, n_times), so the whole field is
+never in memory. The files in the output folder are:
+    T.dat, RH.dat = float64 (or float32), shape (n_nodes, n_times)
+    coords.npy = node coordinates, shape (n_nodes, n_coords)
+    times.npy = output times, in the time unit of the export
+    field.json = shapes and column names
+
+Temperatures in K are converted to degC and relative humidities
+given as fraction (unit 1) are converted to 0...100 %.
+
+The mould index is calculated for batches of nodes with
+helper.MI_batch(), so also the memory use of the mould index depends
+on the batch size and not on the number of nodes.
+
+
+# Example, see also 2_comsol_read_field.py
+
+import fields
+
+field = fields.ingest_field_export(fname, output_folder,
+                                   T_name='T', RH_name='RH')
+
+df_Mmax = fields.mould_index_field(field, 'vs', 'vs', 0.5)
+
+print(fields.worst_node(df_Mmax))
+
+"""
+
+import os
+import re
+import json
+import itertools
+import numpy as np
+
+import helper
+import profiling
+
+
+
+
+# One column of the header row: a name without spaces, optional unit
+# in parentheses (may contain spaces and one level of parentheses) and
+# optional '@ t=<time>', e.g. 'T (degC) @ t=0'
+_header_token_pattern = re.compile(r'[^\s()@]+'
+                                   r'(?:\s*\((?:[^()]|\([^()]*\))*\))?'
+                                   r'(?:\s*@\s*t\s*=\s*\S+)?')
+
+
+def _split_header_row(row, n_fields=None):
+    # Column names of the header row
+    # n_fields = number of fields on the first data row, None = unknown
+    # COMSOL separates the columns with tabs or two or more spaces, and
+    # single spaces are part of the names, e.g. 'T (degC) @ t=0'. If
+    # that does not give n_fields columns (single spaces between the
+    # columns, e.g. 'x y T (degC) @ t=0'), the row is split by the
+    # structure of the names.
+
+    column_names = re.split(r'\t+|\s{2,}', row.strip())
+
+    if n_fields is None or len(column_names) == n_fields:
+        return(column_names)
+
+    column_names = _header_token_pattern.findall(row)
+
+    if len(column_names) != n_fields:
+        raise ValueError(f'The header row has {len(column_names)} column '
+                         f'names but the data rows have {n_fields} '
+                         f'columns: {row.strip()!r}')
+
+    return(column_names)
+
+
+
+def read_comsol_header(fname):
+    # Reads the '%' header rows of a COMSOL export
+    # Returns (meta, column_names, n_header_rows)
+    # meta = dict from the 'key: value' rows, e.g. 'Nodes'
+    # column_names = names on the last header row, as many as there
+    #                are fields on the first data row (ValueError if
+    #                the header row cannot be split so)
+
+    meta = {}
+    header_rows = []
+    n_fields = None
+
+    with open(fname, 'r', encoding='utf-8', errors='replace') as f:
+        for row in f:
+            if row.startswith('%'):
+                header_rows.append(row[1:].strip())
+                continue
+            # Header ends, the first data row gives the number of fields
+            for row in [row] + list(itertools.islice(f, 10)):
+                if row.strip() != '':
+                    n_fields = len(row.split())
+                    break
+            break
+
+    for row in header_rows[:-1]:
+        if ':' in row:
+            key, value = row.split(':', 1)
+            meta[key.strip()] = value.strip()
+
+    if len(header_rows) > 0:
+        column_names = _split_header_row(header_rows[-1], n_fields)
+    else:
+        column_names = []
+
+    return(meta, column_names, len(header_rows))
+
+
+
+_column_pattern = re.compile(r'^(?P<name>.+?)\s*(\((?P<unit>[^()]*)\))?\s*'
+                             r'@\s*t\s*=\s*(?P<t>\S+)$')
+
+
+def parse_field_columns(column_names):
+    # Returns (coord_names, columns)
+    # columns = dict expression name -> dict with 'unit', 'times' and
+    #           'idxs' (column numbers), in the order of the file
+
+    coord_names = []
+    columns = {}
+
+    for idx, col in enumerate(column_names):
+
+        match = _column_pattern.match(col)
+
+        if match is None:
+            coord_names.append(col)
+            continue
+
+        name = match.group('name')
+
+        if name not in columns:
+            columns[name] = {'unit': match.group('unit'),
+                             'times': [],
+                             'idxs': []}
+
+        columns[name]['times'].append(float(match.group('t')))
+        columns[name]['idxs'].append(idx)
+
+    return(coord_names, columns)
+
+
+
+def _to_repo_units(x, quantity, unit):
+    # In place: T -> degC, RH -> 0...100 %
+
+    if quantity == 'T' and unit == 'K':
+        x -= 273.15
+
+    if quantity == 'RH' and unit in ('1', ''):
+        x *= 100.0
+
+
+
+
+@profiling.profiled
+def ingest_field_export(fname, output_folder, T_name='T', RH_name='RH',
+                        chunk_size=200, dtype=np.float64):
+    # Reads COMSOL field or cut-line export to memmap files
+    # T_name, RH_name = expression names in the export, e.g. 'ht.T'
+    # chunk_size = number of nodes read at a time
+    # dtype = np.float64 or np.float32 (half of the disk space),
+    #         the mould index is always calculated in float64
+    # Returns field, see open_field()
+
+    if not os.path.exists(output_folder):
+        os.makedirs(output_folder)
+
+    meta, column_names, n_header_rows = read_comsol_header(fname)
+
+    coord_names, columns = parse_field_columns(column_names)
+
+    for name in (T_name, RH_name):
+        if name not in columns:
+            raise ValueError(f'{name} not found, the expressions in '
+                             f'the file are: {list(columns.keys())}')
+
+    times = np.array(columns[T_name]['times'])
+
+    if not np.array_equal(times, columns[RH_name]['times']):
+        raise ValueError('T and RH have different output times')
+
+    # Number of nodes from the header or by counting the rows
+    if 'Nodes' in meta:
+        n_nodes = int(meta['Nodes'])
+    else:
+        with open(fname, 'rb') as f:
+            n_nodes = sum(1 for row in f if not row.startswith(b'%') \
+                          and row.strip() != b'')
+
+    n_times = len(times)
+
+    idxs_coords = [column_names.index(name) for name in coord_names]
+
+    coords = np.zeros((n_nodes, len(coord_names)))
+
+    arrays = {}
+    for quantity in ('T', 'RH'):
+        arrays[quantity] = np.memmap(os.path.join(output_folder,
+                                                  f'{quantity}.dat'),
+                                     dtype=dtype,
+                                     mode='w+',
+                                     shape=(n_nodes, n_times))
+
+    sources = {'T': columns[T_name], 'RH': columns[RH_name]}
+
+    # The rows are parsed with numpy in chunks of chunk_size nodes
+    idx_node = 0
+
+    with open(fname, 'r', encoding='utf-8', errors='replace') as f:
+
+        for idx in range(n_header_rows):
+            f.readline()
+
+        while idx_node < n_nodes:
+
+            rows = []
+            for row in f:
+                if row.strip() != '':
+                    rows.append(row)
+                if len(rows) == chunk_size:
+                    break
+
+            if len(rows) == 0:
+                break
+
+            X = np.loadtxt(rows, ndmin=2)
+
+            idx_end = idx_node + X.shape[0]
+
+            coords[idx_node:idx_end, :] = X[:, idxs_coords]
+
+            for quantity, source in sources.items():
+                x = X[:, source['idxs']]
+                _to_repo_units(x, quantity, source['unit'])
+                arrays[quantity][idx_node:idx_end, :] = x
+
+            idx_node = idx_end
+
+    if idx_node != n_nodes:
+        raise ValueError(f'Expected {n_nodes} nodes, found {idx_node}')
+
+    for x in arrays.values():
+        x.flush()
+
+    np.save(os.path.join(output_folder, 'coords.npy'), coords)
+    np.save(os.path.join(output_folder, 'times.npy'), times)
+
+    info = {'source': os.path.abspath(fname),
+            'n_nodes': n_nodes,
+            'n_times': n_times,
+            'coord_names': coord_names,
+            'T_name': T_name,
+            'RH_name': RH_name,
+            'T_unit_in_file': sources['T']['unit'],
+            'RH_unit_in_file': sources['RH']['unit'],
+            'dtype': np.dtype(dtype).name}
+
+    with open(os.path.join(output_folder, 'field.json'), 'w') as f:
+        json.dump(info, f, indent=1)
+
+    return(open_field(output_folder))
+
+
+
+def open_field(folder):
+    # Opens the files of ingest_field_export() without reading the data
+    # Returns dict with keys 'T', 'RH' (read-only memmaps, degC and %),
+    # 'coords', 'times', 'coord_names' and 'folder'
+
+    with open(os.path.join(folder, 'field.json'), 'r') as f:
+        info = json.load(f)
+
+    shape = (info['n_nodes'], info['n_times'])
+
+    field = {'folder': folder,
+             'coord_names': info['coord_names'],
+             'coords': np.load(os.path.join(folder, 'coords.npy')),
+             'times': np.load(os.path.join(folder, 'times.npy'))}
+
+    for quantity in ('T', 'RH'):
+        field[quantity] = np.memmap(os.path.join(folder, f'{quantity}.dat'),
+                                    dtype=info.get('dtype', 'float64'),
+                                    mode='r',
+                                    shape=shape)
+
+    return(field)
+
+
+
+
+@profiling.profiled
+def mould_index_field(field, MGspeedclass, MGmaxclass, Cmat,
+                      batch_size=256, period_to_analyse=None,
+                      hours_per_time_unit=1.0, write_M=False):
+    # Mould index for every node, calculated in batches of nodes
+    # period_to_analyse = length of the analysed period at the end, in
+    #                     the time unit of the export, None = all times
+    #                     (as in 2_comsol_read_results.py, the mould index
+    #                     starts from zero at the beginning of the period)
+    # hours_per_time_unit = e.g. 1/3600 when the export times are in s.
+    #                       The mould index is integrated with the
+    #                       actual output time steps, see helper.MI_batch
+    # write_M = also write all M values to M.dat in the field folder,
+    #           with the same dtype as T
+    # Returns DataFrame with one row per node: coordinates, Mmax and
+    # time of Mmax
+
+    import pandas as pd
+
+    times = field['times']
+
+    if period_to_analyse is None:
+        idx_start = 0
+    else:
+        idx_start = int(np.argmax(times > times[-1] - period_to_analyse))
+
+    n_nodes = field['T'].shape[0]
+    n_times = len(times) - idx_start
+
+    if write_M:
+        M_all = np.memmap(os.path.join(field['folder'], 'M.dat'),
+                          dtype=field['T'].dtype,
+                          mode='w+',
+                          shape=(n_nodes, n_times))
+
+    Mmax = np.zeros(n_nodes)
+    idx_Mmax = np.zeros(n_nodes, dtype=np.int64)
+
+    for idx in range(0, n_nodes, batch_size):
+
+        idx_end = min(idx + batch_size, n_nodes)
+
+        M = helper.MI_batch(field['T'][idx:idx_end, idx_start:],
+                            field['RH'][idx:idx_end, idx_start:],
+                            MGspeedclass,
+                            MGmaxclass,
+                            Cmat,
+                            time=hours_per_time_unit*times[idx_start:])
+
+        idx_Mmax[idx:idx_end] = np.argmax(M, axis=1)
+        Mmax[idx:idx_end] = M[np.arange(M.shape[0]), idx_Mmax[idx:idx_end]]
+
+        if write_M:
+            M_all[idx:idx_end, :] = M
+
+    if write_M:
+        M_all.flush()
+
+    df = pd.DataFrame(data=field['coords'],
+                      columns=field['coord_names'])
+    df['Mmax'] = Mmax
+    df['time_Mmax'] = times[idx_start + idx_Mmax]
+    df.index.name = 'node'
+
+    return(df)
+
+
+
+def worst_node(df_Mmax):
+    # Row of the node with the largest Mmax
+
+    return(df_Mmax.loc[df_Mmax.loc[:, 'Mmax'].idxmax(), :])
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Fast reader for FMI observation downloads
+(https://www.ilmatieteenlaitos.fi/havaintojen-lataus).
+
+The files have the time as integer columns YEAR, MON, DAY, HOUR and MIN
+in local wall clock time (Finland: EET, UTC+2, and EEST, UTC+3, in
+summer), followed by the measured values.
+
+read_fmi() reads all columns in one pass (stray non-numeric values
+become NaN) and assembles the time stamps arithmetically:
+    1) days since 1970-01-01 from the civil date (integer arithmetic,
+       proleptic Gregorian calendar)
+    2) seconds of the local wall clock time
+    3) UTC = local - offset, where the offset (standard or DST) comes
+       from a table of the DST transitions of each year in the data
+
+The DST rules of Finland are in dst_transitions():
+    - before 1981 no DST
+    - 1981-1982 last Sunday of March and September at 00:00 UTC
+    - 1983-1995 EU rules, last Sunday of March and September at 01:00 UTC
+    - 1996- EU rules, last Sunday of March and October at 01:00 UTC
+The table is calculated once per year and cached.
+
+Wall clock times in the spring gap (03:00-03:59) do not exist and
+raise ValueError. In the autumn the wall clock times 03:00-03:59
+occur twice. FMI data has the duplicate 03:00 row copied from the UTC
+data, so the first occurrence is taken as DST and the repeated one
+as standard time, the same as pandas tz_localize(ambiguous='infer').
+
+This replaces pd.to_datetime(dict) + tz_localize('Europe/Helsinki',
+ambiguous='infer') + apply(pd.to_numeric), which is slow for
+multi-decade downloads.
+
+
+# Example, see also 1_comsol_solar_radiation_files_customcsv.py
+
+import fmi
+
+data, time_utc = fmi.read_fmi('Jokioinen2022_FMI_radiation.txt')
+
+"""
+
+import functools
+import numpy as np
+
+
+
+
+time_columns = ['YEAR', 'MON', 'DAY', 'HOUR', 'MIN']
+
+# Markers of missing values in the downloads
+na_values = ['-', '', 'NaN', 'nan', '#N/A']
+
+
+
+
+def days_from_civil(year, month, day):
+    # Days since 1970-01-01, vectorised
+    # year, month (1...12), day (1...31) = integer arrays
+
+    year = np.asarray(year, dtype=np.int64)
+    month = np.asarray(month, dtype=np.int64)
+    day = np.asarray(day, dtype=np.int64)
+
+    # Year starting from March, so that the leap day is the last day
+    y = year - (month <= 2)
+    era = np.floor_divide(y, 400)
+    yoe = y - 400*era                                   # 0...399
+    mp = (month + 9) % 12                               # March = 0
+    doy = (153*mp + 2)//5 + day - 1                     # 0...365
+    doe = 365*yoe + yoe//4 - yoe//100 + doy             # 0...146096
+
+    return(era*146097 + doe - 719468)
+
+
+
+def _last_sunday(year, month):
+    # Days since 1970-01-01 of the last Sunday of the month
+
+    if month == 12:
+        days_next = days_from_civil(year + 1, 1, 1)
+    else:
+        days_next = days_from_civil(year, month + 1, 1)
+
+    last_day = days_next - 1
+
+    # 1970-01-01 was Thursday, weekday 0 = Monday
+    weekday = (last_day + 3) % 7
+
+    return(int(last_day - (weekday + 1) % 7))
+
+
+
+@functools.lru_cache(maxsize=None)
+def _dst_transition(year):
+    # (start, end) of DST as UTC seconds since 1970-01-01,
+    # None when there is no DST
+
+    if year < 1981:
+        return(None)
+
+    if year <= 1982:
+        hour_utc = 0
+    else:
+        hour_utc = 1
+
+    if year <= 1995:
+        end_month = 9
+    else:
+        end_month = 10
+
+    start = _last_sunday(year, 3)*86400 + hour_utc*3600
+    end = _last_sunday(year, end_month)*86400 + hour_utc*3600
+
+    return((start, end))
+
+
+
+def dst_transitions(years):
+    # Table of the DST transitions of Finland
+    # years = array of years
+    # Returns (start, end) as int64 arrays of UTC seconds since
+    # 1970-01-01, with the same shape as years.
+    # For years without DST start = end, so no time is DST.
+
+    years = np.asarray(years, dtype=np.int64)
+
+    if years.size == 0:
+        return(years.copy(), years.copy())
+
+    # One row per year from the first to the last year, indexed with
+    # the year offset instead of sorting the years
+    year_min = int(years.min())
+    year_max = int(years.max())
+
+    table = np.zeros((year_max - year_min + 1, 2), dtype=np.int64)
+
+    for idx, year in enumerate(range(year_min, year_max + 1)):
+        transition = _dst_transition(year)
+        if transition is not None:
+            table[idx, :] = transition
+
+    idx_year = years - year_min
+
+    start = table[idx_year, 0]
+    end = table[idx_year, 1]
+
+    return(start, end)
+
+
+
+
+def local_to_utc(year, month, day, hour, minute, std_offset=2.0, dst=True):
+    # UTC seconds since 1970-01-01 of local wall clock times
+    # [std_offset] = h from UTC, east is positive
+    # dst = False for data in local standard time (no DST)
+    # Returns (t_utc, is_dst), int64 and bool arrays
+
+    year = np.asarray(year, dtype=np.int64)
+
+    t_local = days_from_civil(year, month, day)*86400 \
+        + np.asarray(hour, dtype=np.int64)*3600 \
+        + np.asarray(minute, dtype=np.int64)*60
+
+    offset_std = int(round(std_offset*3600))
+
+    t_std = t_local - offset_std
+
+    if not dst:
+        return(t_std, np.zeros(t_local.shape, dtype=bool))
+
+    t_dst = t_std - 3600
+
+    start, end = dst_transitions(year)
+
+    # The wall clock time is valid as DST or as standard time
+    valid_dst = (t_dst >= start) & (t_dst < end)
+    valid_std = ~((t_std >= start) & (t_std < end))
+
+    nonexistent = ~valid_dst & ~valid_std
+    if np.any(nonexistent):
+        idx = np.flatnonzero(nonexistent)[0]
+        raise ValueError(f'Nonexistent local time at row {idx}: '
+                         f'{year[idx]}-{int(month[idx]):02d}-'
+                         f'{int(day[idx]):02d} '
+                         f'{int(hour[idx]):02d}:{int(minute[idx]):02d}')
+
+    is_dst = valid_dst & ~valid_std
+
+    # Ambiguous times in the autumn: the first occurrence is DST and
+    # the repeated one (not later than an earlier ambiguous time)
+    # is standard time
+    ambiguous = valid_dst & valid_std
+
+    if np.any(ambiguous):
+        t_amb = t_local[ambiguous]
+        t_before = np.maximum.accumulate(t_amb)
+        repeated = np.zeros(len(t_amb), dtype=bool)
+        repeated[1:] = t_amb[1:] <= t_before[:-1]
+        is_dst[ambiguous] = ~repeated
+
+    t_utc = np.where(is_dst, t_dst, t_std)
+
+    return(t_utc, is_dst)
+
+
+
+
+def read_fmi(fname, sep=r'\s+', std_offset=2.0, dst=True, dtype=np.float64):
+    # Read FMI observation download
+    # sep = column separator, e.g. ';' for files saved from Excel
+    # [std_offset] = h from UTC of the local standard time
+    # dst = True if the wall clock times include DST
+    # dtype = dtype of the value columns
+    # Returns (data, time_utc)
+    # data = pandas DataFrame with all columns, the time columns as int64
+    # time_utc = pandas DatetimeIndex, tz='UTC'
+
+    import pandas as pd
+
+    # Empty columns (trailing separator) are dropped
+    data = pd.read_csv(fname,
+                       sep=sep,
+                       na_values=na_values,
+                       low_memory=False)
+
+    data = data.loc[:, ~data.columns.str.startswith('Unnamed')]
+
+    # Other non-numeric values than na_values are also missing values,
+    # they are interpolated later. Columns that were read as numbers
+    # are not converted again.
+    for col in data.columns:
+        if data[col].dtype == object:
+            data[col] = pd.to_numeric(data[col], errors='coerce')
+
+    for col in time_columns:
+        x = data.loc[:, col].values
+        if np.any(np.isnan(x)):
+            raise ValueError(f'Missing values in time column: {col}')
+        data[col] = x.astype(np.int64)
+
+    value_columns = [col for col in data.columns \
+                     if col not in time_columns]
+    data = data.astype({col: dtype for col in value_columns})
+
+    t_utc, is_dst = local_to_utc(data.loc[:, 'YEAR'].values,
+                                 data.loc[:, 'MON'].values,
+                                 data.loc[:, 'DAY'].values,
+                                 data.loc[:, 'HOUR'].values,
+                                 data.loc[:, 'MIN'].values,
+                                 std_offset=std_offset,
+                                 dst=dst)
+
+    time_utc = pd.DatetimeIndex(t_utc.astype('datetime64[s]')) \
+        .as_unit('ns').tz_localize('UTC')
+
+    return(data, time_utc)
@@ -16,80 +16,289 @@ Itot = Ibeam*cos(incidence_angle) + Idif*Rdif + albedo*Iglob*Rground_refl
 
 In WUFI wac files the radiation values are given for the next hour.
 
+pandas and pvlib are imported only in the functions that need them, so
+that e.g. MI() and calc_vsat() can be used without the import time of
+pandas and pvlib. See benchmark_import_time.py.
+
 ISDH = Direct horizontal radiation
 ISD = Diffuse radiation, horizontal surface
 
 
 """
+import os
+import sys
 import numpy as np
-import pandas as pd
 
-import pvlib
+import profiling
+import psychrometrics
+import resampling
+import rolling
 
 
 
 
-def calc_vsat(T_, arg1='ice'):
-    # [T_] = degC
-    # SFS-EN ISO 13788
+def read_wac_header(fname):
+    # Read the header of WUFI .wac climate file (WUFI®_WAC_02)
+    # Returns dict with keys 'name', 'longitude', 'latitude', 'altitude',
+    # 'timezone', 'time_step', 'n_data_lines', 'column_names' and
+    # 'n_header_rows' (number of rows before the data rows)
+    # [timezone] = h from UTC, east is positive
+    # [time_step] = h
+    # The file does not contain the start date of the data.
     
-    R_w = 461.5
+    # WUFI writes the files with Windows encoding, e.g. '®'
+    with open(fname, 'r', encoding='cp1252', errors='replace') as f:
+        
+        # Make sure it is a wac file
+        row = f.readline()
+        assert 'WAC_02' in row
+        
+        # Second row gives the amount of rows until the column names
+        line_offset = int(f.readline().split()[0])
+        
+        header_rows = [f.readline() for idx in range(line_offset)]
     
-    pvsat = 610.5 * np.exp((17.269*T_)/(237.3+T_))
+    # Each header row is "value<tab>description"
+    header = {'name': header_rows[0].strip(),
+              'time_step': 1.0,
+              'n_data_lines': None,
+              'n_header_rows': 2 + line_offset}
     
-    if arg1 == 'ice':
+    for item in header_rows[1:-1]:
+        
+        if 'Longitude' in item:
+            header['longitude'] = float(item.split()[0])
+        
+        elif 'Latitude' in item:
+            header['latitude'] = float(item.split()[0])
+        
+        elif 'Height' in item:
+            header['altitude'] = float(item.split()[0])
+        
+        elif 'Zone' in item:
+            header['timezone'] = float(item.split()[0])
         
-        idxs_subzero = (T_ < 0.0)
+        elif 'Time Step' in item:
+            header['time_step'] = float(item.split()[0])
         
-        pvsat[idxs_subzero] \
-            = 610.5*np.exp((21.875*T_[idxs_subzero])/(265.5+T_[idxs_subzero]))
+        elif 'DataLines' in item:
+            header['n_data_lines'] = int(item.split()[0])
     
-    vsat = 1000.0 * pvsat / (R_w*(273.15+T_))
+    header['column_names'] = header_rows[-1].split()
+    
+    return(header)
+
+
+
+
+@profiling.profiled
+def read_wac(fname, dtype=None):
+    # Read WUFI .wac climate file (WUFI®_WAC_02)
+    # Returns (df, header)
+    # df = pandas DataFrame with the data columns, e.g.
+    #      TA, HREL, WS, WD, RN, ISDH, ISD, ILAH, PSTA
+    # header = see read_wac_header()
+    # dtype = e.g. np.float32 for half of the memory, None = float64
+    
+    import pandas as pd
+    
+    header = read_wac_header(fname)
+    
+    df = pd.read_csv(fname,
+                     sep=r'\s+',
+                     skiprows=header['n_header_rows'],
+                     header=None,
+                     names=header['column_names'],
+                     nrows=header['n_data_lines'],
+                     encoding='cp1252',
+                     dtype=dtype)
+    
+    header['n_data_lines'] = len(df)
+    
+    return(df, header)
+
+
+
+
+def calc_time_axis(start, n, time_step=1.0, timezone=0.0):
+    # Time stamps of the data rows
+    # start = local standard time (no DST) of the first row, e.g. '2011-01-01'
+    # n = number of rows
+    # [time_step] = h
+    # [timezone] = h from UTC, east is positive
+    # Returns (time_local_standard, time_utc) as pandas DatetimeIndex
+    # The calendar comes from pandas, so leap days are included
+    # when the data covers several years.
+    
+    import pandas as pd
+    
+    time_local_standard = pd.date_range(start=start,
+                                        periods=n,
+                                        freq=pd.Timedelta(hours=time_step))
+    
+    time_utc = time_local_standard - pd.Timedelta(hours=timezone)
+    
+    return(time_local_standard, time_utc)
+
+
+
+
+def _is_series(x):
+    # True for pandas Series. If pandas has not been imported,
+    # x cannot be a Series.
+
+    pd = sys.modules.get('pandas')
+
+    return(pd is not None and type(x) == pd.core.series.Series)
+
+
+
+
+@profiling.profiled
+def calc_vsat(T_, arg1='ice'):
+    # [T_] = degC
+    # SFS-EN ISO 13788
+    # arg1 = 'ice' or 'water', saturation over ice when T_ < 0 degC
+    # See psychrometrics.py for the in-place and float32 variants
+    
+    vsat = psychrometrics.vsat(np.asarray(T_), phase=arg1)
+    
+    if _is_series(T_):
+        import pandas as pd
+        vsat = pd.Series(vsat, index=T_.index)
     
     return(vsat)
 
      
 
 
-def calc_indoor_conditions(Te, RHe):
+# Indoor moisture excess of the humidity classes of SFS-EN ISO 13788,
+# breakpoints (Te, dv), [Te] = degC, [dv] = g/m3
+# Moisture excess is constant below 0 degC and zero above 20 degC
+
+humidity_classes_13788 = {1: ((0.0, 20.0), (2.0, 0.0)),
+                          2: ((0.0, 20.0), (4.0, 0.0)),
+                          3: ((0.0, 20.0), (6.0, 0.0)),
+                          4: ((0.0, 20.0), (8.0, 0.0)),
+                          5: ((0.0, 20.0), (10.0, 0.0))}
+
+
+# Indoor climate models for calc_indoor_models()
+# 'name': used as the key of the return value
+# 'Ti': breakpoints (Te_24hmean, Ti_24hmean), [Te], [Ti] = degC
+# 'dv': breakpoints (Te_24hmean, dv_24hmean), [dv] = g/m3,
+#       or humidity class of SFS-EN ISO 13788 as integer 1...5
+# 'phii_max': upper limit of indoor relative humidity, 1 (0...1)
+# The breakpoints can have more than two points, values outside
+# the breakpoints are kept constant.
+
+indoor_models = [{'name': 'const21_RIL107',
+                  'Ti': ((10.0, 20.0), (21.0, 21.0)),
+                  'dv': ((5.0, 15.0), (5.0, 2.0)),
+                  'phii_max': 0.8},
+                 {'name': 'var2125_RIL107',
+                  'Ti': ((10.0, 20.0), (21.0, 25.0)),
+                  'dv': ((5.0, 15.0), (5.0, 2.0)),
+                  'phii_max': 0.8}]
+
+
+
+
+@profiling.profiled
+def calc_indoor_models(Te, RHe, models, ve=None, time_step=1.0):
     # [Te] = degC
     # [RHe] = 1 (0...1)
+    # [ve] = g/m3, if given, RHe is not used
+    # [time_step] = h
+    # models = list of model definitions, see indoor_models above
     # SFS-EN ISO 13788, RIL 107-2022
+    # All models are evaluated from the same 24 h rolling means and
+    # the same saturation concentrations are reused between models
+    # that have the same indoor temperature curve.
+    # Returns dict: name -> (Ti_24hmean, vi_24hmean, phii_24hmean)
+    
+    Te = np.asarray(Te, dtype=np.float64)
     
     # Outdoor conditions
-    ve = RHe * calc_vsat(Te)
+    if ve is None:
+        ve = np.asarray(RHe, dtype=np.float64) * calc_vsat(Te)
+    
+    ve = np.broadcast_to(ve, Te.shape)
+    
+    # Both 24 h means from the same pass
+    # Te can also have shape (n_series, n_times), e.g. many samples
+    n_24h = int(round(24.0 / time_step))
+    
+    Te_24hmean, ve_24hmean = rolling.centred_mean(np.stack((Te, ve)), n_24h)
     
-    Te_24hmean = Te.rolling(24, center=True, min_periods=1).mean()
-    ve_24hmean = ve.rolling(24, center=True, min_periods=1).mean()
+    results = calc_indoor_models_from_24hmeans(Te_24hmean, ve_24hmean, models)
     
-    # Indoor temperature
-    Te_low = 10.0
-    Te_high = 20.0
-    Ti_low = 21.0
-    Ti_high = 21.0
+    return(results)
 
-    xp = (Te_low, Te_high)
-    fp = (Ti_low, Ti_high)
 
-    Ti_24hmean = np.interp(Te_24hmean, xp, fp)
+
+
+def calc_indoor_models_from_24hmeans(Te_24hmean, ve_24hmean, models):
+    # Indoor conditions from the 24 h mean outdoor conditions,
+    # see calc_indoor_models()
+    # [Te_24hmean] = degC
+    # [ve_24hmean] = g/m3
+    
+    # Cached by the breakpoints
+    Ti_cache = {}
+    vsat_Ti_cache = {}
+    dv_cache = {}
     
-    # Indoor air vapor concentration
-    Te_low = 5.0
-    Te_high = 15.0
-    dv_low = 5.0
-    dv_high = 2.0
+    results = {}
     
-    xp = (Te_low, Te_high)
-    fp = (dv_low, dv_high)
+    for model in models:
+        
+        # Indoor temperature
+        key_Ti = tuple(tuple(x) for x in model['Ti'])
+        
+        if key_Ti not in Ti_cache:
+            xp, fp = key_Ti
+            Ti_cache[key_Ti] = np.interp(Te_24hmean, xp, fp)
+            vsat_Ti_cache[key_Ti] = calc_vsat(Ti_cache[key_Ti])
+        
+        Ti_24hmean = Ti_cache[key_Ti]
+        vsat_Ti = vsat_Ti_cache[key_Ti]
+        
+        # Indoor air vapor concentration
+        if type(model['dv']) is int:
+            key_dv = humidity_classes_13788[model['dv']]
+        else:
+            key_dv = tuple(tuple(x) for x in model['dv'])
+        
+        if key_dv not in dv_cache:
+            xp, fp = key_dv
+            dv_cache[key_dv] = np.interp(Te_24hmean, xp, fp)
+        
+        vi_24hmean = ve_24hmean + dv_cache[key_dv]
+        
+        # Indoor relative humidity
+        phii_24hmean = vi_24hmean / vsat_Ti
+        phii_24hmean = np.minimum(phii_24hmean, model['phii_max'])
+        
+        results[model['name']] = (Ti_24hmean, vi_24hmean, phii_24hmean)
     
-    dv_24hmean = np.interp(Te_24hmean, xp, fp)
+    return(results)
+
+
+
+
+@profiling.profiled
+def calc_indoor_conditions(Te, RHe, time_step=1.0):
+    # [Te] = degC
+    # [RHe] = 1 (0...1)
+    # [time_step] = h
+    # SFS-EN ISO 13788, RIL 107-2022
+    # Indoor temperature 21 degC and RIL 107 moisture excess
     
-    vi_24hmean = ve_24hmean + dv_24hmean
+    results = calc_indoor_models(Te, RHe, indoor_models[:1],
+                                 time_step=time_step)
     
-    # Indoor relative humidity
-    vsat_Ti = calc_vsat(Ti_24hmean)
-    phii_24hmean = vi_24hmean / vsat_Ti
-    phii_24hmean = np.minimum(phii_24hmean, 0.8)
+    Ti_24hmean, vi_24hmean, phii_24hmean = results[indoor_models[0]['name']]
     
     # Return values
     return(Ti_24hmean, vi_24hmean, phii_24hmean)
@@ -98,31 +307,132 @@ def calc_indoor_conditions(Te, RHe):
     
 
 
-def save_to_file_for_comsol(x, fname):
+def _content_hash(values, time_step, start, fmt):
+    # sha256 of the values and the formatting, so equal hashes give
+    # byte-identical files
+    
+    import hashlib
+    
+    h = hashlib.sha256()
+    h.update(repr((len(values), float(time_step), int(start), fmt)).encode())
+    h.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    
+    return(h.hexdigest())
+
+
+
+def _link_to_store(fname_object, fname):
+    # Makes fname a hard link to the stored file, or a copy if hard
+    # links are not supported (e.g. different drive)
+    # Returns False if fname already was the stored file
+    
+    import shutil
+    
+    if os.path.exists(fname):
+        if os.path.samefile(fname, fname_object):
+            return(False)
+        os.remove(fname)
+    
+    try:
+        os.link(fname_object, fname)
+    except OSError:
+        shutil.copyfile(fname_object, fname)
+    
+    return(True)
+
+
+
+@profiling.profiled
+def save_to_file_for_comsol(x, fname, time_step=1.0, start=0,
+                            store_folder=None):
+    # First column is time from the beginning, h
+    # [time_step] = h
+    # fname can also be an open file, to which the rows are appended
+    # start = row number of the first value, when writing in chunks
+    # store_folder = folder for content-addressed storage, None = write
+    #                fname directly. Each different file is written once
+    #                to store_folder/<hash[:2]>/<hash>.csv and fname is
+    #                a hard link to it. If fname already links to the
+    #                same content, nothing is written. The linked files
+    #                must not be edited in place, that would change all
+    #                the files with the same content.
+    
+    t = time_step * np.arange(start=start, stop=start+len(x))
     
     if type(x) == np.ndarray:
-        tup = (np.arange(start=0, stop=len(x)),
+        tup = (t,
                x)
     
-    elif type(x) == pd.core.series.Series:
-        tup = (np.arange(start=0, stop=len(x)),
+    elif _is_series(x):
+        tup = (t,
                x.values)
     
     else:
         print('Uncertain of variable type', flush=True)
-        tup = (np.arange(start=0, stop=len(x)),
+        tup = (t,
                x)
         
         
     X = np.column_stack(tup)
     
-    np.savetxt(fname, X, fmt = ['%d','%.5f'])
+    if float(time_step).is_integer():
+        fmt_time = '%d'
+    else:
+        fmt_time = '%.4f'
+    
+    fmt = [fmt_time,'%.5f']
+    
+    if store_folder is None or not isinstance(fname, (str, os.PathLike)):
+        # A hard link to the store is replaced, not overwritten
+        if isinstance(fname, (str, os.PathLike)) and os.path.exists(fname) \
+                and os.stat(fname).st_nlink > 1:
+            os.remove(fname)
+        np.savetxt(fname, X, fmt = fmt)
+        return(X)
+    
+    key = _content_hash(tup[1], time_step, start, fmt)
+    
+    folder_object = os.path.join(store_folder, key[:2])
+    fname_object = os.path.join(folder_object, f'{key}.csv')
+    
+    if not os.path.exists(fname_object):
+        
+        if not os.path.exists(folder_object):
+            os.makedirs(folder_object, exist_ok=True)
+        
+        # Written under a temporary name, so an interrupted write does
+        # not leave a broken file in the store
+        fname_tmp = f'{fname_object}.{os.getpid()}.tmp'
+        np.savetxt(fname_tmp, X, fmt = fmt)
+        os.replace(fname_tmp, fname_object)
+    
+    _link_to_store(fname_object, fname)
     
     return(X)
 
 
 
-def calc_LWincoming(slope_as_quotient, LWdn, Te):
+def prune_store(store_folder):
+    # Removes the files of the content-addressed store that are not
+    # linked from any output folder (link count 1)
+    # Returns the number of removed files
+    # Files that were copied instead of linked are not counted as links.
+    
+    n_removed = 0
+    
+    for folder, dirs, files in os.walk(store_folder):
+        for file in files:
+            fname = os.path.join(folder, file)
+            if os.stat(fname).st_nlink <= 1:
+                os.remove(fname)
+                n_removed += 1
+    
+    return(n_removed)
+
+
+
+@profiling.profiled
+def calc_LWincoming(slope_as_quotient, LWdn, Te, time_step=1.0):
     
     # slope_as_quotient = dy/dx from horizontal level
     # degrees from horizontal, wall=90
@@ -130,14 +440,35 @@ def calc_LWincoming(slope_as_quotient, LWdn, Te):
     
     # [LWdn] = W/m2
     # [T_e] = degC
+    # [time_step] = h
     
-    # View factors
     surface_tilt = np.arctan(slope_as_quotient)*(180.0/np.pi)
 
     print(f'1/slope = {1/slope_as_quotient:.2f}, slope = {surface_tilt:.2f} deg')
+    
+    # Ground temperature is the mean of the previous month
+    n_730h = int(round(730.0 / time_step))
+    
+    T_ground = rolling.trailing_mean(Te, n_730h)
+    
+    LW_incoming = calc_LWincoming_from_T_ground(slope_as_quotient,
+                                                LWdn,
+                                                T_ground)
+    
+    return(LW_incoming)
 
-    F_surf_sky = ( np.cos((np.pi/180.0)*(surface_tilt/2.0)) )**2
 
+
+
+def calc_LWincoming_from_T_ground(slope_as_quotient, LWdn, T_ground):
+    # See calc_LWincoming()
+    # [T_ground] = degC
+    
+    # View factors
+    surface_tilt = np.arctan(slope_as_quotient)*(180.0/np.pi)
+    
+    F_surf_sky = ( np.cos((np.pi/180.0)*(surface_tilt/2.0)) )**2
+    
     F_surf_ground = 1.0 - F_surf_sky
     
     
@@ -146,8 +477,6 @@ def calc_LWincoming(slope_as_quotient, LWdn, Te):
     emissivity_ground = 0.95
     sigma_SB = 5.67e-8
     
-    T_ground = Te.rolling(window=730, min_periods=1).mean()
-    
     LWup = emissivity_ground * sigma_SB * (T_ground + 273.15)**4
     
     # Total incoming long-wave radiation towards a surface
@@ -162,124 +491,256 @@ def calc_LWincoming(slope_as_quotient, LWdn, Te):
 
 
 
-def calc_WDR(ws, wd, precip_horizontal, Te, 
-             terrain_category,
-             z_building, Theta_azimuth):
-    # SFS-EN ISO 15927-3, SFS-EN 1991-1-4
-    # [ws] = m/s
-    # [wd] = deg, degrees clockwise from north
-    # [precip_horizontal] = mm/h
-    # terrain_category = {'0','I','II','III', 'IV'}
-    # [z_building] = m
-    # [Theta_azimuth] = deg, surface azimuth
+# Terrain categories for wind-driven rain, SFS-EN 1991-1-4 and
+# SFS-EN ISO 15927-3
+# z_0_1991, z_min_1991 = roughness length and minimum height, EN 1991-1-4
+# K_R_15927, z_0_15927, z_min_15927 = terrain factor, roughness length and
+# minimum height, EN ISO 15927-3
+# [z_0], [z_min] = m
+
+terrain_parameters = {
+    # Avomeri tai merelle avoin rannikko
+    '0': {'z_0_1991': 0.003, 'z_min_1991': 1.0,
+          'K_R_15927': 0.17, 'z_0_15927': 0.01, 'z_min_15927': 2.0},
     
+    # Järvet tai tasanko, jolla on enintään vähäistä
+    # kasvillisuutta eikä tuuliesteitä
+    'I': {'z_0_1991': 0.01, 'z_min_1991': 1.0,
+          'K_R_15927': 0.17, 'z_0_15927': 0.01, 'z_min_15927': 2.0},
     
-    C_T = 1.0
-    O = 1.0
-    W = 0.5
-    a_r = 0.7
+    # Alue, jolla on matalaa heinää tai siihen verrattavaa
+    # kasvillisuutta ja erillisiä esteitä (puita, rakennuksia),
+    # joiden etäisyys toisistaan on vähintään 20 kertaa
+    # esteen korkeus
+    'II': {'z_0_1991': 0.05, 'z_min_1991': 2.0,
+           'K_R_15927': 0.19, 'z_0_15927': 0.05, 'z_min_15927': 4.0},
+    
+    # Alueet, joilla on säännöllinen kasvipeite tai rakennuksia
+    # tai erillisiä tuuliesteitä, joiden keskinäinen etäisyys on
+    # enintään 20 kertaa esteen korkeus (kuten kylät, esikaupunkialueet,
+    # pysyvä metsä)
+    'III': {'z_0_1991': 0.3, 'z_min_1991': 5.0,
+            'K_R_15927': 0.22, 'z_0_15927': 0.3, 'z_min_15927': 8.0},
     
-    z_0_II_1991 = 0.05
+    # Alueet, joiden pinta-alasta vähintään 15 % on rakennusten peitossa
+    # ja niiden keskimääräinen korkeus ylittää 15 m
+    'IV': {'z_0_1991': 1.0, 'z_min_1991': 10.0,
+           'K_R_15927': 0.24, 'z_0_15927': 1.0, 'z_min_15927': 16.0}
+    }
 
 
-    if terrain_category == '0':
-        # Avomeri tai merelle avoin rannikko
-        z_0_1991 = 0.003
-        z_min_1991 = 1.0
-        
-        K_R_15927 = 0.17
-        z_0_15927 = 0.01
-        z_min_15927 = 2.0
-        
-        
-    elif terrain_category == 'I':
-        # Järvet tai tasanko, jolla on enintään vähäistä
-        # kasvillisuutta eikä tuuliesteitä
-        z_0_1991 = 0.01
-        z_min_1991 = 1.0
-        
-        K_R_15927 = 0.17
-        z_0_15927 = 0.01
-        z_min_15927 = 2.0
-        
-    elif terrain_category == 'II':
-        # Alue, jolla on matalaa heinää tai siihen verrattavaa
-        # kasvillisuutta ja erillisiä esteitä (puita, rakennuksia),
-        # joiden etäisyys toisistaan on vähintään 20 kertaa
-        # esteen korkeus
-        z_0_1991 = 0.05
-        z_min_1991 = 2.0
-        
-        K_R_15927 = 0.19
-        z_0_15927 = 0.05
-        z_min_15927 = 4.0
-        
-    elif terrain_category == 'III':
-        # Alueet, joilla on säännöllinen kasvipeite tai rakennuksia
-        # tai erillisiä tuuliesteitä, joiden keskinäinen etäisyys on
-        # enintään 20 kertaa esteen korkeus (kuten kylät, esikaupunkialueet,
-        # pysyvä metsä)
-        z_0_1991 = 0.3
-        z_min_1991 = 5.0
-        
-        K_R_15927 = 0.22
-        z_0_15927 = 0.3
-        z_min_15927 = 8.0
-        
-    elif terrain_category == 'IV':
-        # Alueet, joiden pinta-alasta vähintään 15 % on rakennusten peitossa
-        # ja niiden keskimääräinen korkeus ylittää 15 m
-        z_0_1991 = 1.0
-        z_min_1991 = 10.0
-        
-        K_R_15927 = 0.24
-        z_0_15927 = 1.0
-        z_min_15927 = 16.0
-        
-    else:
-        print('Unknown terrain category!')
-    
-    
-    
-    I_S = (2.0/9.0) * ws * ( precip_horizontal**(8.0/9.0) ) \
-            * np.maximum( np.cos( (np.pi/180.0)*(wd-Theta_azimuth) ) , 0.0)
+
+
+def calc_C_R(terrain_categories, z_buildings):
+    # Roughness coefficient for all combinations of terrain category
+    # and building height
+    # terrain_categories = list of {'0','I','II','III', 'IV'}
+    # [z_buildings] = m
+    # Returns array with shape (n_terrain_categories, n_z_buildings)
     
-    k_r_1991 = 0.19 * (z_0_1991/z_0_II_1991)**0.07
+    terrain_categories = np.atleast_1d(terrain_categories)
+    z_buildings = np.atleast_1d(z_buildings).astype(np.float64)
     
-    C_R_1991 = k_r_1991 * np.log(np.max((z_building, z_min_1991))/z_0_1991)
+    K_R_15927 = np.array([terrain_parameters[tc]['K_R_15927'] \
+                          for tc in terrain_categories])
+    z_0_15927 = np.array([terrain_parameters[tc]['z_0_15927'] \
+                          for tc in terrain_categories])
+    z_min_15927 = np.array([terrain_parameters[tc]['z_min_15927'] \
+                            for tc in terrain_categories])
     
-    C_R_15927 = K_R_15927 * np.log(np.max((z_building, z_min_15927))/z_0_15927)
+    z = np.maximum(z_buildings[np.newaxis, :], z_min_15927[:, np.newaxis])
     
+    C_R_15927 = K_R_15927[:, np.newaxis] * np.log(z / z_0_15927[:, np.newaxis])
     
     # C_R_1991 or C_R_15927 ?
     # z_min is bigger in SFS-EN ISO 15927-3, which leads to
     # higher wind velocity and wind-driven rain amounts
     # when calculated for buildings for which z_building < z_min
-    C_R = C_R_15927    
+    # C_R_1991 = k_r_1991 * np.log(np.max((z_building, z_min_1991))/z_0_1991)
+    # k_r_1991 = 0.19 * (z_0_1991/z_0_II_1991)**0.07, z_0_II_1991 = 0.05
+    
+    return(C_R_15927)
+
+
+
+
+def calc_I_S(ws, wd, precip_horizontal, Theta_azimuths):
+    # Airfield annual index without the roughness and other coefficients,
+    # SFS-EN ISO 15927-3
+    # [ws] = m/s
+    # [wd] = deg, degrees clockwise from north
+    # [precip_horizontal] = mm/h
+    # [Theta_azimuths] = deg, surface azimuths
+    # Returns array with shape (n_azimuths, n_times)
     
-    I_WS = I_S * C_R * C_T * O * W * a_r
+    ws = np.asarray(ws, dtype=np.float64)
+    wd = np.asarray(wd, dtype=np.float64)
+    precip_horizontal = np.asarray(precip_horizontal, dtype=np.float64)
+    Theta_azimuths = np.atleast_1d(Theta_azimuths).astype(np.float64)
     
+    # Driving rain to a horizontal direction, independent of the surface
+    I_S_hor = (2.0/9.0) * ws * ( precip_horizontal**(8.0/9.0) )
+    
+    cos_term = np.cos( (np.pi/180.0) \
+                      *(wd[np.newaxis, :]-Theta_azimuths[:, np.newaxis]) )
+    
+    I_S = I_S_hor[np.newaxis, :] * np.maximum(cos_term, 0.0)
+    
+    return(I_S)
+
+
+
+
+def calc_WDR_coef(terrain_categories, z_buildings):
+    # Coefficient from the airfield index to wind-driven rain on the wall,
+    # C_R * C_T * O * W * a_r, SFS-EN ISO 15927-3
+    # Returns array with shape (n_terrain_categories, n_z_buildings)
+    
+    C_T = 1.0
+    O = 1.0
+    W = 0.5
+    a_r = 0.7
+    
+    C_R = calc_C_R(terrain_categories, z_buildings)
+    
+    coef = C_R * C_T * O * W * a_r
+    
+    return(coef)
+
+
+
+@profiling.profiled
+def calc_WDR_grid(ws, wd, precip_horizontal, Te,
+                  terrain_categories,
+                  z_buildings, Theta_azimuths):
+    # Wind-driven rain for all combinations of terrain category,
+    # building height and surface azimuth in one call
+    # SFS-EN ISO 15927-3, SFS-EN 1991-1-4
+    # [ws] = m/s
+    # [wd] = deg, degrees clockwise from north
+    # [precip_horizontal] = mm/h
+    # [Te] = degC
+    # terrain_categories = list of {'0','I','II','III', 'IV'}
+    # [z_buildings] = m
+    # [Theta_azimuths] = deg, surface azimuths
+    # Returns array with shape
+    # (n_terrain_categories, n_z_buildings, n_azimuths, n_times)
+    
+    I_S = calc_I_S(ws, wd, precip_horizontal, Theta_azimuths)
     
     # Include only wind-driven rain when outdoor air temperature is above 0 degC
-    idxs_subzero = Te < 0.0
-    I_WS[idxs_subzero] = 0.0
+    idxs_subzero = np.asarray(Te) < 0.0
+    I_S[:, idxs_subzero] = 0.0
+    
+    coef = calc_WDR_coef(terrain_categories, z_buildings)
     
+    I_WS = coef[:, :, np.newaxis, np.newaxis] \
+            * I_S[np.newaxis, np.newaxis, :, :]
     
     return(I_WS)
 
 
 
 
+@profiling.profiled
+def calc_WDR(ws, wd, precip_horizontal, Te, 
+             terrain_category,
+             z_building, Theta_azimuth):
+    # SFS-EN ISO 15927-3, SFS-EN 1991-1-4
+    # [ws] = m/s
+    # [wd] = deg, degrees clockwise from north
+    # [precip_horizontal] = mm/h
+    # terrain_category = {'0','I','II','III', 'IV'}
+    # [z_building] = m
+    # [Theta_azimuth] = deg, surface azimuth
+    # Single combination of calc_WDR_grid()
+    
+    I_WS = calc_WDR_grid(ws, wd, precip_horizontal, Te,
+                         [terrain_category],
+                         [z_building],
+                         [Theta_azimuth])
+    
+    return(I_WS[0, 0, 0, :])
+
+
+
+
 
 
+@profiling.profiled
 def calc_solar_radiation_to_surface(time,
                                     location,
                                     surface_tilt,
                                     surface_azimuth,
                                     Idif_hor,
                                     Idir_hor,
-                                    Te):
+                                    Te,
+                                    model='isotropic'):
+    # Solar radiation to a surface at the even time steps
+    # [Idif_hor], [Idir_hor] = W/m2, mean values for the next time step
+    # time = time stamps of the middle of the time steps
+    # model = 'isotropic', 'haydavies' or 'perez', see calc_sky_terms()
+    # Returns W/m2
+    
+    poa_global = calc_poa_global(time,
+                                 location,
+                                 surface_tilt,
+                                 surface_azimuth,
+                                 Idif_hor,
+                                 Idir_hor,
+                                 Te,
+                                 model)
+    
+    # In comsol interpolation for each time point is used,
+    # so radiation is interpolated to even hours for which 
+    # the time stamps are.
+    # The input values are for the next time step, so the even time
+    # steps are half a time step before the data points.
+    # Works for any length and time step of the data, see resampling.py
     
+    poa_global_evenHours = resampling.resample(poa_global,
+                                               kind_in='mean',
+                                               kind_out='instant',
+                                               label_in='start')
+    
+    return(poa_global_evenHours)
+
+
+
+
+# Brightness coefficients of the Perez sky diffuse model, one row per
+# sky clearness bin (epsilon 1...1.065, ..., > 6.2)
+# f11, f12, f13, f21, f22, f23
+# Perez et al. 1990, Solar Energy 44(5), the same values as in pvlib
+# (not read from pvlib, the table there is not public API)
+# '1990' is the same as 'allsitescomposite1990'
+
+perez_coefficients = {
+    'allsitescomposite1990': np.array([
+        [-0.0080,  0.5880, -0.0620, -0.0600,  0.0720, -0.0220],
+        [ 0.1300,  0.6830, -0.1510, -0.0190,  0.0660, -0.0290],
+        [ 0.3300,  0.4870, -0.2210,  0.0550, -0.0640, -0.0260],
+        [ 0.5680,  0.1870, -0.2950,  0.1090, -0.1520, -0.0140],
+        [ 0.8730, -0.3920, -0.3620,  0.2260, -0.4620,  0.0010],
+        [ 1.1320, -1.2370, -0.4120,  0.2880, -0.8230,  0.0560],
+        [ 1.0600, -1.6000, -0.3590,  0.2640, -1.1270,  0.1310],
+        [ 0.6780, -0.3270, -0.2500,  0.1560, -1.3770,  0.2510]])}
+
+perez_coefficients['1990'] = perez_coefficients['allsitescomposite1990']
+
+
+
+
+# Surface-independent terms of the transposition, see calc_sky_terms()
+# key -> dict of arrays, at most sky_terms_cache_size entries
+sky_terms_cache = {}
+sky_terms_cache_size = 8
+
+
+
+
+def _location_coordinates(location):
+    # (latitude, longitude, altitude) of a station name or dict
     
     if type(location) is str:
         if 'Van' in location:
@@ -315,7 +776,66 @@ def calc_solar_radiation_to_surface(time,
         longitude = location['longitude']
         altitude = location['altitude']
     
+    return(latitude, longitude, altitude)
+
+
+
+
+def _sky_terms_key(time, location, Idif_hor, Idir_hor, Te,
+                   model, model_perez):
+    # Cache key from the values of the inputs
+    
+    import hashlib
+    import pandas as pd
+    
+    h = hashlib.blake2b(digest_size=16)
+    
+    h.update(pd.DatetimeIndex(time).asi8.tobytes())
+    
+    for x in (Idif_hor, Idir_hor, Te):
+        x = np.ascontiguousarray(x, dtype=np.float64)
+        h.update(str(x.shape).encode())
+        h.update(x.tobytes())
+    
+    h.update(repr((_location_coordinates(location),
+                   model, model_perez)).encode())
     
+    return(h.hexdigest())
+
+
+
+
+@profiling.profiled
+def calc_sky_terms(time,
+                   location,
+                   Idif_hor,
+                   Idir_hor,
+                   Te,
+                   model='isotropic',
+                   model_perez='allsitescomposite1990'):
+    # Surface-independent terms of the transposition for a station and
+    # time axis. The terms are cached, so for many surfaces (and runs
+    # with the same data) they are calculated only once.
+    # time = pandas DatetimeIndex, localized or UTC is assumed
+    # [Idif_hor], [Idir_hor] = W/m2
+    # [Te] = degC, for the atmospheric refraction
+    # model = 'isotropic', 'haydavies' or 'perez'
+    # Returns dict of read-only arrays:
+    #     solar_zenith, solar_azimuth, ghi, dhi, dni, cos_zenith
+    #     'haydavies': dni_extra, AI (anisotropy index)
+    #     'perez': dni_extra, airmass (relative), F1, F2
+    #              (brightness coefficients)
+    # model_perez = key of perez_coefficients
+    
+    import pvlib
+    
+    key = _sky_terms_key(time, location, Idif_hor, Idir_hor, Te,
+                         model, model_perez)
+    
+    if key in sky_terms_cache:
+        return(sky_terms_cache[key])
+    
+    latitude, longitude, altitude = _location_coordinates(location)
     
     solar_position = pvlib.solarposition.get_solarposition(time, 
                                                       latitude, 
@@ -325,12 +845,11 @@ def calc_solar_radiation_to_surface(time,
                                                       temperature=Te)
     
     solar_zenith = solar_position.loc[:,'zenith'].values
-
+    
     solar_azimuth = solar_position.loc[:,'azimuth'].values
     
-    # Transposition
-    ghi = Idif_hor + Idir_hor
-    dhi = Idif_hor
+    ghi = np.asarray(Idif_hor + Idir_hor, dtype=np.float64)
+    dhi = np.asarray(Idif_hor, dtype=np.float64)
     
     dni = pvlib.irradiance.dni(ghi=ghi, 
                                dhi=dhi, 
@@ -339,42 +858,205 @@ def calc_solar_radiation_to_surface(time,
                                clearsky_tolerance=1.1, 
                                zenith_threshold_for_zero_dni=88.0, 
                                zenith_threshold_for_clearsky_limit=80.0)
+    
+    sky = {'solar_zenith': solar_zenith,
+           'solar_azimuth': solar_azimuth,
+           'ghi': ghi,
+           'dhi': dhi,
+           'dni': np.asarray(dni, dtype=np.float64),
+           'cos_zenith': np.cos(np.radians(solar_zenith))}
+    
+    if model in ['haydavies', 'perez']:
+        
+        dni_extra = pvlib.irradiance.get_extra_radiation(time)
+        sky['dni_extra'] = np.asarray(dni_extra, dtype=np.float64)
+    
+    if model == 'haydavies':
+        
+        sky['AI'] = sky['dni'] / sky['dni_extra']
+    
+    elif model == 'perez':
+        
+        # pvlib.irradiance.perez() uses the relative airmass
+        airmass = pvlib.atmosphere.get_relative_airmass(solar_zenith)
+        
+        # Brightness coefficients, as in pvlib.irradiance.perez()
+        kappa = 1.041
+        z = np.radians(solar_zenith)
+        
+        delta = dhi * airmass / sky['dni_extra']
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            eps = ((dhi + sky['dni']) / dhi + kappa * (z ** 3)) \
+                / (1 + kappa * (z ** 3))
+        
+        ebin = np.digitize(eps, (0., 1.065, 1.23, 1.5, 1.95, 2.8, 4.5, 6.2))
+        ebin[np.isnan(eps)] = 0
+        ebin -= 1
+        
+        if model_perez not in perez_coefficients:
+            raise ValueError(f'Unknown Perez coefficients: {model_perez}, '
+                             f'available: {list(perez_coefficients.keys())}')
+        
+        F1c = perez_coefficients[model_perez][:, 0:3]
+        F2c = perez_coefficients[model_perez][:, 3:6]
+        
+        # Invalid eps (ebin = -1) gives nan coefficients
+        nans = np.array([np.nan, np.nan, np.nan])
+        F1c = np.vstack((F1c, nans))
+        F2c = np.vstack((F2c, nans))
+        
+        F1 = F1c[ebin, 0] + F1c[ebin, 1] * delta + F1c[ebin, 2] * z
+        F1 = np.maximum(F1, 0)
+        
+        F2 = F2c[ebin, 0] + F2c[ebin, 1] * delta + F2c[ebin, 2] * z
+        
+        # Without diffuse radiation eps is nan, but the sky diffuse
+        # radiation is zero (pvlib gives nan)
+        F1[dhi == 0.0] = 0.0
+        F2[dhi == 0.0] = 0.0
+        
+        sky['airmass'] = airmass
+        sky['F1'] = F1
+        sky['F2'] = F2
+    
+    elif model != 'isotropic':
+        raise ValueError(f'Unknown transposition model: {model}')
+    
+    for x in sky.values():
+        x.setflags(write=False)
+    
+    if len(sky_terms_cache) >= sky_terms_cache_size:
+        sky_terms_cache.pop(next(iter(sky_terms_cache)))
+    
+    sky_terms_cache[key] = sky
+    
+    return(sky)
+
 
+
+
+def calc_sky_diffuse(sky, surface_tilt, surface_azimuth, model='isotropic'):
+    # Sky diffuse radiation to a surface, W/m2
+    # sky = calc_sky_terms() with the same model
+    # Only the surface-dependent terms are calculated here.
+    
+    import pvlib
+    
+    dhi = sky['dhi']
+    
+    if model == 'isotropic':
+        
+        return(pvlib.irradiance.isotropic(surface_tilt, dhi))
+    
+    cos_tt = pvlib.irradiance.aoi_projection(surface_tilt,
+                                             surface_azimuth,
+                                             sky['solar_zenith'],
+                                             sky['solar_azimuth'])
+    cos_tt = np.maximum(cos_tt, 0)
+    
+    if model == 'haydavies':
+        
+        Rb = cos_tt / np.maximum(sky['cos_zenith'], 0.01745)
+        
+        AI = sky['AI']
+        
+        poa_isotropic = np.maximum(dhi * (1 - AI) \
+                                   * 0.5 * (1 + np.cos(np.radians(surface_tilt))),
+                                   0)
+        poa_circumsolar = np.maximum(dhi * (AI * Rb), 0)
+        
+        sky_diffuse = poa_isotropic + poa_circumsolar
+    
+    elif model == 'perez':
+        
+        F1 = sky['F1']
+        F2 = sky['F2']
+        
+        B = np.maximum(sky['cos_zenith'], np.cos(np.radians(85)))
+        
+        term1 = 0.5 * (1 - F1) * (1 + np.cos(np.radians(surface_tilt)))
+        term2 = F1 * cos_tt / B
+        term3 = F2 * np.sin(np.radians(surface_tilt))
+        
+        sky_diffuse = np.maximum(dhi * (term1 + term2 + term3), 0)
+        sky_diffuse = np.where(np.isnan(sky['airmass']), 0, sky_diffuse)
     
-    total_irrad = pvlib.irradiance.get_total_irradiance(surface_tilt, 
-                                                surface_azimuth, 
-                                                solar_zenith, 
-                                                solar_azimuth, 
-                                                dni, 
-                                                ghi, 
-                                                dhi, 
-                                                dni_extra=None, 
-                                                airmass=None, 
-                                                albedo=0.25, 
-                                                surface_type=None, 
-                                                model='isotropic', 
-                                                model_perez='allsitescomposite1990')
+    else:
+        raise ValueError(f'Unknown transposition model: {model}')
+    
+    return(sky_diffuse)
+
 
+
+
+def calc_poa_global(time,
+                    location,
+                    surface_tilt,
+                    surface_azimuth,
+                    Idif_hor,
+                    Idir_hor,
+                    Te,
+                    model='isotropic',
+                    model_perez='allsitescomposite1990'):
+    # Total solar radiation to a surface at the given time stamps
+    # (plane of array, poa), W/m2
+    # model = 'isotropic', 'haydavies' or 'perez', see calc_sky_terms()
     
-    # In comsol interpolation for each time point is used,
-    # so radiation is interpolated to even hours for which 
-    # the time stamps are.
+    import pvlib
     
+    sky = calc_sky_terms(time, location, Idif_hor, Idir_hor, Te,
+                         model, model_perez)
     
-    xp = total_irrad.index.values
-    fp = total_irrad['poa_global'].values
-    x = np.arange(-0.5,8760-0.5,1.0)
+    # Transposition
+    poa_sky_diffuse = calc_sky_diffuse(sky, surface_tilt, surface_azimuth,
+                                       model)
     
-    poa_global_evenHours = np.interp(x, xp, fp)
+    poa_ground_diffuse = pvlib.irradiance.get_ground_diffuse(surface_tilt,
+                                                             sky['ghi'],
+                                                             albedo=0.25)
     
-    # print(total_irrad['poa_global'].sum()/1000)
-    # print(poa_global_evenHours.sum()/1000)
+    aoi = pvlib.irradiance.aoi(surface_tilt,
+                               surface_azimuth,
+                               sky['solar_zenith'],
+                               sky['solar_azimuth'])
     
-    return(poa_global_evenHours)
+    total_irrad = pvlib.irradiance.poa_components(aoi,
+                                                  sky['dni'],
+                                                  poa_sky_diffuse,
+                                                  poa_ground_diffuse)
+    
+    return(np.asarray(total_irrad['poa_global']))
+
+
+
+
+def calc_poa_global_surfaces(time,
+                             location,
+                             surface_tilts,
+                             surface_azimuths,
+                             Idif_hor,
+                             Idir_hor,
+                             Te,
+                             model='isotropic',
+                             model_perez='allsitescomposite1990'):
+    # calc_poa_global() for many surfaces
+    # surface_tilts, surface_azimuths = lists of the same length, deg
+    # Returns array with shape (n_surfaces, n_times), W/m2
+    # The surface-independent terms are calculated once.
+    
+    poa_global = [calc_poa_global(time, location, surface_tilt,
+                                  surface_azimuth, Idif_hor, Idir_hor, Te,
+                                  model, model_perez) \
+                  for surface_tilt, surface_azimuth \
+                  in zip(surface_tilts, surface_azimuths)]
     
+    return(np.array(poa_global))
 
 
 
+
+@profiling.profiled
 def MI(dataT, dataRH, MGspeedclass, MGmaxclass, Cmat):
     
     """
@@ -523,6 +1205,149 @@ def MI(dataT, dataRH, MGspeedclass, MGmaxclass, Cmat):
 
 
 
+# Coefficients of MI() as tables, used by MI_batch()
+# k2: MGmaxclass -> (A, B, C)
+# RHmin: MGspeedclass -> RHmin
+# k1: MGspeedclass -> (k1 when M < 1, k1 when M >= 1)
+
+MI_k2_factors = {'vs': (1, 7, 2),
+                 's': (0.3, 6, 1),
+                 'mr': (0, 5, 1.5),
+                 'r': (0, 3, 1)}
+
+MI_RHmin = {'vs': 80, 's': 80, 'mr': 85, 'r': 85}
+
+MI_k1 = {'vs': (1, 2),
+         's': (0.578, 0.386),
+         'mr': (0.072, 0.097),
+         'r': (0.033, 0.014)}
+
+
+
+@profiling.profiled
+def MI_batch(dataT, dataRH, MGspeedclass, MGmaxclass, Cmat, time=None,
+             state=None, return_state=False):
+    # Mould index for many nodes at the same time, the same as MI()
+    # for each row
+    # [dataT] = degC, shape (n_nodes, n_times) or (n_times,)
+    # [dataRH] = 0...100 %, same shape
+    # [time] = h, shape (n_times,), e.g. the 'time' column of COMSOL
+    #          results. None = one hour time steps as in MI()
+    # state = dict with 'M' and 'TFR' (shape (n_nodes,)) at the first
+    #         time step, to continue an earlier calculation. None = M
+    #         and TFR start from zero.
+    # return_state = True returns (M, state), where state is for the
+    #                last time step. When the next calculation starts
+    #                from the last time step of this one (one row of
+    #                overlap), the results are exactly the same as
+    #                from one calculation.
+    # Returns M with the same shape, float64
+    # float32 inputs are converted to float64, so that the small
+    # changes of M are accumulated in float64.
+    # The terms that do not depend on M are calculated for all time
+    # steps before the time loop, and the loop goes through the nodes
+    # with array operations.
+    #
+    # Variable time step:
+    # The values at time[k] are used for the step to time[k+1], as in
+    # MI() with one hour steps. The growth rate is multiplied by the
+    # length of the step, and the time from the beginning of the
+    # recession (TFR) is counted in hours. The decline rate depends on
+    # TFR (0...6 h, 6...24 h, over 24 h), so during a step the rate is
+    # integrated over the parts of the step in each TFR range. With one
+    # hour steps the results are exactly the same as from MI(), and
+    # sub-hourly or irregular solver output can be used directly.
+
+    dataT = np.asarray(dataT, dtype=np.float64)
+    dataRH = np.asarray(dataRH, dtype=np.float64)
+
+    is_1d = (dataT.ndim == 1)
+    if is_1d:
+        dataT = dataT[np.newaxis, :]
+        dataRH = dataRH[np.newaxis, :]
+
+    A, B, C = MI_k2_factors[MGmaxclass]
+    RHmin = MI_RHmin[MGspeedclass]
+    k1_below1, k1_above1 = MI_k1.get(MGspeedclass, MI_k1['r'])
+
+    # Limit value for RH, growth condition and Mmax
+    RHcrit = np.maximum(-0.00267*dataT**3 + 0.16*dataT**2 \
+                        -3.13*dataT+100, RHmin)
+    RHcrit[dataT < 0.0] = 100
+
+    grows = (dataT > 0.0) & (dataT < 50.0) & (dataRH >= RHcrit)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        dummy1 = (RHcrit-dataRH)/(RHcrit-100.0)
+        Mmax = np.maximum(A + B*dummy1 - C*dummy1**2, 0.0)
+
+        dummy2 = -0.68*np.log(dataT) \
+            -13.9*np.log(dataRH) + 66.02
+        speed = 1.0/(7*np.exp(dummy2))
+
+    # Decline rates during recession, 1/h
+    dMdt0_0_6h = -0.032*(1/24)
+    dMdt0_over24h = -0.016*(1/24)
+
+    n_nodes, n_times = dataT.shape
+
+    # Length of the time steps, h
+    if time is None:
+        dt = np.ones(n_times)
+    else:
+        dt = np.diff(np.asarray(time, dtype=np.float64), append=np.nan)
+        if np.any(dt[:-1] <= 0.0):
+            raise ValueError('time must be increasing')
+
+    M = np.zeros((n_nodes, n_times))
+
+    # Time from the beginning of the recession, h
+    TFR = np.zeros(n_nodes)
+
+    if state is not None and n_times > 0:
+        M[:, 0] = state['M']
+        TFR = np.array(state['TFR'], dtype=np.float64).reshape(n_nodes)
+
+    for k in range(n_times - 1):
+
+        g = grows[:, k]
+        Mk = M[:, k]
+
+        k1 = np.where(Mk < 1.0, k1_below1, k1_above1)
+
+        with np.errstate(over='ignore', invalid='ignore'):
+            k2 = np.maximum(1.0-np.exp(2.3*(Mk-Mmax[:, k])), 0.0)
+            dMdt_grow = speed[:, k] * k1 * k2 * (1.0/24.0)
+
+        # Parts of the step with TFR in 0...6 h and over 24 h
+        TFR_start = TFR
+        TFR_end = TFR + dt[k]
+        dt_0_6h = np.maximum(np.minimum(TFR_end, 6.0) - TFR_start, 0.0)
+        dt_over24h = np.maximum(TFR_end - np.maximum(TFR_start, 24.0), 0.0)
+
+        dM_decline = Cmat * (dMdt0_0_6h*dt_0_6h + dMdt0_over24h*dt_over24h)
+
+        dM = np.where(g, dMdt_grow*dt[k], dM_decline)
+
+        TFR = np.where(g, 0.0, TFR_end)
+
+        M[:, k+1] = np.maximum(Mk + dM, 0)
+
+    if return_state:
+        state = {'M': M[:, -1].copy(),
+                 'TFR': TFR.copy()}
+
+    if is_1d:
+        M = M[0, :]
+
+    if return_state:
+        return(M, state)
+
+    return(M)
+
+
+
+@profiling.profiled
 def MI_RHcrit(T):
     # [T] = degC
     # RHCrit always for very sensitive
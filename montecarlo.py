@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Monte Carlo realisations of one climate file for COMSOL input files.
+
+The uncertain parameters are declared as a list of dicts, e.g.
+
+parameters = [{'name': 'dT', 'distribution': 'normal',
+               'mean': 0.0, 'std': 1.0},
+              {'name': 'precip_scale', 'distribution': 'uniform',
+               'low': 0.8, 'high': 1.2},
+              {'name': 'terrain_category', 'distribution': 'choice',
+               'values': ['I', 'II', 'III'], 'p': [0.25, 0.5, 0.25]},
+              {'name': 'z_building', 'distribution': 'triangular',
+               'left': 3.0, 'mode': 6.0, 'right': 12.0}]
+
+Distributions and their keys:
+    'normal': mean, std
+    'lognormal': mean, sigma (of the underlying normal distribution)
+    'uniform': low, high
+    'triangular': left, mode, right
+    'choice': values, p (optional probabilities)
+
+Parameters that are used:
+    dT = shift of the outdoor air temperature, K. The relative humidity
+         of the climate file is kept, so the vapour content follows
+         the temperature.
+    precip_scale = multiplier of the horizontal precipitation
+    terrain_category = {'0','I','II','III', 'IV'}
+    z_building = m
+Parameters that are not declared get the fixed values given to
+draw_samples() or run().
+
+The samples are drawn with np.random.default_rng(seed), so the same
+seed gives the same samples regardless of the number of processes.
+
+The derived series are calculated for a batch of samples at a time
+with arrays of shape (n_samples, n_times). The batches are run on
+a process pool.
+
+Output:
+    output_folder/sample_0000/Ti.csv, phii.csv, Te.csv, RHe.csv,
+                              wdr.csv, LWincoming.csv, sunrad.csv
+    output_folder/samples.csv = parameters and folder of each sample
+
+The solar radiation does not depend on the parameters (the air
+temperature is used only for the atmospheric refraction of the solar
+position), so it is calculated once with the original temperatures.
+
+"""
+
+import os
+import concurrent.futures
+import numpy as np
+import pandas as pd
+
+import comsol_inputs
+import helper
+import rolling
+
+
+
+
+fixed_values = {'dT': 0.0,
+                'precip_scale': 1.0,
+                'terrain_category': 'I',
+                'z_building': 6.0}
+
+
+
+
+def draw_samples(parameters, n_samples, seed=None, fixed=None):
+    # Returns DataFrame with one row per sample and one column per
+    # parameter in fixed_values and in parameters
+    # fixed = dict, values of the parameters that are not drawn
+
+    rng = np.random.default_rng(seed)
+
+    samples = {**fixed_values, **(fixed or {})}
+    samples = {key: [value]*n_samples for key, value in samples.items()}
+
+    for par in parameters:
+
+        dist = par['distribution']
+
+        if dist == 'normal':
+            x = rng.normal(par['mean'], par['std'], n_samples)
+        elif dist == 'lognormal':
+            x = rng.lognormal(par['mean'], par['sigma'], n_samples)
+        elif dist == 'uniform':
+            x = rng.uniform(par['low'], par['high'], n_samples)
+        elif dist == 'triangular':
+            x = rng.triangular(par['left'], par['mode'], par['right'],
+                               n_samples)
+        elif dist == 'choice':
+            x = rng.choice(np.array(par['values'], dtype=object),
+                           size=n_samples,
+                           p=par.get('p'))
+        else:
+            raise ValueError(f'Unknown distribution: {dist}')
+
+        samples[par['name']] = list(x)
+
+    df = pd.DataFrame(samples)
+    df.index.name = 'sample'
+
+    return(df)
+
+
+
+
+def calc_sample_series(df, header, samples, slope_as_quotient,
+                       surface_azimuth):
+    # Derived series for all samples at the same time
+    # df, header = helper.read_wac()
+    # samples = rows of draw_samples()
+    # Returns dict: quantity -> array with shape (n_samples, n_times)
+
+    time_step = header['time_step']
+
+    dT = samples.loc[:, 'dT'].values.astype(np.float64)
+    precip_scale = samples.loc[:, 'precip_scale'].values.astype(np.float64)
+
+    TA = df.loc[:,'TA'].values
+    HREL = df.loc[:,'HREL'].values
+
+    Te = TA[np.newaxis, :] + dT[:, np.newaxis]
+    RHe = np.broadcast_to(HREL, Te.shape)
+
+    series = {}
+
+    # Indoor conditions
+    results = helper.calc_indoor_models(Te, RHe, helper.indoor_models[:1],
+                                        time_step=time_step)
+    Ti, vi, phii = results[helper.indoor_models[0]['name']]
+
+    series['Ti'] = Ti
+    series['phii'] = phii
+    series['Te'] = Te
+    series['RHe'] = 100 * RHe
+
+    # Wind-driven rain, the airfield index is proportional to
+    # precipitation**(8/9)
+    I_S = helper.calc_I_S(df.loc[:,'WS'],
+                          df.loc[:,'WD'],
+                          df.loc[:,'RN'],
+                          surface_azimuth)
+
+    coef = np.array([helper.calc_WDR_coef([tc], [z])[0, 0] \
+                     for tc, z in zip(samples.loc[:, 'terrain_category'],
+                                      samples.loc[:, 'z_building'])])
+
+    I_WS = (coef * precip_scale**(8.0/9.0))[:, np.newaxis] * I_S
+
+    # Only when outdoor air temperature is above 0 degC
+    I_WS[Te < 0.0] = 0.0
+
+    series['wdr'] = I_WS
+
+    # Long-wave radiation
+    T_ground = rolling.trailing_mean(Te, int(round(730.0/time_step)))
+
+    series['LWincoming'] = helper.calc_LWincoming_from_T_ground(slope_as_quotient,
+                                                                df.loc[:,'ILAH'].values,
+                                                                T_ground)
+
+    return(series)
+
+
+
+
+def run_batch(fname, samples, output_folder, SW_incoming,
+              slope_as_quotient, surface_azimuth, store_folder=None):
+    # Calculates and writes the files of a batch of samples
+    # store_folder = see helper.save_to_file_for_comsol()
+    # Returns list of sample folders
+
+    df, header = helper.read_wac(fname)
+
+    series = calc_sample_series(df, header, samples,
+                                slope_as_quotient, surface_azimuth)
+
+    folders = []
+
+    for idx_row, idx_sample in enumerate(samples.index):
+
+        folder = os.path.join(output_folder, f'sample_{idx_sample:04d}')
+
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+
+        for quantity, x in series.items():
+            helper.save_to_file_for_comsol(x[idx_row, :],
+                                           os.path.join(folder,
+                                                        f'{quantity}.csv'),
+                                           header['time_step'],
+                                           store_folder=store_folder)
+
+        helper.save_to_file_for_comsol(SW_incoming,
+                                       os.path.join(folder, 'sunrad.csv'),
+                                       header['time_step'],
+                                       store_folder=store_folder)
+
+        folders.append(folder)
+
+    return(folders)
+
+
+
+
+def run(fname, output_folder, samples,
+        start_time='2011-01-01 00:00:00',
+        surface_azimuth=180.0,
+        slope_as_quotient=100000.0,
+        batch_size=10,
+        n_workers=None,
+        store_folder=None):
+    # fname = wac file
+    # samples = draw_samples()
+    # batch_size = number of samples calculated together
+    # n_workers = number of processes, None = number of cores,
+    #             1 = run in this process
+    # store_folder = content-addressed storage, e.g. sunrad.csv is the
+    #                same for all samples, see
+    #                helper.save_to_file_for_comsol(). None = plain files
+    # Returns the samples with the folder of each sample, also
+    # written to output_folder/samples.csv
+
+    if not os.path.exists(output_folder):
+        os.makedirs(output_folder)
+
+    # Solar radiation, the same for all samples
+    df, header = helper.read_wac(fname)
+
+    time_fin_normal, time_utc = helper.calc_time_axis(start_time,
+                                                      header['n_data_lines'],
+                                                      header['time_step'],
+                                                      header['timezone'])
+
+    surface_tilt = np.arctan(slope_as_quotient)*(180/np.pi)
+
+    SW_incoming = comsol_inputs.calc_sunrad(df, header, time_utc,
+                                            surface_tilt, surface_azimuth)
+
+    batches = [samples.iloc[idx:idx+batch_size] \
+               for idx in range(0, len(samples), batch_size)]
+
+    args = (output_folder, SW_incoming, slope_as_quotient, surface_azimuth,
+            store_folder)
+
+    folders = []
+
+    if n_workers == 1:
+        for batch in batches:
+            folders.extend(run_batch(fname, batch, *args))
+
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=n_workers) as executor:
+            futures = [executor.submit(run_batch, fname, batch, *args) \
+                       for batch in batches]
+            for future in futures:
+                folders.extend(future.result())
+                print(f'{len(folders)}/{len(samples)} samples', flush=True)
+
+    samples = samples.copy()
+    samples['folder'] = folders
+
+    samples.to_csv(os.path.join(output_folder, 'samples.csv'))
+
+    return(samples)
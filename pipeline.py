@@ -0,0 +1,470 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Make-style runner for the 1_/2_/3_ steps.
+
+Each product is a node, dict with keys:
+    'name': unique name of the node
+    'func': module level function that makes the outputs
+    'inputs': dict, argument name -> input file
+    'params': dict, argument name -> parameter value
+    'outputs': dict, argument name -> output file or folder
+    'code_deps': optional list of modules whose source is also hashed
+
+The function is called as func(**inputs, **params, **outputs).
+
+A node depends on another node, if one of its inputs is an output of
+the other node, so the graph does not have to be given separately.
+Files that are not made by any node (e.g. wac files and the results
+files from COMSOL) are source files.
+
+A node is rebuilt only if it is stale:
+    - it has not been built before (with this state file)
+    - an output is missing or has been changed after the build
+    - the content of an input file has changed (sha256)
+    - a parameter has changed
+    - the source code of the function has changed: its module and the
+      modules of this repository it imports (recursively), e.g.
+      helper.py and results.py, and the modules in 'code_deps'
+    - an upstream node is rebuilt in the same run and its output changes
+
+The hashes of the last successful build are kept in a json state file.
+If a rebuilt upstream node writes exactly the same output as before,
+the downstream nodes are not rebuilt (the outputs are hashed again
+after the upstream node has finished).
+
+Nodes whose inputs are ready are run in parallel on a process pool.
+With n_workers=1 the nodes are run one by one in this process.
+
+run(..., dry_run=True) prints what would be rebuilt and why, without
+running anything.
+
+
+# Example, see also run_pipeline.py
+
+import pipeline
+import comsol_inputs
+
+nodes = [{'name': 'climate',
+          'func': comsol_inputs.write_climate,
+          'inputs': {'fname_wac': 'Jokioinen.wac'},
+          'params': {},
+          'outputs': {'fname_out': 'climate.pickle'}},
+         ...]
+
+if __name__ == '__main__':
+    pipeline.run(nodes, 'pipeline_state.json', dry_run=True)
+
+"""
+
+import os
+import json
+import hashlib
+import inspect
+import traceback
+import concurrent.futures
+
+
+
+
+def _hash_file(fname, file_cache):
+    # sha256 of the file content, cached with size and modification time
+
+    st = os.stat(fname)
+    key = [st.st_size, st.st_mtime_ns]
+
+    if fname in file_cache and file_cache[fname][:2] == key:
+        return(file_cache[fname][2])
+
+    h = hashlib.sha256()
+
+    with open(fname, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+
+    file_cache[fname] = key + [h.hexdigest()]
+
+    return(h.hexdigest())
+
+
+
+def _hash_path(path, file_cache):
+    # Hash of a file or of all files in a folder, None if missing
+
+    if os.path.isfile(path):
+        return(_hash_file(path, file_cache))
+
+    if not os.path.isdir(path):
+        return(None)
+
+    h = hashlib.sha256()
+
+    for folder, dirs, files in sorted(os.walk(path)):
+        dirs.sort()
+        for file in sorted(files):
+            fname = os.path.join(folder, file)
+            h.update(os.path.relpath(fname, path).encode('utf-8'))
+            h.update(_hash_file(fname, file_cache).encode('utf-8'))
+
+    return(h.hexdigest())
+
+
+
+def _code_files(func, code_deps=()):
+    # Source files of the function: its module and the modules of this
+    # repository (the same folder) that the module uses, recursively.
+    # Modules and functions imported into the module namespace are
+    # followed, e.g. 'import helper' and 'from helper import MI'.
+    # code_deps = extra modules, e.g. [helper, results]
+
+    module = inspect.getmodule(func)
+
+    if module is None or getattr(module, '__file__', None) is None:
+        return([])
+
+    folder = os.path.dirname(os.path.abspath(module.__file__))
+
+    files = set()
+    todo = [module] + list(code_deps)
+
+    while len(todo) > 0:
+
+        module = todo.pop()
+        fname = getattr(module, '__file__', None)
+
+        if fname is None:
+            continue
+
+        fname = os.path.abspath(fname)
+
+        if fname in files:
+            continue
+
+        files.add(fname)
+
+        for value in vars(module).values():
+            module_used = value if inspect.ismodule(value) \
+                else inspect.getmodule(value)
+            fname_used = getattr(module_used, '__file__', None)
+            if fname_used is not None \
+                    and os.path.dirname(os.path.abspath(fname_used)) == folder:
+                todo.append(module_used)
+
+    return(sorted(files))
+
+
+
+def _hash_code(node, file_cache):
+    # Hash of the name of the function and of the source files it
+    # depends on (_code_files), so that a change in e.g. helper.MI_batch
+    # makes the nodes that use it stale
+
+    func = node['func']
+
+    h = hashlib.sha256(f'{func.__module__}.{func.__qualname__}\n' \
+                       .encode('utf-8'))
+
+    for fname in _code_files(func, node.get('code_deps', ())):
+        h.update(os.path.basename(fname).encode('utf-8'))
+        h.update(_hash_file(fname, file_cache).encode('utf-8'))
+
+    return(h.hexdigest())
+
+
+
+
+def _params_text(params):
+    # Parameters as text, so they can be compared with the state file
+
+    return({key: repr(value) for key, value in params.items()})
+
+
+
+
+def _graph(nodes):
+    # Returns dict node name -> list of upstream node names,
+    # and the node names in topological order
+
+    names = [node['name'] for node in nodes]
+
+    if len(set(names)) < len(names):
+        raise ValueError('Node names must be unique')
+
+    producers = {}
+
+    for node in nodes:
+        for path in node['outputs'].values():
+            path = os.path.abspath(path)
+            if path in producers:
+                raise ValueError(f'{path} is an output of both '
+                                 f'{producers[path]} and {node["name"]}')
+            producers[path] = node['name']
+
+    upstream = {}
+
+    for node in nodes:
+        upstream[node['name']] = sorted({producers[os.path.abspath(path)] \
+                                         for path in node['inputs'].values() \
+                                         if os.path.abspath(path) in producers})
+
+    order = []
+    visiting = set()
+
+    def visit(name):
+        if name in order:
+            return
+        if name in visiting:
+            raise ValueError(f'Cycle in the graph at node {name}')
+        visiting.add(name)
+        for name_up in upstream[name]:
+            visit(name_up)
+        visiting.remove(name)
+        order.append(name)
+
+    for name in names:
+        visit(name)
+
+    return(upstream, order)
+
+
+
+def _reasons(node, record, file_cache, rebuilt_upstream):
+    # List of reasons why the node is stale, empty list = up to date
+
+    if record is None:
+        return(['not built before'])
+
+    reasons = []
+
+    for path in node['outputs'].values():
+        h = _hash_path(path, file_cache)
+        if h is None:
+            reasons.append(f'output missing: {path}')
+        elif h != record['outputs'].get(path):
+            reasons.append(f'output changed: {path}')
+
+    if _hash_code(node, file_cache) != record['code']:
+        reasons.append(f'code changed: {node["func"].__qualname__}')
+
+    params_old = record['params']
+    for key, value in _params_text(node['params']).items():
+        if params_old.get(key) != value:
+            reasons.append(f'parameter changed: {key} ' \
+                           f'{params_old.get(key)} -> {value}')
+
+    for name_up in rebuilt_upstream:
+        reasons.append(f'upstream node is rebuilt: {name_up}')
+
+    if len(rebuilt_upstream) == 0:
+        for path in node['inputs'].values():
+            h = _hash_path(path, file_cache)
+            if h is None:
+                reasons.append(f'input missing: {path}')
+            elif h != record['inputs'].get(path):
+                reasons.append(f'input changed: {path}')
+
+    return(reasons)
+
+
+
+def _record(node, file_cache):
+    # State of a successfully built node
+
+    return({'code': _hash_code(node, file_cache),
+            'params': _params_text(node['params']),
+            'inputs': {path: _hash_path(path, file_cache) \
+                       for path in node['inputs'].values()},
+            'outputs': {path: _hash_path(path, file_cache) \
+                        for path in node['outputs'].values()}})
+
+
+
+
+def read_state(state_file):
+
+    if not os.path.exists(state_file):
+        return({'nodes': {}, 'files': {}})
+
+    with open(state_file, 'r', encoding='utf-8') as f:
+        return(json.load(f))
+
+
+
+def write_state(state, state_file):
+    # Written to a temporary file first, so that an interrupted
+    # run does not leave a broken state file
+
+    fname_tmp = state_file + '.tmp'
+
+    with open(fname_tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=1)
+
+    os.replace(fname_tmp, state_file)
+
+
+
+
+def _run_node(node):
+
+    node['func'](**node['inputs'], **node['params'], **node['outputs'])
+
+
+
+
+def run(nodes, state_file, targets=None, dry_run=False, n_workers=None):
+    # nodes = list of node dicts, see the beginning of this file
+    # state_file = json file for the hashes of the last builds
+    # targets = list of node names to bring up to date together with
+    #           their upstream nodes, None = all nodes
+    # dry_run = only print what would be rebuilt and why
+    # n_workers = number of parallel processes, None = number of cores,
+    #             1 = run in this process
+    # Returns dict node name -> status
+    # status = 'up to date', 'built', 'would build', 'failed' or 'skipped'
+
+    nodes_by_name = {node['name']: node for node in nodes}
+
+    upstream, order = _graph(nodes)
+
+    if targets is not None:
+        selected = set()
+        def select(name):
+            if name not in selected:
+                selected.add(name)
+                for name_up in upstream[name]:
+                    select(name_up)
+        for name in targets:
+            select(name)
+        order = [name for name in order if name in selected]
+
+    state = read_state(state_file)
+    file_cache = state['files']
+
+    status = {}
+
+
+    def check(name):
+        # Returns reasons for a node, whose upstream nodes are finished
+
+        # In a dry run the outputs of the upstream nodes are not yet
+        # made. In a build they are, and the input hashes decide.
+        rebuilt = [name_up for name_up in upstream[name] \
+                   if status[name_up] == 'would build']
+
+        return(_reasons(nodes_by_name[name],
+                        state['nodes'].get(name),
+                        file_cache,
+                        rebuilt))
+
+
+    ## Dry run, nodes are checked in topological order
+
+    if dry_run:
+
+        for name in order:
+
+            reasons = check(name)
+
+            if len(reasons) == 0:
+                status[name] = 'up to date'
+                print(f'{name}: up to date', flush=True)
+            else:
+                status[name] = 'would build'
+                print(f'{name}: would build', flush=True)
+                for reason in reasons:
+                    print(f'    {reason}', flush=True)
+
+        return(status)
+
+
+    ## Build
+
+    def finish(name, error=None):
+
+        if error is None:
+            status[name] = 'built'
+            state['nodes'][name] = _record(nodes_by_name[name], file_cache)
+            print(f'{name}: built', flush=True)
+        else:
+            status[name] = 'failed'
+            state['nodes'].pop(name, None)
+            print(f'{name}: failed\n{error}', flush=True)
+
+        write_state(state, state_file)
+
+
+    def ready_nodes():
+        # Nodes whose upstream nodes are finished
+
+        names = []
+
+        for name in order:
+            if name in status or name in running:
+                continue
+            if all(name_up in status for name_up in upstream[name]):
+                names.append(name)
+
+        return(names)
+
+
+    def start(name):
+        # Returns True if the node needs to be built
+
+        if any(status[name_up] in ('failed', 'skipped') \
+               for name_up in upstream[name]):
+            status[name] = 'skipped'
+            print(f'{name}: skipped, upstream node failed', flush=True)
+            return(False)
+
+        reasons = check(name)
+
+        if len(reasons) == 0:
+            status[name] = 'up to date'
+            print(f'{name}: up to date', flush=True)
+            return(False)
+
+        print(f'{name}: building ({"; ".join(reasons)})', flush=True)
+        return(True)
+
+
+    running = {}
+
+    if n_workers == 1:
+
+        for name in order:
+            if start(name):
+                try:
+                    _run_node(nodes_by_name[name])
+                    finish(name)
+                except Exception:
+                    finish(name, traceback.format_exc())
+
+        return(status)
+
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=n_workers) as executor:
+
+        while len(status) < len(order):
+
+            for name in ready_nodes():
+                if start(name):
+                    running[name] = executor.submit(_run_node,
+                                                    nodes_by_name[name])
+
+            if len(running) == 0:
+                continue
+
+            done, not_done = concurrent.futures.wait(running.values(),
+                                                     return_when='FIRST_COMPLETED')
+
+            for name, future in list(running.items()):
+                if future in done:
+                    del running[name]
+                    try:
+                        future.result()
+                        finish(name)
+                    except Exception:
+                        finish(name, traceback.format_exc())
+
+    return(status)
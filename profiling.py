@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Opt-in timing and memory instrumentation for the "1_", "2_" and "3_"
+scripts and the functions in helper.py.
+
+Instrumentation is disabled by default. It is enabled either by calling
+profiling.enable() at the beginning of a script or by setting the
+environment variable COMSOL_TOOLS_PROFILE=1 before starting python.
+
+For each stage the following values are recorded:
+    - number of calls
+    - wall time, s
+    - CPU time of the process (user + system), s
+    - process peak RSS so far: peak resident set size of the whole
+      process since it started, at the end of the stage, MB. This is not
+      the peak of the stage itself, every stage after the largest one
+      shows the same value.
+    - peak RSS increase: how much the stage raised the process peak, MB.
+      Stages that did not need more memory than any earlier stage show 0.
+
+Stages can be nested. The time of an inner stage is included also in the
+time of the outer stage.
+
+When instrumentation is disabled, stage() returns a shared no-op context
+manager and the functions decorated with @profiled only check one
+module level flag before calling the original function.
+
+
+# Example
+
+import profiling
+
+profiling.enable()
+
+@profiling.profiled
+def calc_something(x):
+    return(2*x)
+
+with profiling.stage('calculate'):
+    y = calc_something(1.0)
+
+profiling.report(output_folder)
+
+"""
+
+import os
+import sys
+import time
+import json
+import functools
+import contextlib
+
+
+_enabled = os.environ.get('COMSOL_TOOLS_PROFILE', '0') not in ('', '0')
+
+# Summary values per stage name
+_stats = {}
+
+# One item per finished stage call, in the order the stages finished
+_trace = []
+
+# Names of the stages that are currently open
+_stack = []
+
+_t0 = time.perf_counter()
+
+_null_stage = contextlib.nullcontext()
+
+
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+
+def is_enabled():
+    return(_enabled)
+
+
+
+def reset():
+    global _t0
+    _stats.clear()
+    _trace.clear()
+    _stack.clear()
+    _t0 = time.perf_counter()
+
+
+
+
+def _peak_rss_MB():
+    # Peak resident set size of the whole process, MB
+    # Returns None if it can not be determined
+
+    try:
+        import resource
+
+        ru_maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        if sys.platform == 'darwin':
+            # bytes
+            return(ru_maxrss / 1024**2)
+        else:
+            # kilobytes
+            return(ru_maxrss / 1024)
+
+    except ImportError:
+        # Windows, psutil is optional
+        try:
+            import psutil
+
+            return(psutil.Process().memory_info().peak_wset / 1024**2)
+
+        except (ImportError, AttributeError):
+            return(None)
+
+
+
+
+class _Stage:
+
+    __slots__ = ('name', 'wall_start', 'cpu_start', 'rss_start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        _stack.append(self.name)
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.rss_start = _peak_rss_MB()
+        return(self)
+
+    def __exit__(self, exc_type, exc_value, tb):
+        wall = time.perf_counter() - self.wall_start
+        cpu = time.process_time() - self.cpu_start
+        peak_rss = _peak_rss_MB()
+
+        if peak_rss is None or self.rss_start is None:
+            rss_increase = None
+        else:
+            rss_increase = peak_rss - self.rss_start
+
+        _stack.pop()
+
+        item = _stats.setdefault(self.name, {'calls': 0,
+                                             'wall_s': 0.0,
+                                             'cpu_s': 0.0,
+                                             'process_peak_rss_MB': None,
+                                             'peak_rss_increase_MB': None})
+        item['calls'] += 1
+        item['wall_s'] += wall
+        item['cpu_s'] += cpu
+        if peak_rss is not None:
+            item['process_peak_rss_MB'] = max(item['process_peak_rss_MB'] or 0.0,
+                                              peak_rss)
+        if rss_increase is not None:
+            item['peak_rss_increase_MB'] = max(item['peak_rss_increase_MB'] or 0.0,
+                                               rss_increase)
+
+        _trace.append({'name': self.name,
+                       'parent': _stack[-1] if len(_stack) > 0 else None,
+                       'start_s': self.wall_start - _t0,
+                       'wall_s': wall,
+                       'cpu_s': cpu,
+                       'process_peak_rss_MB': peak_rss,
+                       'peak_rss_increase_MB': rss_increase})
+
+        # Exceptions are not suppressed
+        return(False)
+
+
+
+
+def stage(name):
+    # Context manager that records one call of stage 'name'
+
+    if not _enabled:
+        return(_null_stage)
+
+    return(_Stage(name))
+
+
+
+def profiled(func=None, name=None):
+    # Decorator, the stage name is the function name by default
+    # Can be used as @profiled or @profiled(name='my stage')
+
+    if func is None:
+        return(functools.partial(profiled, name=name))
+
+    stage_name = func.__name__ if name is None else name
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+
+        if not _enabled:
+            return(func(*args, **kwargs))
+
+        with _Stage(stage_name):
+            return(func(*args, **kwargs))
+
+    return(wrapper)
+
+
+
+
+def summary():
+    # List of summary rows, one row per stage name
+
+    rows = []
+
+    for name, item in _stats.items():
+        rows.append({'name': name, **item})
+
+    return(rows)
+
+
+
+def report(output_folder=None, file_name='profiling_trace.json'):
+    # Print a summary table and optionally write the summary and the
+    # full trace to a json file. Does nothing if nothing was recorded.
+
+    rows = summary()
+
+    if len(rows) == 0:
+        return(rows)
+
+    name_width = max(len('stage'), max(len(row['name']) for row in rows))
+
+    # The process peak is the peak since the start of the process, the
+    # increase is how much the stage raised it
+    print(f'{"stage":<{name_width}} {"calls":>7} {"wall, s":>10}' \
+          f' {"cpu, s":>10} {"process peak RSS so far, MB":>27}' \
+          f' {"peak RSS increase, MB":>22}')
+
+    for row in rows:
+        rss_str = {}
+        for key in ('process_peak_rss_MB', 'peak_rss_increase_MB'):
+            if row[key] is None:
+                rss_str[key] = '-'
+            else:
+                rss_str[key] = f'{row[key]:.1f}'
+
+        print(f'{row["name"]:<{name_width}} {row["calls"]:>7d}' \
+              f' {row["wall_s"]:>10.3f} {row["cpu_s"]:>10.3f}' \
+              f' {rss_str["process_peak_rss_MB"]:>27}' \
+              f' {rss_str["peak_rss_increase_MB"]:>22}', flush=True)
+
+    if output_folder is not None:
+
+        fname = os.path.join(output_folder,
+                             file_name)
+
+        with open(fname, 'w') as f:
+            json.dump({'summary': rows, 'trace': _trace}, f, indent=1)
+
+    return(rows)
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Psychrometric functions, SFS-EN ISO 13788
+
+[T_] = degC
+[RH] = 1 (0...1)
+[p] = Pa
+[v] = g/m3
+
+The saturation vapour pressure is calculated over ice when T_ < 0 degC
+(phase='ice') or always over water (phase='water'):
+
+    psat = 610.5 * exp(a*T_/(b+T_))
+
+    water: a = 17.269, b = 237.3
+    ice:   a = 21.875, b = 265.5
+
+The ice and water coefficients are selected arithmetically from the
+sub-zero indicator (0.0 or 1.0), so that all rows are calculated with a
+single exp() pass and no boolean indexing.
+
+All functions accept optional preallocated buffers:
+    out  = array for the return value
+    work = scratch array with the same shape
+
+The calculations are done in place in these two arrays, so no other
+temporary arrays are created. If T_ is float32 (or out is float32),
+the calculations are done in float32. The buffers must not share memory
+with the input arrays.
+
+
+# Example
+
+import numpy as np
+import psychrometrics
+
+T = np.random.uniform(-20.0, 30.0, size=10**7).astype(np.float32)
+RH = np.full(T.shape, 0.8, dtype=np.float32)
+
+out = np.empty_like(T)
+work = np.empty_like(T)
+
+v = psychrometrics.v_from_RH(RH, T, out=out, work=work)
+
+"""
+
+import numpy as np
+
+
+# Gas constant of water vapour, J/(kg K)
+R_w = 461.5
+
+p_0 = 610.5
+
+a_water = 17.269
+b_water = 237.3
+
+a_ice = 21.875
+b_ice = 265.5
+
+
+
+
+def _buffers(T_, out, work, need_work=True):
+    # Returns the input as array and the out and work buffers,
+    # allocating the ones that were not given
+
+    T_ = np.asarray(T_)
+
+    if out is None:
+        if T_.dtype == np.float32:
+            dtype = np.float32
+        else:
+            dtype = np.float64
+        out = np.empty(T_.shape, dtype=dtype)
+
+    if np.may_share_memory(out, T_):
+        raise ValueError('out must not share memory with the input')
+
+    if work is None and need_work:
+        work = np.empty(out.shape, dtype=out.dtype)
+
+    return(T_, out, work)
+
+
+
+
+def psat(T_, phase='ice', out=None, work=None):
+    # Saturation vapour pressure, Pa
+
+    T_, out, work = _buffers(T_, out, work, need_work=(phase == 'ice'))
+
+    if phase == 'ice':
+
+        # Sub-zero indicator, 1.0 or 0.0
+        np.less(T_, 0.0, out=work)
+
+        # Denominator b + T_
+        np.multiply(work, b_ice - b_water, out=out)
+        out += b_water
+        out += T_
+
+        # Numerator a * T_
+        work *= a_ice - a_water
+        work += a_water
+        work *= T_
+
+        np.divide(work, out, out=out)
+
+    else:
+
+        np.add(T_, b_water, out=out)
+        np.divide(T_, out, out=out)
+        out *= a_water
+
+    np.exp(out, out=out)
+    out *= p_0
+
+    return(out)
+
+
+
+
+def vsat(T_, phase='ice', out=None, work=None):
+    # Saturation vapour concentration, g/m3
+
+    T_, out, work = _buffers(T_, out, work)
+
+    psat(T_, phase, out, work)
+
+    # 1000 * psat / (R_w * (273.15 + T_))
+    np.add(T_, 273.15, out=work)
+    work *= R_w / 1000.0
+    out /= work
+
+    return(out)
+
+
+
+
+def v_from_RH(RH, T_, phase='ice', out=None, work=None):
+    # Vapour concentration from relative humidity, g/m3
+
+    T_, out, work = _buffers(T_, out, work)
+
+    vsat(T_, phase, out, work)
+    out *= RH
+
+    return(out)
+
+
+
+
+def RH_from_v(v, T_, phase='ice', out=None, work=None):
+    # Relative humidity from vapour concentration, 1 (0...1)
+
+    T_, out, work = _buffers(T_, out, work)
+
+    if np.may_share_memory(out, v):
+        raise ValueError('out must not share memory with the input')
+
+    vsat(T_, phase, out, work)
+    np.divide(v, out, out=out)
+
+    return(out)
+
+
+
+
+def dew_point(T_, RH, phase='ice', out=None, work=None):
+    # Dew point temperature, degC
+    # With phase='ice' the frost point is returned when it is below 0 degC
+    # Inverse of psat: Td = b*y/(a - y), y = ln(pv/p_0)
+
+    T_, out, work = _buffers(T_, out, work)
+
+    if np.may_share_memory(out, RH):
+        raise ValueError('out must not share memory with the input')
+
+    psat(T_, phase, out, work)
+    out *= RH
+    out /= p_0
+    np.log(out, out=out)
+
+    # Sub-zero indicator, y < 0 is the same as Td < 0
+    if phase == 'ice':
+        np.less(out, 0.0, out=work)
+    else:
+        work.fill(0.0)
+
+    # a - y
+    work *= a_ice - a_water
+    work += a_water
+    work -= out
+
+    # y / (a - y)
+    np.divide(out, work, out=out)
+
+    # The indicator is recovered from a - y, which is above a_ice for
+    # the ice branch and below a_water for the water branch
+    if phase == 'ice':
+        np.greater(work, 0.5*(a_water + a_ice), out=work)
+    else:
+        work.fill(0.0)
+
+    # b
+    work *= b_ice - b_water
+    work += b_water
+
+    out *= work
+
+    return(out)
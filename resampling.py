@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Resampling of climate series between time grids, e.g. for COMSOL
+interpolation inputs.
+
+A series is either
+    'instant' = value at the time stamp, e.g. air temperature
+    'mean' = mean value over a period, e.g. hourly radiation
+
+The period of a mean value is given by the label of the time stamp:
+    'start' = mean over the next time step, e.g. WUFI .wac files
+    'end' = mean over the previous time step, e.g. FMI observations
+
+Time stamp i of the input is at i*step_in and time stamp j of the
+output is at start_out + j*step_out, [step_in] = [step_out] = h.
+
+Conversions:
+    mean -> instant: the mean values are placed in the middle of their
+                     periods and interpolated linearly (COMSOL
+                     interpolates linearly between the time stamps)
+    instant -> instant: linear interpolation
+    mean -> mean: the mean of the step function over the output
+                  periods, so the sum over time is kept
+    instant -> mean: the mean of the linear interpolant over the
+                     output periods
+Outside the data the first or last value is used, as in np.interp().
+
+All series of a 2D array (n_series, n_times) are resampled at the same
+time with the same interpolation indices and weights, and the result
+can be written to a preallocated array (out).
+
+
+# Example, hourly mean radiation to 10 min instantaneous values
+
+import resampling
+
+y = resampling.resample(poa_global, 1.0, 1.0/6.0,
+                        kind_in='mean', kind_out='instant',
+                        label_in='end')
+
+"""
+
+import numpy as np
+
+
+
+
+def _positions(n_out, step_in, step_out, start_out):
+    # Output time stamps in units of the input time step
+
+    return((start_out + step_out*np.arange(n_out)) / step_in)
+
+
+
+def _interp(x, pos, out):
+    # Linear interpolation of the rows of x at the positions pos
+    # (in units of the index of x), constant outside the data.
+    # The same result as np.interp(pos, np.arange(n), row) for each row.
+
+    n = x.shape[-1]
+
+    j0 = np.floor(pos).astype(np.int64)
+    np.clip(j0, 0, n-1, out=j0)
+    j1 = np.minimum(j0 + 1, n-1)
+
+    w = pos - j0
+    np.clip(w, 0.0, 1.0, out=w)
+
+    np.take(x, j0, axis=-1, out=out)
+
+    dx = np.take(x, j1, axis=-1)
+    dx -= out
+    dx *= w
+    out += dx
+
+    return(out)
+
+
+
+def _integral(x, p, kind):
+    # Integral of the rows of x from position 0 to p
+    # (in units of the index of x, value x[i] at position i)
+    # kind = 'step': x[i] over [i, i+1), 'linear': linear interpolant
+    # Outside the data the first or last value continues.
+
+    n = x.shape[-1]
+
+    if kind == 'step':
+        # Cumulative sums at the period boundaries 0, 1, ..., n
+        F = np.zeros(x.shape[:-1] + (n+1,), dtype=np.float64)
+        np.cumsum(x, axis=-1, out=F[..., 1:])
+        edges_max = n
+    else:
+        F = np.zeros(x.shape, dtype=np.float64)
+        np.cumsum(0.5*(x[..., 1:] + x[..., :-1]), axis=-1, out=F[..., 1:])
+        edges_max = n - 1
+
+    pc = np.clip(p, 0.0, edges_max)
+
+    j = np.floor(pc).astype(np.int64)
+    np.clip(j, 0, max(edges_max-1, 0), out=j)
+    u = pc - j
+
+    if kind == 'step':
+        result = np.take(F, j, axis=-1) + np.take(x, j, axis=-1)*u
+    else:
+        x0 = np.take(x, j, axis=-1)
+        x1 = np.take(x, np.minimum(j+1, n-1), axis=-1)
+        result = np.take(F, j, axis=-1) + x0*u + 0.5*(x1 - x0)*u**2
+
+    # Outside the data
+    result += np.take(x, 0, axis=-1)[..., np.newaxis] * np.minimum(p, 0.0)
+    result += np.take(x, n-1, axis=-1)[..., np.newaxis] \
+        * np.maximum(p - edges_max, 0.0)
+
+    return(result)
+
+
+
+
+def resample(x, step_in=1.0, step_out=1.0,
+             kind_in='mean', kind_out='instant',
+             label_in='start', label_out='start',
+             start_out=0.0, n_out=None, out=None):
+    # Resample series to another time grid
+    # x = array (n_times,) or (n_series, n_times), or pandas Series
+    # [step_in], [step_out] = h
+    # kind_in, kind_out = 'mean' or 'instant'
+    # label_in, label_out = 'start' or 'end', only for 'mean'
+    # [start_out] = h, time of the first output time stamp
+    # n_out = number of output values, None = the same duration as
+    #         the input
+    # out = preallocated float64 array (..., n_out), None = new array
+    # Returns out
+
+    x = np.asarray(x, dtype=np.float64)
+
+    n = x.shape[-1]
+
+    if n_out is None:
+        n_out = int(round(n * step_in / step_out))
+
+    if out is None:
+        out = np.empty(x.shape[:-1] + (n_out,), dtype=np.float64)
+
+    if out.shape != x.shape[:-1] + (n_out,):
+        raise ValueError(f'out has shape {out.shape}, '
+                         f'expected {x.shape[:-1] + (n_out,)}')
+
+    for kind in (kind_in, kind_out):
+        if kind not in ['mean', 'instant']:
+            raise ValueError(f'Unknown kind: {kind}')
+
+    for label in (label_in, label_out):
+        if label not in ['start', 'end']:
+            raise ValueError(f'Unknown label: {label}')
+
+    if n == 0:
+        return(out)
+
+    pos = _positions(n_out, step_in, step_out, start_out)
+
+    if kind_out == 'instant':
+
+        if kind_in == 'mean':
+            # Mean values in the middle of their periods
+            if label_in == 'start':
+                pos = pos - 0.5
+            else:
+                pos = pos + 0.5
+
+        return(_interp(x, pos, out))
+
+    # Output periods [a, b) in units of the input time step
+    if label_out == 'start':
+        a = pos
+    else:
+        a = pos - step_out/step_in
+    b = a + step_out/step_in
+
+    if kind_in == 'mean':
+        if label_in == 'end':
+            # Period of x[i] starts at i-1
+            a = a + 1.0
+            b = b + 1.0
+        F = _integral(x, np.concatenate((a, b)), 'step')
+    else:
+        F = _integral(x, np.concatenate((a, b)), 'linear')
+
+    np.subtract(F[..., n_out:], F[..., :n_out], out=out)
+    out /= (b - a)
+
+    return(out)
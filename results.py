@@ -0,0 +1,421 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Reading of COMSOL results files and the results store (pickle file),
+used by 2_comsol_read_results.py and the pipeline runner.
+
+The results store is a dict of pandas DataFrames, case name -> data,
+with columns 'time', 'T_<point>', 'RH_<point>' and 'M_<point>'.
+
+Parametric and batch sweep exports have the parameter columns before
+the time column, e.g. '% n_vent  time (h)  T_wood_e_up (degC) ...'.
+split_sweep() splits them into cases ('<case name>_n_vent0.5', ...)
+with one stable sort, and the mould index of the cases is calculated
+together (add_mould_indices_cases).
+
+[T] = degC
+[RH] = 0...100 %
+
+The column names and units are read from the last '%' header row of
+the results file, e.g. '% time (h)  T_wood_e_up (degC) ...', so the
+names do not have to be listed by hand. The time column is renamed to
+'time', also if the header has e.g. 'Time (h)' or 't (h)'. With
+usecols (name patterns, e.g. ['T_*', 'RH_*']) only the needed columns
+are converted to numbers, which saves time and memory with wide
+exports of many probes.
+
+
+Float32 mode
+
+With dtype=np.float32 the T and RH columns are read and the M columns
+are stored as float32, so the results store takes half of the memory
+and disk space. The 'time' column is kept as float64, because the time
+steps of long simulations need more digits. The mould index is always
+integrated in float64 (helper.MI_batch) and only the result is stored
+as float32. The largest deviation of Mmax from the float64 path is
+given in README.md.
+
+"""
+
+import re
+import pickle
+import fnmatch
+import numpy as np
+import pandas as pd
+
+import fields
+import helper
+import profiling
+
+
+
+
+_name_unit_pattern = re.compile(r'^(?P<name>.+?)\s*(\((?P<unit>[^()]*)\))?$')
+
+
+def read_results_header(fname):
+    # Column names and units from the '%' header of a COMSOL results
+    # file, e.g. '% time (h)  T_wood_e_up (degC)  RH_wood_e_up (1)'
+    # Returns (column_names, units, n_header_rows)
+    # units = dict column name -> unit, None if not given
+
+    meta, header_names, n_header_rows = fields.read_comsol_header(fname)
+
+    column_names = []
+    units = {}
+
+    for col in header_names:
+        match = _name_unit_pattern.match(col)
+        name = match.group('name')
+        column_names.append(name)
+        units[name] = match.group('unit')
+
+    if len(column_names) > 0:
+        column_names, units = normalise_time_name(column_names, units)
+
+    return(column_names, units, n_header_rows)
+
+
+
+def normalise_time_name(column_names, units=None):
+    # Renames the time column to 'time', e.g. 'Time' or 't'
+    # The first column named 'time' (any case) or 't' is used. Capital
+    # 'T' is not accepted, because it is usually the temperature.
+    # Returns (column_names, units), new list and dict
+    # Raises ValueError if there is no time column.
+
+    column_names = list(column_names)
+    units = {} if units is None else dict(units)
+
+    for idx, col in enumerate(column_names):
+        if col.lower() == 'time' or col == 't':
+            column_names[idx] = 'time'
+            if col in units:
+                units['time'] = units.pop(col)
+            return(column_names, units)
+
+    raise ValueError(f'No time column (\'time\' or \'t\') in {column_names}')
+
+
+
+def select_columns(column_names, patterns):
+    # Column names that match any of the patterns, in the order of
+    # the file. The patterns are shell-style, e.g. 'T_*' or 'RH_wood_?_up'
+    # Raises ValueError if a pattern does not match any column.
+
+    selected = [col for col in column_names \
+                if any(fnmatch.fnmatchcase(col, p) for p in patterns)]
+
+    not_found = [p for p in patterns \
+                 if not any(fnmatch.fnmatchcase(col, p) for col in column_names)]
+
+    if len(not_found) > 0:
+        raise ValueError(f'No columns for {not_found} in {column_names}')
+
+    return(selected)
+
+
+
+
+def read_results(fname, column_names=None, skiprows=None,
+                 period_to_analyse=8760.0, dtype=np.float64, usecols=None):
+    # Read COMSOL results text file
+    # column_names = names of all columns of the file, None = from the
+    #                last '%' header row (the units are dropped)
+    # skiprows = number of '%' header rows, None = from the file
+    # period_to_analyse = length of the analysed period at the end of
+    # the results, in the units of the 'time' column (h),
+    # None = use all rows
+    # dtype = np.float64 or np.float32, the 'time' column is float64
+    # usecols = list of column name patterns to read, e.g.
+    #           ['T_*', 'RH_*'], None = all columns. The 'time' column
+    #           and the sweep parameter columns are always read. Only
+    #           these columns are converted to numbers.
+    # For parametric sweeps the period is selected for each case,
+    # see split_sweep().
+    # The units of the header are in df.attrs['units'].
+
+    names_header, units, n_header_rows = read_results_header(fname)
+
+    if column_names is None:
+        column_names = names_header
+    else:
+        column_names, units = normalise_time_name(column_names, units)
+        units = {col: units.get(col) for col in column_names}
+
+    if skiprows is None:
+        skiprows = n_header_rows
+
+    sweep_cols = sweep_columns(column_names)
+
+    if usecols is None:
+        names_read = list(column_names)
+    else:
+        names_read = select_columns(column_names, usecols)
+        if 'time' in column_names and 'time' not in names_read:
+            names_read = ['time'] + names_read
+        names_read = sweep_cols + names_read
+
+    # Columns in the order of the file
+    names_read = [col for col in column_names if col in names_read]
+
+    dtypes = {col: dtype for col in names_read}
+
+    for col in ['time'] + sweep_cols:
+        if col in dtypes:
+            dtypes[col] = np.float64
+
+    df_all = pd.read_csv(fname,
+                         sep=r'\s+',
+                         skiprows=skiprows,
+                         header=None,
+                         names=column_names,
+                         usecols=names_read,
+                         dtype=dtypes)
+
+    df = select_period(df_all, period_to_analyse)
+
+    df.attrs['units'] = {col: units.get(col) for col in names_read}
+
+    return(df)
+
+
+
+def select_period(df_all, period_to_analyse=8760.0):
+    # Rows of the last period, as a new DataFrame
+    # period_to_analyse = in the units of the 'time' column (h),
+    # None = all rows
+    # For parametric sweeps the last period of each case is selected.
+
+    sweep_cols = sweep_columns(df_all.columns)
+
+    # The last period is selected with the time column, so the
+    # output time step and the number of simulated years do not matter
+    if period_to_analyse is None:
+        df = df_all.copy()
+    else:
+        if len(sweep_cols) == 0:
+            time_end = df_all.loc[:, 'time'].iloc[-1]
+        else:
+            time_end = df_all.groupby(sweep_cols, sort=False)['time'] \
+                .transform('last').values
+        idxs = df_all.loc[:, 'time'] > time_end - period_to_analyse
+        df = df_all.loc[idxs, :].copy()
+
+    df.reset_index(drop=True,
+                   inplace=True)
+
+    return(df)
+
+
+
+
+def sweep_columns(column_names):
+    # Parameter columns of a parametric or batch sweep export. COMSOL
+    # writes the parameters before the time column, e.g.
+    # '% n_vent  time (h)  T_wood_e_up (degC) ...'
+    # Returns list of column names, empty list if not a sweep
+
+    column_names = list(column_names)
+
+    if 'time' not in column_names:
+        return([])
+
+    return(column_names[:column_names.index('time')])
+
+
+
+def _value_text(value):
+    # Parameter value in the case label, short but exact, e.g. '0.5',
+    # '1.0000001', so that different values get different labels
+
+    text = f'{value:g}'
+
+    if float(text) != value:
+        if float(value).is_integer():
+            text = str(int(value))
+        else:
+            text = repr(float(value))
+
+    return(text)
+
+
+
+def split_sweep(df, period_to_analyse=None):
+    # Splits the results of a parametric sweep into cases
+    # Returns dict: case label -> DataFrame without the parameter columns
+    # case label = e.g. 'n_vent0.5', '' if the file is not a sweep
+    # period_to_analyse = see select_period(), for each case
+    # The rows are sorted once by the parameters with a stable sort,
+    # so the time order within each case is kept, and the cases are
+    # slices of the sorted data.
+
+    sweep_cols = sweep_columns(df.columns)
+
+    if len(sweep_cols) == 0:
+        return({'': select_period(df, period_to_analyse)})
+
+    keys = df.loc[:, sweep_cols].values
+
+    # np.lexsort sorts by the last key first and is stable
+    order = np.lexsort(keys.T[::-1])
+
+    keys_sorted = keys[order]
+    starts = np.flatnonzero(np.any(np.diff(keys_sorted, axis=0) != 0.0,
+                                   axis=1)) + 1
+    starts = np.concatenate(([0], starts, [len(order)]))
+
+    df_sorted = df.drop(columns=sweep_cols).iloc[order]
+    df_sorted.reset_index(drop=True, inplace=True)
+
+    cases = {}
+
+    for idx_start, idx_end in zip(starts[:-1], starts[1:]):
+
+        label = '_'.join(f'{col}{_value_text(value)}' for col, value \
+                         in zip(sweep_cols, keys_sorted[idx_start]))
+
+        if label in cases:
+            raise ValueError(f'Two sweep cases have the label {label}')
+
+        cases[label] = select_period(df_sorted.iloc[idx_start:idx_end],
+                                     period_to_analyse)
+
+    return(cases)
+
+
+
+def add_mould_indices_cases(cases, points_for_mould_index, time_col='time'):
+    # add_mould_indices() for many cases, e.g. split_sweep()
+    # The cases with the same time axis are calculated together with
+    # helper.MI_batch(), one call per probe point.
+    # cases = dict: case label -> DataFrame, changed in place
+    # Returns cases
+
+    # Cases with the same output times
+    groups = {}
+    for label, df in cases.items():
+        if time_col is None:
+            key = len(df)
+        else:
+            key = df.loc[:, time_col].values.tobytes()
+        groups.setdefault(key, []).append(label)
+
+    for labels in groups.values():
+
+        df_first = cases[labels[0]]
+
+        if time_col is None:
+            time = None
+        else:
+            time = df_first.loc[:, time_col].values
+
+        for point in points_for_mould_index:
+
+            T_data = np.stack([cases[label].loc[:, 'T_' + point[0]].values \
+                               for label in labels])
+            RH_data = np.stack([cases[label].loc[:, 'RH_' + point[0]].values \
+                                for label in labels])
+
+            M = helper.MI_batch(T_data,
+                                RH_data,
+                                point[1],
+                                point[2],
+                                point[3],
+                                time=time).astype(T_data.dtype)
+
+            for idx, label in enumerate(labels):
+                cases[label].loc[:, 'M_' + point[0]] = M[idx]
+
+    return(cases)
+
+
+
+
+def add_mould_indices(df, points_for_mould_index, time_col='time'):
+    # Adds column 'M_<point>' for each probe point
+    # points_for_mould_index = list of
+    # [point, MG_speedclass, MG_maxclass, C_mat]
+    # time_col = time column in hours, the mould index is integrated
+    # with the actual time steps of the results (see helper.MI_batch),
+    # so sub-hourly or irregular solver output is used as it is.
+    # None = rows are one hour apart
+    # M is stored with the same dtype as the T column
+
+    if time_col is None:
+        time = None
+    else:
+        time = df.loc[:, time_col].values
+
+    for point in points_for_mould_index:
+
+        M_name = 'M_' + point[0]
+        T_data = df.loc[:, 'T_' + point[0]].values
+        RH_data = df.loc[:, 'RH_' + point[0]].values
+        MG_speedclass = point[1]
+        MG_maxclass = point[2]
+        C_mat = point[3]
+
+        df.loc[:,M_name] = helper.MI_batch(T_data,
+                                           RH_data,
+                                           MG_speedclass,
+                                           MG_maxclass,
+                                           C_mat,
+                                           time=time).astype(T_data.dtype)
+
+    return(df)
+
+
+
+
+def store_cases(case_name, cases):
+    # Store keys of split_sweep() cases: case name, or
+    # '<case name>_<case label>' for the cases of a sweep
+
+    return({case_name if label == '' else f'{case_name}_{label}': df \
+            for label, df in cases.items()})
+
+
+
+def write_store(data, fname):
+    # data = dict, case name -> DataFrame
+
+    with open(fname, 'wb') as f:
+        pickle.dump(data, f)
+
+
+
+def read_store(fname):
+
+    with open(fname, 'rb') as f:
+        data = pickle.load(f)
+
+    return(data)
+
+
+
+
+def make_store(fname_results, fname_store, case_name, column_names,
+               points_for_mould_index, skiprows=None, period_to_analyse=8760.0,
+               dtype=np.float64, usecols=None):
+    # Results file -> mould index -> results store with one case
+    # column_names, skiprows, usecols = see read_results()
+
+    with profiling.stage('read results'):
+        df = read_results(fname_results,
+                          column_names,
+                          skiprows,
+                          None,
+                          dtype,
+                          usecols)
+
+        cases = split_sweep(df, period_to_analyse)
+
+    with profiling.stage('mould index'):
+        cases = add_mould_indices_cases(cases, points_for_mould_index)
+
+    with profiling.stage('write pickle'):
+        write_store(store_cases(case_name, cases), fname_store)
+
+    return(fname_store)
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Moving averages with cumulative sums, O(n) regardless of window length.
+
+The results are the same as with pandas:
+    trailing_mean(x, w) <-> x.rolling(w, min_periods=1).mean()
+    centred_mean(x, w)  <-> x.rolling(w, center=True, min_periods=1).mean()
+
+For window length w, the centred window of row i is
+rows i - w//2 ... i - w//2 + w - 1, which is the same as in pandas also
+for even window lengths. NaN values are skipped and min_periods counts
+only the non-NaN values.
+
+x can be a 1D array or an array with time along the last axis,
+e.g. shape (n_series, n_times). window can be an integer or a list of
+integers. With a list, all window lengths are calculated from the same
+cumulative sums and the result has an extra first axis (n_windows, ...).
+
+
+Streaming
+
+The *_stream() functions calculate the same values for a series that is
+given in consecutive chunks. The carry-over state is a dict that is
+returned with each result and given back with the next chunk:
+
+    state = None
+    for x_chunk in chunks:
+        y_chunk, state = rolling.trailing_mean_stream(x_chunk, 730, state)
+
+The centred mean needs values from the future, so centred_mean_stream()
+returns the results with a delay of (w - 1 - w//2) rows. The remaining
+rows are returned when final=True is given with the last chunk
+(the last chunk can also be empty).
+
+The state carries also the cumulative sums at the start of the tail,
+so the streamed results are bit for bit the same as the results from
+one call over the whole series.
+
+"""
+
+import numpy as np
+
+
+
+
+def _cumsums(x, cs0=0.0, cn0=0):
+    # Cumulative sums of the values and the number of non-NaN values,
+    # with a leading value cs0 and cn0 along the last axis.
+    # The sums are accumulated sequentially, so a stream that continues
+    # from the cumulative sum of the previous chunk gives exactly the
+    # same values as one pass over the whole series.
+
+    x = np.asarray(x, dtype=np.float64)
+
+    is_valid = ~np.isnan(x)
+
+    shape = x.shape[:-1] + (x.shape[-1] + 1,)
+
+    cs = np.empty(shape)
+    cs[..., 0] = cs0
+    cs[..., 1:] = np.where(is_valid, x, 0.0)
+    np.cumsum(cs, axis=-1, out=cs)
+
+    cn = np.empty(shape, dtype=np.int64)
+    cn[..., 0] = cn0
+    cn[..., 1:] = is_valid
+    np.cumsum(cn, axis=-1, out=cn)
+
+    return(cs, cn)
+
+
+
+def _means(cs, cn, idx, window, back, min_periods):
+    # Means of rows max(i-back, 0) ... min(i-back+window, n)-1 for i in idx
+
+    n = cs.shape[-1] - 1
+
+    starts = np.clip(idx - back, 0, n)
+    ends = np.clip(idx - back + window, 0, n)
+
+    sums = cs[..., ends] - cs[..., starts]
+    counts = cn[..., ends] - cn[..., starts]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+
+    means[counts < min_periods] = np.nan
+
+    return(means)
+
+
+
+def _windows(window):
+    # List of window lengths and whether a single window was given
+
+    if np.ndim(window) == 0:
+        return([int(window)], True)
+    else:
+        return([int(w) for w in window], False)
+
+
+
+def _collect(results, is_single):
+
+    if is_single:
+        return(results[0])
+    else:
+        return(np.stack(results, axis=0))
+
+
+
+
+def trailing_mean(x, window, min_periods=1):
+    # Mean of the current and (window - 1) previous rows
+
+    windows, is_single = _windows(window)
+
+    cs, cn = _cumsums(x)
+    idx = np.arange(cs.shape[-1] - 1)
+
+    results = [_means(cs, cn, idx, w, w - 1, min_periods) for w in windows]
+
+    return(_collect(results, is_single))
+
+
+
+def centred_mean(x, window, min_periods=1):
+    # Mean of the rows i - window//2 ... i - window//2 + window - 1
+
+    windows, is_single = _windows(window)
+
+    cs, cn = _cumsums(x)
+    idx = np.arange(cs.shape[-1] - 1)
+
+    results = [_means(cs, cn, idx, w, w // 2, min_periods) for w in windows]
+
+    return(_collect(results, is_single))
+
+
+
+
+def trailing_mean_stream(x, window, state=None, min_periods=1):
+    # Trailing mean of the next chunk x of a longer series
+    # Returns (means of the chunk, state)
+    # state['tail'] = the previous (max(window) - 1) rows
+    # state['cs0'], state['cn0'] = cumulative sums at the start of the tail
+
+    windows, is_single = _windows(window)
+
+    x = np.asarray(x, dtype=np.float64)
+
+    if state is None:
+        state = {'tail': x[..., :0], 'cs0': 0.0, 'cn0': 0}
+
+    tail = state['tail']
+
+    x_ext = np.concatenate((tail, x), axis=-1)
+
+    cs, cn = _cumsums(x_ext, state['cs0'], state['cn0'])
+    idx = np.arange(tail.shape[-1], x_ext.shape[-1])
+
+    results = [_means(cs, cn, idx, w, w - 1, min_periods) for w in windows]
+
+    n_keep = max(windows) - 1
+    idx_tail = max(x_ext.shape[-1] - n_keep, 0)
+
+    state = {'tail': x_ext[..., idx_tail:].copy(),
+             'cs0': cs[..., idx_tail].copy(),
+             'cn0': cn[..., idx_tail].copy()}
+
+    return(_collect(results, is_single), state)
+
+
+
+def centred_mean_stream(x, window, state=None, final=False, min_periods=1):
+    # Centred mean of the next chunk x of a longer series
+    # Returns (means, state). The means are delayed by
+    # max(window - 1 - window//2) rows, except when final=True
+    # state['tail'] = the rows that are still needed
+    # state['n_pending'] = number of rows at the end of the tail,
+    #                      whose means have not yet been returned
+    # state['cs0'], state['cn0'] = cumulative sums at the start of the tail
+
+    windows, is_single = _windows(window)
+
+    back = max(w // 2 for w in windows)
+    ahead = max(w - 1 - w // 2 for w in windows)
+
+    x = np.asarray(x, dtype=np.float64)
+
+    if state is None:
+        state = {'tail': x[..., :0], 'n_pending': 0, 'cs0': 0.0, 'cn0': 0}
+
+    tail = state['tail']
+    n_pending = state['n_pending']
+
+    x_ext = np.concatenate((tail, x), axis=-1)
+    n_ext = x_ext.shape[-1]
+
+    idx_first = n_ext - x.shape[-1] - n_pending
+
+    if final:
+        idx_last = n_ext
+    else:
+        idx_last = max(n_ext - ahead, idx_first)
+
+    cs, cn = _cumsums(x_ext, state['cs0'], state['cn0'])
+    idx = np.arange(idx_first, idx_last)
+
+    results = [_means(cs, cn, idx, w, w // 2, min_periods) for w in windows]
+
+    idx_tail = max(idx_last - back, 0)
+
+    state = {'tail': x_ext[..., idx_tail:].copy(),
+             'n_pending': n_ext - idx_last,
+             'cs0': cs[..., idx_tail].copy(),
+             'cn0': cn[..., idx_tail].copy()}
+
+    return(_collect(results, is_single), state)
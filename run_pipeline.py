@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+
+Bring the COMSOL input files, results stores, indicators and figures
+up to date with pipeline.py. Only the products whose inputs, parameters
+or code have changed are made again.
+
+Nodes for each wac file:
+    climate <- wac file
+    series <- climate, surface parameters
+    comsol inputs <- series
+
+Nodes for each results case:
+    results store <- COMSOL results file, mould index classes
+    indicators <- results store
+    figures <- results store
+
+The COMSOL simulations are run outside this script. The results files
+are source files of the graph, so a new simulation result makes the
+results store, indicators and figures of that case stale.
+
+Set dry_run = True to only print what would be made and why.
+
+"""
+
+import os
+
+import analysis
+import comsol_inputs
+import pipeline
+import results
+
+
+
+
+## Climate files
+
+wac_folder = os.path.join(r'C:\Users\laukkara\github\comsol_tools',
+                          'input')
+
+wac_file_names = ['Jokioinen 2011 RCP85-2080.wac']
+
+# Local standard time (no DST) of the first data row
+start_time = '2011-01-01 00:00:00'
+
+# Surface
+surface_azimuth = 180.0
+terrain_category = 'I'
+z_building = 6.0
+slope_as_quotient = 100000.0 # dy/dx
+
+# Solar radiation to the surface: 'isotropic', 'haydavies' or 'perez'
+transposition_model = 'isotropic'
+
+
+## Results cases, the results files are read from root_folder/case_folder
+
+root_folder = r'S:\91202_Rakfys_yhteiset\Tiiliverhous\2_Laskenta\narvi stuff'
+
+case_folders = ['esimerkki']
+
+file_name_to_read = 'vuoden tulokset.txt'
+
+period_to_analyse = 8760.0
+
+column_names = ['time',
+                'T_wood_e_up',
+                'RH_wood_e_up',
+                'T_wb_i_up',
+                'RH_wb_i_up',
+                'T_ins_i_up',
+                'RH_ins_i_up',
+                'T_wood_m_up',
+                'RH_wood_m_up',
+                'T_wood_i_up',
+                'RH_wood_i_up']
+
+points_for_mould_index = [['wood_e_up', 'vs', 'vs', 0.5],
+                          ['wb_i_up', 'mr', 'mr', 0.1],
+                          ['ins_i_up', 'mr', 'mr', 0.1],
+                          ['wood_m_up', 'vs', 'vs', 0.5],
+                          ['wood_i_up', 'vs', 'vs', 0.5]]
+
+dpi_val = 200
+
+
+## Output folder, also the state file is here
+
+output_folder = os.path.join(r'C:\Temp',
+                             'pipeline')
+
+dry_run = False
+
+# Number of parallel processes, None = number of cores
+n_workers = None
+
+
+
+
+def make_nodes():
+
+    nodes = []
+
+    for wac_file_name in wac_file_names:
+
+        stem = wac_file_name[:-4]
+
+        fname_climate = os.path.join(output_folder, f'{stem} climate.pickle')
+        fname_series = os.path.join(output_folder, f'{stem} series.pickle')
+
+        nodes.append({'name': f'climate {stem}',
+                      'func': comsol_inputs.write_climate,
+                      'inputs': {'fname_wac': os.path.join(wac_folder,
+                                                           wac_file_name)},
+                      'params': {},
+                      'outputs': {'fname_out': fname_climate}})
+
+        nodes.append({'name': f'series {stem}',
+                      'func': comsol_inputs.write_series,
+                      'inputs': {'fname_climate': fname_climate},
+                      'params': {'start_time': start_time,
+                                 'surface_azimuth': surface_azimuth,
+                                 'terrain_category': terrain_category,
+                                 'z_building': z_building,
+                                 'slope_as_quotient': slope_as_quotient,
+                                 'transposition_model': transposition_model},
+                      'outputs': {'fname_out': fname_series}})
+
+        nodes.append({'name': f'comsol inputs {stem}',
+                      'func': comsol_inputs.write_comsol_files,
+                      'inputs': {'fname_series': fname_series},
+                      'params': {'file_name_start': stem},
+                      'outputs': {'output_folder': os.path.join(output_folder,
+                                                                'comsol inputs',
+                                                                stem)}})
+
+
+    for case_folder in case_folders:
+
+        case_name = case_folder.replace(' ','_')
+
+        fname_store = os.path.join(output_folder,
+                                   f'{case_name}_results.pickle')
+
+        nodes.append({'name': f'results store {case_name}',
+                      'func': results.make_store,
+                      'inputs': {'fname_results': os.path.join(root_folder,
+                                                               case_folder,
+                                                               file_name_to_read)},
+                      'params': {'case_name': case_name,
+                                 'column_names': column_names,
+                                 'points_for_mould_index': points_for_mould_index,
+                                 'period_to_analyse': period_to_analyse},
+                      'outputs': {'fname_store': fname_store}})
+
+        nodes.append({'name': f'indicators {case_name}',
+                      'func': analysis.write_indicators,
+                      'inputs': {'fname_store': fname_store},
+                      'params': {},
+                      'outputs': {'fname_out': os.path.join(output_folder,
+                                                            f'{case_name}_indicators.csv')}})
+
+        nodes.append({'name': f'figures {case_name}',
+                      'func': analysis.write_figures,
+                      'inputs': {'fname_store': fname_store},
+                      'params': {'dpi_val': dpi_val},
+                      'outputs': {'output_folder': os.path.join(output_folder,
+                                                                'figures',
+                                                                case_name)}})
+
+    return(nodes)
+
+
+
+
+if __name__ == '__main__':
+    # The main guard is needed for the process pool on Windows
+
+    if not os.path.exists(output_folder):
+        os.makedirs(output_folder)
+
+    status = pipeline.run(make_nodes(),
+                          os.path.join(output_folder, 'pipeline_state.json'),
+                          dry_run=dry_run,
+                          n_workers=n_workers)
+
+    print('END')
@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Chunked generator pipeline for very long climate files.
+
+A climate source yields the data in pandas DataFrames of fixed number of
+rows. Each stage consumes the chunks, adds its own columns and yields
+the chunks forward. The index of the chunks is the row number from the
+beginning of the file, so stages know where each chunk is.
+
+Stages that need history keep their own state between chunks:
+    - indoor_stage: 24 h centred rolling means (rolling.centred_mean_stream)
+    - lw_stage: 730 h trailing mean of the ground temperature
+    - solar_stage: next row of Te and the previous radiation value
+
+The stages that need future rows yield the chunks with a small delay,
+and the last rows are yielded when the input ends. The peak memory use
+depends on the chunk size and not on the length of the record, and the
+values are the same as with the functions in helper.py for the
+whole record in memory.
+
+Columns of the .wac files are used as the input column names:
+    TA, HREL, WS, WD, RN, ISDH, ISD, ILAH
+
+
+# Example, see also 1_comsol_wac_to_comsol_streaming.py
+
+import helper
+import streaming
+
+header = helper.read_wac_header(fname)
+
+chunks = streaming.wac_chunks(fname, chunk_size=8760)
+chunks = streaming.indoor_stage(chunks, time_step=header['time_step'])
+chunks = streaming.wdr_stage(chunks, 'I', 6.0, 180.0)
+chunks = streaming.write_stage(chunks, {'Ti': 'Ti.csv',
+                                        'phii': 'phii.csv',
+                                        'I_WS': 'wdr.csv'},
+                               time_step=header['time_step'])
+streaming.consume(chunks)
+
+"""
+
+import numpy as np
+import pandas as pd
+
+import helper
+import rolling
+
+
+
+
+def wac_chunks(fname, chunk_size=8760):
+    # Climate source, yields the data rows of a WUFI .wac file
+    # in chunks of chunk_size rows
+
+    header = helper.read_wac_header(fname)
+
+    reader = pd.read_csv(fname,
+                         sep=r'\s+',
+                         skiprows=header['n_header_rows'],
+                         header=None,
+                         names=header['column_names'],
+                         nrows=header['n_data_lines'],
+                         encoding='cp1252',
+                         chunksize=chunk_size)
+
+    with reader:
+        for chunk in reader:
+            yield(chunk)
+
+
+
+def csv_chunks(fname, chunk_size=8760, sep=r'\s+'):
+    # Climate source for whitespace separated csv files with a header row
+
+    reader = pd.read_csv(fname,
+                         sep=sep,
+                         chunksize=chunk_size)
+
+    start = 0
+
+    with reader:
+        for chunk in reader:
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+            start += len(chunk)
+            yield(chunk)
+
+
+
+
+def _take(pending, n):
+    # Remove and return the first n rows of the pending chunks
+
+    if len(pending) == 1:
+        df = pending[0]
+    else:
+        df = pd.concat(pending)
+
+    pending.clear()
+
+    if n < len(df):
+        pending.append(df.iloc[n:])
+
+    return(df.iloc[:n].copy())
+
+
+
+
+def indoor_stage(chunks, models=None, time_step=1.0,
+                 Te_col='TA', RHe_col='HREL'):
+    # Adds columns Ti, vi and phii, see helper.calc_indoor_models()
+    # With several models the column names are e.g. 'Ti const21_RIL107'
+    # The chunks are delayed by 12 h because of the centred 24 h mean
+
+    if models is None:
+        models = helper.indoor_models[:1]
+
+    n_24h = int(round(24.0 / time_step))
+
+    state = None
+    pending = []
+
+    def add_columns(df, means):
+
+        results = helper.calc_indoor_models_from_24hmeans(means[0],
+                                                          means[1],
+                                                          models)
+
+        for name, (Ti, vi, phii) in results.items():
+
+            if len(models) == 1:
+                suffix = ''
+            else:
+                suffix = ' ' + name
+
+            df['Ti' + suffix] = Ti
+            df['vi' + suffix] = vi
+            df['phii' + suffix] = phii
+
+        return(df)
+
+
+    for chunk in chunks:
+
+        Te = chunk.loc[:, Te_col].values.astype(np.float64)
+        ve = chunk.loc[:, RHe_col].values * helper.calc_vsat(Te)
+
+        means, state = rolling.centred_mean_stream(np.vstack((Te, ve)),
+                                                   n_24h,
+                                                   state)
+        pending.append(chunk)
+
+        if means.shape[-1] > 0:
+            yield(add_columns(_take(pending, means.shape[-1]), means))
+
+
+    if state is not None:
+
+        means, state = rolling.centred_mean_stream(np.zeros((2, 0)),
+                                                   n_24h,
+                                                   state,
+                                                   final=True)
+
+        if means.shape[-1] > 0:
+            yield(add_columns(_take(pending, means.shape[-1]), means))
+
+
+
+
+def wdr_stage(chunks, terrain_category, z_building, Theta_azimuth,
+              name='I_WS'):
+    # Adds wind-driven rain column, see helper.calc_WDR()
+
+    for chunk in chunks:
+
+        chunk[name] = helper.calc_WDR(ws=chunk.loc[:, 'WS'].values,
+                                      wd=chunk.loc[:, 'WD'].values,
+                                      precip_horizontal=chunk.loc[:, 'RN'].values,
+                                      Te=chunk.loc[:, 'TA'].values,
+                                      terrain_category=terrain_category,
+                                      z_building=z_building,
+                                      Theta_azimuth=Theta_azimuth)
+
+        yield(chunk)
+
+
+
+
+def lw_stage(chunks, slope_as_quotient, time_step=1.0,
+             name='LW_incoming'):
+    # Adds long-wave radiation column, see helper.calc_LWincoming()
+
+    n_730h = int(round(730.0 / time_step))
+
+    state = None
+
+    for chunk in chunks:
+
+        T_ground, state = rolling.trailing_mean_stream(chunk.loc[:, 'TA'].values,
+                                                       n_730h,
+                                                       state)
+
+        LWdn = chunk.loc[:, 'ILAH'].values
+
+        chunk[name] = helper.calc_LWincoming_from_T_ground(slope_as_quotient,
+                                                           LWdn,
+                                                           T_ground)
+
+        yield(chunk)
+
+
+
+
+def solar_stage(chunks, location, surface_tilt, surface_azimuth,
+                start_time, time_step=1.0, timezone=0.0,
+                name='SW_incoming', transposition_model='isotropic'):
+    # Adds solar radiation column at the even time steps,
+    # see helper.calc_solar_radiation_to_surface()
+    # start_time = local standard time of the first row
+    # [time_step] = h
+    # [timezone] = h from UTC
+    # transposition_model = 'isotropic', 'haydavies' or 'perez',
+    #                       see helper.calc_sky_terms()
+    # The chunks are delayed by one row, because the air temperature
+    # in the middle of the time step is interpolated from the next row.
+
+    time_start_utc = pd.Timestamp(start_time) - pd.Timedelta(hours=timezone)
+
+    # Time step in integer nanoseconds, so the time stamps are exactly
+    # the same as from helper.calc_time_axis()
+    dt_ns = pd.Timedelta(hours=time_step).value
+
+    pending = []
+    poa_previous = None
+
+    def add_column(df, Te_next):
+
+        nonlocal poa_previous
+
+        # Radiation values are for the next time step
+        time_utc_plusHalfStep = time_start_utc \
+            + pd.to_timedelta(df.index.values * dt_ns + dt_ns // 2, unit='ns')
+
+        Te = df.loc[:, 'TA'].values
+        Te_ext = np.append(Te, Te_next)
+        xp = np.arange(len(Te_ext), dtype=np.float64)
+        Te_betweens = np.interp(xp[:len(Te)] + 0.5, xp, Te_ext)
+
+        poa_global = helper.calc_poa_global(time_utc_plusHalfStep,
+                                            location,
+                                            surface_tilt,
+                                            surface_azimuth,
+                                            df.loc[:, 'ISD'],
+                                            df.loc[:, 'ISDH'],
+                                            Te_betweens,
+                                            model=transposition_model)
+
+        # Interpolation to the even time steps, continued from the
+        # previous chunk
+        if poa_previous is None:
+            fp = poa_global
+            x = np.arange(len(fp), dtype=np.float64) - 0.5
+        else:
+            fp = np.append(poa_previous, poa_global)
+            x = np.arange(1, len(fp), dtype=np.float64) - 0.5
+
+        df[name] = np.interp(x, np.arange(len(fp), dtype=np.float64), fp)
+
+        poa_previous = poa_global[-1]
+
+        return(df)
+
+
+    for chunk in chunks:
+
+        pending.append(chunk)
+
+        n_pending = sum(len(df) for df in pending)
+
+        if n_pending > 1:
+            df = _take(pending, n_pending - 1)
+            yield(add_column(df, pending[0].loc[:, 'TA'].values[0]))
+
+
+    if len(pending) > 0:
+        df = _take(pending, len(pending[0]))
+
+        # The last value is kept constant, as with np.interp()
+        yield(add_column(df, np.array([])))
+
+
+
+
+def write_stage(chunks, files, time_step=1.0):
+    # Appends the columns to comsol input files
+    # files = dict, column name -> file name
+    # See helper.save_to_file_for_comsol()
+
+    handles = {col: open(fname, 'w') for col, fname in files.items()}
+
+    try:
+        for chunk in chunks:
+
+            for col, f in handles.items():
+                helper.save_to_file_for_comsol(chunk.loc[:, col].values,
+                                               f,
+                                               time_step,
+                                               start=chunk.index[0])
+
+            yield(chunk)
+
+    finally:
+        for f in handles.values():
+            f.close()
+
+
+
+
+def consume(chunks):
+    # Runs the pipeline, returns the number of rows
+
+    n = 0
+
+    for chunk in chunks:
+        n += len(chunk)
+
+    return(n)
+
+
+
+def collect(chunks):
+    # Runs the pipeline and returns all rows as one DataFrame,
+    # the same as the in-memory path (for checking and small files)
+
+    return(pd.concat(list(chunks)))
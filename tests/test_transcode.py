@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Header detection of transcode.comment_header()
+
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import transcode
+
+
+
+
+def _comment(tmp_path, text, **kwargs):
+
+    fname_in = tmp_path / 'in.csv'
+    fname_out = tmp_path / 'out.csv'
+
+    fname_in.write_bytes(text.encode('ascii'))
+
+    n = transcode.comment_header(fname_in, fname_out, **kwargs)
+
+    return(n, fname_out.read_bytes().decode('ascii'))
+
+
+
+def test_date_first(tmp_path):
+
+    text = 'date time TA HREL\n' \
+           '2020-01-01 00:00 -1.5 0.9\n' \
+           '2020-01-01 01:00 -1.7 0.91\n'
+
+    n, out = _comment(tmp_path, text)
+
+    assert n == 1
+    assert out == '% ' + text
+
+
+
+def test_numeric(tmp_path):
+
+    text = 'TA HREL\n-1.5 0.9\n-1.7 0.91\n'
+
+    n, out = _comment(tmp_path, text)
+
+    assert n == 1
+    assert out == '% ' + text
+
+
+
+def test_no_header(tmp_path):
+
+    text = '-1.5 0.9\n-1.7 0.91\n'
+
+    n, out = _comment(tmp_path, text)
+
+    assert n == 0
+    assert out == text
+
+
+
+def test_n_header(tmp_path):
+
+    text = 'Jokioinen\ndate TA\n2020-01-01 -1.5\n'
+
+    n, out = _comment(tmp_path, text, n_header=2)
+
+    assert n == 2
+    assert out == '% Jokioinen\n% date TA\n2020-01-01 -1.5\n'
+
+
+
+def test_count_date_first(tmp_path):
+
+    fname = tmp_path / 'in.csv'
+
+    fname.write_bytes(b'date time TA HREL\n'
+                      b'2020-01-01 00:00 -1.5 0.9\n'
+                      b'2020-01-01 01:00 -1.7 0.91\n'
+                      b'\n')
+
+    assert transcode._count_data_lines(fname) == 2
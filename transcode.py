@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Streaming transcoder for climate files.
+
+comment_header() copies a climate file and comments out the header
+line(s) with '% ', so that COMSOL reads the file as data. The header
+lines are identified once at the beginning of the file:
+    - .wac file: the rows before the data rows (see helper.read_wac_header)
+    - whitespace csv: the leading rows where none of the items is a
+      number (or the number of header lines can be given). A row with
+      at least one number is data, so data rows that start with a date
+      or a time stamp are not taken as header.
+The rest of the file is copied in large blocks without looking at the
+lines, so the memory use does not depend on the file size.
+
+transcode() converts between the layouts in the same pass:
+    'csv' = whitespace separated values, one header row with the names
+    'wac' = WUFI .wac file (WUFI®_WAC_02)
+    'comsol' = time (h) as the first column, header row as comment
+The data is read and written in chunks of rows (see streaming.py), so
+also the conversion runs in constant memory.
+
+
+# Example
+
+import transcode
+
+transcode.comment_header('Jokioinen.csv', 'Jokioinen headerAsComment.csv')
+
+transcode.transcode('Jokioinen.wac', 'Jokioinen comsol.csv', 'comsol',
+                    columns=['TA', 'HREL'])
+
+transcode.transcode('Jokioinen.csv', 'Jokioinen.wac', 'wac',
+                    columns={'TA': 'Te', 'HREL': 'RH'},
+                    wac_header={'name': 'Jokioinen', 'longitude': 23.5,
+                                'latitude': 60.81, 'altitude': 104.0,
+                                'timezone': 2.0, 'time_step': 1.0})
+
+"""
+
+import shutil
+import numpy as np
+
+import helper
+import streaming
+
+
+
+
+block_size = 1 << 22
+
+
+
+
+def _is_wac(fname):
+
+    with open(fname, 'rb') as f:
+        return(b'WAC_02' in f.readline())
+
+
+
+def _is_number(text):
+
+    try:
+        float(text)
+        return(True)
+    except ValueError:
+        return(False)
+
+
+
+def _is_data_line(line):
+    # True if at least one item of the line (bytes) is a number. Data
+    # rows may start with a date or a time stamp, header rows have no
+    # numbers.
+
+    return(any(_is_number(item.decode('latin-1')) for item in line.split()))
+
+
+
+def comment_header(fname_in, fname_out, comment='% ', n_header=None):
+    # Copies the file with the header line(s) commented out
+    # n_header = number of header lines, None = identified from the file
+    # The file is copied as bytes, so the line endings and the
+    # encoding are kept.
+    # Returns the number of commented lines
+
+    if n_header is None and _is_wac(fname_in):
+        n_header = helper.read_wac_header(fname_in)['n_header_rows']
+
+    comment = comment.encode('ascii')
+
+    n_commented = 0
+
+    with open(fname_in, 'rb') as f_in, open(fname_out, 'wb') as f_out:
+
+        # Header lines, identified once
+        while True:
+
+            line = f_in.readline()
+
+            if line == b'':
+                break
+
+            if n_header is None:
+                is_header = line.strip() != b'' and not _is_data_line(line)
+            else:
+                is_header = n_commented < n_header
+
+            if not is_header:
+                f_out.write(line)
+                break
+
+            f_out.write(comment + line)
+            n_commented += 1
+
+        # Data lines, in blocks
+        shutil.copyfileobj(f_in, f_out, block_size)
+
+    return(n_commented)
+
+
+
+
+def _wac_header_text(header, column_names, n_data_lines):
+    # Header rows of a WUFI .wac file
+
+    rows = ['WUFI®_WAC_02',
+            '10\tLine Offset to \'Number of Data Columns\'',
+            header.get('name', ''),
+            '',
+            f'{header["longitude"]}\tLongitude [°]; East is positive',
+            f'{header["latitude"]}\tLatitude [°]; North is positive',
+            f'{header["altitude"]}\tHeightAMSL [m]',
+            f'{header["timezone"]}\tTime Zone [h from UTC]; East is positive',
+            f'{header.get("time_step", 1.0):g}\tTime Step [h]',
+            f'{n_data_lines}\tNumber of DataLines',
+            f'{len(column_names)}\tNumber of DataColumns',
+            '\t'.join(column_names)]
+
+    return('\n'.join(rows) + '\n')
+
+
+
+def _count_data_lines(fname):
+    # Number of data lines, identified as in comment_header()
+    # The file is read line by line, so the memory use does not depend
+    # on the file size.
+
+    n = 0
+
+    with open(fname, 'rb') as f:
+        for line in f:
+            if _is_data_line(line):
+                n += 1
+
+    return(n)
+
+
+
+
+def transcode(fname_in, fname_out, layout_out,
+              columns=None, wac_header=None, time_step=None,
+              fmt='%.5f', chunk_size=100000, comment='% '):
+    # Converts a climate file (.wac or whitespace csv) to another layout
+    # layout_out = 'csv', 'wac' or 'comsol'
+    # columns = list of input column names, or dict output name -> input
+    #           name to also rename the columns. None = all columns
+    # wac_header = dict with 'name', 'longitude', 'latitude', 'altitude',
+    #              'timezone' and 'time_step', needed for csv -> wac
+    # [time_step] = h, time step of the 'comsol' layout, None = from
+    #               the wac header or 1 h
+    # fmt = number format of the values, e.g. '%.2f'
+    # Returns the number of data rows
+
+    if _is_wac(fname_in):
+        header_in = helper.read_wac_header(fname_in)
+        chunks = streaming.wac_chunks(fname_in, chunk_size)
+    else:
+        header_in = None
+        chunks = streaming.csv_chunks(fname_in, chunk_size)
+
+    if wac_header is None:
+        wac_header = header_in
+
+    if time_step is None:
+        time_step = 1.0 if wac_header is None else wac_header['time_step']
+
+    if isinstance(columns, dict):
+        names_out = list(columns.keys())
+        names_in = list(columns.values())
+    else:
+        names_out = columns
+        names_in = columns
+
+    if float(time_step).is_integer():
+        fmt_time = '%d'
+    else:
+        fmt_time = '%.4f'
+
+    n_rows = 0
+
+    with open(fname_out, 'w', encoding='cp1252' if layout_out == 'wac' \
+              else 'utf-8', newline='\n') as f:
+
+        for chunk in chunks:
+
+            if names_in is None:
+                names_in = list(chunk.columns)
+                names_out = names_in
+
+            X = chunk.loc[:, names_in].values.astype(np.float64)
+
+            # Header, when the column names are known
+            if n_rows == 0:
+
+                if layout_out == 'wac':
+                    if wac_header is None:
+                        raise ValueError('wac_header is needed for .wac output')
+                    if header_in is not None:
+                        n_data_lines = header_in['n_data_lines']
+                    else:
+                        n_data_lines = _count_data_lines(fname_in)
+                    f.write(_wac_header_text(wac_header, names_out,
+                                             n_data_lines))
+
+                elif layout_out == 'comsol':
+                    f.write(comment + ' '.join(['time'] + names_out) + '\n')
+
+                elif layout_out == 'csv':
+                    f.write(' '.join(names_out) + '\n')
+
+                else:
+                    raise ValueError(f'Unknown layout: {layout_out}')
+
+            if layout_out == 'comsol':
+                t = time_step * np.arange(n_rows, n_rows + len(X))
+                np.savetxt(f, np.column_stack((t, X)),
+                           fmt=[fmt_time] + [fmt]*X.shape[1])
+
+            elif layout_out == 'wac':
+                np.savetxt(f, X, fmt=fmt, delimiter='\t')
+
+            else:
+                np.savetxt(f, X, fmt=fmt, delimiter=' ')
+
+            n_rows += len(X)
+
+    return(n_rows)
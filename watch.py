@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Live follow-up of COMSOL results files while the simulations are
+still running.
+
+Each results file (e.g. 'vuoden tulokset.txt' of a case) is followed
+with its own asyncio task. The file is polled for new bytes, and only
+the rows appended since the previous poll are parsed. The mould index
+is continued from the previous rows with helper.MI_batch(state=...),
+so the running values are exactly the same as from reading the whole
+file at the end.
+
+After every update the running indicators of all files are written to
+a status file (json) that can be followed from another program, e.g.
+to stop the cases that are already clearly mouldy:
+
+{"S:/.../esimerkki/vuoden tulokset.txt":
+    {"status": "running",       # 'waiting', 'running', 'idle', 'error'
+     "n_rows": 4380,
+     "time": 4379.0,            # h, last time value
+     "updated": "2026-10-19 12:00:00",
+     "points": {"wood_e_up": {"M": 1.2, "Mmax": 2.3, "time_Mmax": 4100.0,
+                              "h_RH_over_95": 510.0}, ...},
+     "Mmax": 2.3,               # largest Mmax of all points
+     "over_limit": false},      # Mmax >= Mmax_limit
+ ...}
+
+The status file is written to a temporary file and renamed, so the
+reader never sees a half-written file. If the status file cannot be
+replaced (on Windows, while another program has it open), it is
+written again at the next poll and the follow-up continues.
+
+The mould index is calculated for the whole run from the beginning
+(also the spin-up years), not only for the last year as in
+2_comsol_read_results.py. Parametric sweep exports are not supported,
+because the cases are not written one after another in time.
+
+
+# Example, see also 2_comsol_watch_results.py
+
+import watch
+
+watch.run(['S:/.../esimerkki/vuoden tulokset.txt'],
+          'S:/.../watch_status.json',
+          [['wood_e_up', 'vs', 'vs', 0.5]],
+          poll_interval=60.0)
+
+"""
+
+import os
+import json
+import time
+import asyncio
+import numpy as np
+
+import helper
+import results
+
+
+
+
+def _new_state(points):
+    # Follow-up state of one results file
+
+    return({'offset': 0,
+            'buffer': b'',
+            'idxs': None,
+            'last_row': None,
+            'MI': {point[0]: None for point in points},
+            'status': {'status': 'waiting',
+                       'n_rows': 0,
+                       'time': None,
+                       'updated': None,
+                       'points': {},
+                       'Mmax': None,
+                       'over_limit': False}})
+
+
+
+def _read_new_rows(fname, state):
+    # Reads the bytes appended since the previous call
+    # Returns the complete new data rows as bytes (may be empty)
+    # Runs in a worker thread
+
+    size = os.path.getsize(fname)
+
+    if size < state['offset']:
+        raise ValueError('The file became shorter, the run was restarted?')
+
+    if size == state['offset']:
+        return(b'')
+
+    with open(fname, 'rb') as f:
+        f.seek(state['offset'])
+        data = f.read(size - state['offset'])
+
+    state['offset'] += len(data)
+
+    # The last line may still be incomplete
+    data = state['buffer'] + data
+    idx_end = data.rfind(b'\n') + 1
+    state['buffer'] = data[idx_end:]
+
+    lines = [line for line in data[:idx_end].splitlines(keepends=True) \
+             if not line.startswith(b'%') and line.strip() != b'']
+
+    return(b''.join(lines))
+
+
+
+def update(fname, state, points, Mmax_limit=None):
+    # Parses the new rows of one file and updates the mould index and
+    # the running indicators in state['status']
+    # Returns the number of new rows
+
+    rows = _read_new_rows(fname, state)
+
+    if rows == b'':
+        return(0)
+
+    if state['idxs'] is None:
+        column_names, units, n_header_rows = results.read_results_header(fname)
+        state['idxs'] = [column_names.index('time')] \
+            + [column_names.index(f'{q}_{point[0]}') \
+               for point in points for q in ('T', 'RH')]
+
+    data = np.loadtxt(rows.decode('utf-8', errors='replace').splitlines(),
+                      usecols=state['idxs'],
+                      ndmin=2)
+
+    n_new = data.shape[0]
+
+    # One row of overlap, the mould index continues from the last row
+    # of the previous update
+    if state['last_row'] is not None:
+        data = np.vstack((state['last_row'], data))
+
+    state['last_row'] = data[-1:, :].copy()
+
+    t = data[:, 0]
+
+    # A new status dict, so that write_status() never sees a
+    # half-updated one of the other threads
+    status = dict(state['status'])
+    status['points'] = {name: dict(s) \
+                        for name, s in state['status']['points'].items()}
+
+    for idx_point, point in enumerate(points):
+
+        name = point[0]
+        T_data = data[:, 1 + 2*idx_point]
+        RH_data = data[:, 2 + 2*idx_point]
+
+        M, state['MI'][name] = helper.MI_batch(T_data,
+                                               RH_data,
+                                               point[1],
+                                               point[2],
+                                               point[3],
+                                               time=t,
+                                               state=state['MI'][name],
+                                               return_state=True)
+
+        s = status['points'].setdefault(name, {'M': 0.0,
+                                               'Mmax': 0.0,
+                                               'time_Mmax': None,
+                                               'h_RH_over_95': 0.0})
+
+        idx_max = int(np.argmax(M))
+        if s['time_Mmax'] is None or M[idx_max] > s['Mmax']:
+            s['Mmax'] = float(M[idx_max])
+            s['time_Mmax'] = float(t[idx_max])
+
+        s['M'] = float(M[-1])
+
+        # Hours with RH > 95 %, the values of a row hold until the next
+        if len(t) > 1:
+            s['h_RH_over_95'] += float(np.sum(np.diff(t)[RH_data[:-1] > 95.0]))
+
+    status['n_rows'] += n_new
+    status['time'] = float(t[-1])
+    status['Mmax'] = max(s['Mmax'] for s in status['points'].values())
+    status['over_limit'] = Mmax_limit is not None \
+        and status['Mmax'] >= Mmax_limit
+
+    state['status'] = status
+
+    return(n_new)
+
+
+
+
+def write_status(fname_status, states):
+    # Writes the status of all files, atomically
+    # Returns True if written. On Windows the file cannot be replaced
+    # while another program has it open, then False is returned and
+    # the status is written again at the next poll.
+
+    status = {fname: state['status'] for fname, state in states.items()}
+
+    fname_tmp = f'{fname_status}.tmp'
+
+    try:
+        with open(fname_tmp, 'w', encoding='utf-8') as f:
+            json.dump(status, f, indent=1)
+
+        os.replace(fname_tmp, fname_status)
+
+    except OSError:
+        return(False)
+
+    return(True)
+
+
+
+
+async def follow(fname, states, points, fname_status, poll_interval=60.0,
+                 Mmax_limit=None, idle_timeout=None):
+    # Follows one results file until it has not grown in idle_timeout
+    # seconds (None = forever)
+
+    state = states[fname]
+
+    t_last_change = time.monotonic()
+
+    # Status not yet written, e.g. the status file was open
+    unwritten = False
+
+    # Error or idle, the task ends when the status has been written
+    finished = False
+
+    while True:
+
+        n_new = 0
+
+        if not finished and os.path.exists(fname):
+            try:
+                # The file is read in a thread, so the other files are
+                # followed at the same time
+                n_new = await asyncio.to_thread(update, fname, state,
+                                                points, Mmax_limit)
+            except Exception as e:
+                state['status']['status'] = f'error: {e!r}'
+                finished = True
+                unwritten = True
+
+        if n_new > 0:
+            t_last_change = time.monotonic()
+            state['status']['status'] = 'running'
+            state['status']['updated'] = time.strftime('%Y-%m-%d %H:%M:%S')
+            unwritten = True
+
+        elif not finished and idle_timeout is not None \
+                and time.monotonic() - t_last_change > idle_timeout:
+            state['status']['status'] = 'idle'
+            finished = True
+            unwritten = True
+
+        if unwritten:
+            unwritten = not write_status(fname_status, states)
+
+        if finished and not unwritten:
+            return(state['status'])
+
+        await asyncio.sleep(poll_interval)
+
+
+
+async def watch(fnames, fname_status, points, poll_interval=60.0,
+                Mmax_limit=None, idle_timeout=None):
+    # Follows all files at the same time
+    # points = list of [point, MG_speedclass, MG_maxclass, C_mat]
+    # Mmax_limit = 'over_limit' is set when Mmax of any point reaches
+    #              this value, None = not used
+    # idle_timeout = s, a file is finished when it has not grown in
+    #                this time, None = follow forever
+    # Returns dict: file name -> final status
+
+    states = {fname: _new_state(points) for fname in fnames}
+
+    write_status(fname_status, states)
+
+    tasks = [follow(fname, states, points, fname_status, poll_interval,
+                    Mmax_limit, idle_timeout) for fname in fnames]
+
+    final = await asyncio.gather(*tasks)
+
+    return(dict(zip(fnames, final)))
+
+
+
+def run(fnames, fname_status, points, poll_interval=60.0,
+        Mmax_limit=None, idle_timeout=None):
+    # Blocking entry point, see watch()
+
+    return(asyncio.run(watch(fnames, fname_status, points, poll_interval,
+                             Mmax_limit, idle_timeout)))